@@ -0,0 +1,517 @@
+// cnf_loader.c
+
+#include "head.h"
+
+#include <ctype.h>
+#include <dirent.h>
+#include <errno.h>
+#include <limits.h>
+#include <stdint.h>
+#include <sys/stat.h>
+#include <utime.h>
+
+#ifdef _WIN32
+#include <direct.h>
+#include <process.h>
+#include <windows.h>
+#else
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <unistd.h>
+#endif
+
+// 创建目录，目录已存在时也返回 0
+static int MakeDir(const char *path)
+{
+#ifdef _WIN32
+    int result = _mkdir(path);
+#else
+    int result = mkdir(path, 0755);
+#endif
+    return result == 0 || errno == EEXIST ? 0 : -1;
+}
+
+// 将整个文件映射到内存，返回只读的文件内容，*size 为文件长度
+static const char *MapFile(const char *filename, size_t *size, void **handle)
+{
+#ifdef _WIN32
+    HANDLE file = CreateFileA(filename, GENERIC_READ, FILE_SHARE_READ, NULL, OPEN_EXISTING,
+                              FILE_ATTRIBUTE_NORMAL | FILE_FLAG_SEQUENTIAL_SCAN, NULL);
+    if (file == INVALID_HANDLE_VALUE)
+        return NULL;
+    LARGE_INTEGER length;
+    if (!GetFileSizeEx(file, &length))
+    {
+        CloseHandle(file);
+        return NULL;
+    }
+    *size = (size_t)length.QuadPart;
+    *handle = NULL;
+    if (*size == 0)
+    {
+        CloseHandle(file);
+        return "";
+    }
+    HANDLE mapping = CreateFileMappingA(file, NULL, PAGE_READONLY, 0, 0, NULL);
+    CloseHandle(file);
+    if (!mapping)
+        return NULL;
+    const char *data = (const char *)MapViewOfFile(mapping, FILE_MAP_READ, 0, 0, 0);
+    CloseHandle(mapping);
+    *handle = (void *)data;
+    return data;
+#else
+    int fd = open(filename, O_RDONLY);
+    if (fd < 0)
+        return NULL;
+    struct stat st;
+    if (fstat(fd, &st) < 0)
+    {
+        close(fd);
+        return NULL;
+    }
+    *size = (size_t)st.st_size;
+    *handle = NULL;
+    if (*size == 0)
+    {
+        close(fd);
+        return "";
+    }
+    void *data = mmap(NULL, *size, PROT_READ, MAP_PRIVATE, fd, 0);
+    close(fd);
+    if (data == MAP_FAILED)
+        return NULL;
+    madvise(data, *size, MADV_SEQUENTIAL);
+    *handle = data;
+    return (const char *)data;
+#endif
+}
+
+static void UnmapFile(void *handle, size_t size)
+{
+    if (!handle)
+        return;
+#ifdef _WIN32
+    UnmapViewOfFile(handle);
+#else
+    munmap(handle, size);
+#endif
+}
+
+// 跳到下一行行首
+static const char *SkipLine(const char *p, const char *end)
+{
+    while (p < end && *p != '\n')
+        p++;
+    return p < end ? p + 1 : end;
+}
+
+// 解析 p 行。映射的内容不以 '\0' 结尾，先复制到局部缓冲区再交给 sscanf
+static bool ReadHeader(const char *p, const char *end, int *num_vars, int *num_clauses)
+{
+    char line[256];
+    size_t n = 0;
+    while (p + n < end && p[n] != '\n' && n < sizeof(line) - 1)
+    {
+        line[n] = p[n];
+        n++;
+    }
+    line[n] = '\0';
+    return sscanf(line, "p cnf %d %d", num_vars, num_clauses) == 2 && *num_clauses >= 0;
+}
+
+// 结束当前子句，记录下一个子句的起点
+static status EndClause(CnfFormula *F, int *offsets_cap)
+{
+    if (F->num_clauses + 1 == *offsets_cap)
+    {
+        *offsets_cap *= 2;
+        int *offsets = (int *)realloc(F->offsets, sizeof(int) * *offsets_cap);
+        if (!offsets)
+            return ERROR;
+        F->offsets = offsets;
+    }
+    F->offsets[++F->num_clauses] = F->num_lits;
+    return OK;
+}
+
+// 记录当前子句为恰好一个约束
+static status MarkExactlyOne(CnfFormula *F, int *cap)
+{
+    if (F->num_exactly_one == *cap)
+    {
+        *cap = *cap ? *cap * 2 : 256;
+        int *exactly_one = (int *)realloc(F->exactly_one, sizeof(int) * *cap);
+        if (!exactly_one)
+            return ERROR;
+        F->exactly_one = exactly_one;
+    }
+    F->exactly_one[F->num_exactly_one++] = F->num_clauses;
+    return OK;
+}
+
+// 一次扫描映射后的文件内容，将文字依次写入 lits，子句边界写入 offsets，e 行的子句序号写入 exactly_one
+static status ParseCnf(CnfFormula *F, const char *p, const char *end, const char *filename)
+{
+    // 每个文字（含结尾的 0）至少占两个字符，据此一次分配足够的文字空间
+    size_t lits_cap = (size_t)(end - p) / 2 + 1;
+    int offsets_cap = 1024, exactly_one_cap = 0;
+    int header_vars = 0, header_clauses = 0;
+    bool line_start = true;
+
+    F->lits = (int *)malloc(sizeof(int) * lits_cap);
+    F->offsets = (int *)malloc(sizeof(int) * offsets_cap);
+    if (!F->lits || !F->offsets)
+        return ERROR;
+    F->offsets[0] = 0;
+
+    while (p < end)
+    {
+        char ch = *p;
+        if (ch == '\n')
+        {
+            line_start = true;
+            p++;
+            continue;
+        }
+        if (isspace((unsigned char)ch))
+        {
+            p++;
+            continue;
+        }
+        if (line_start && (ch == 'c' || ch == 'p' || ch == '%'))
+        {
+            // p 行给出变元数与子句数，用于预先分配子句边界数组
+            if (ch == 'p' && ReadHeader(p, end, &header_vars, &header_clauses) &&
+                header_clauses + 1 > offsets_cap)
+            {
+                offsets_cap = header_clauses + 1;
+                int *offsets = (int *)realloc(F->offsets, sizeof(int) * offsets_cap);
+                if (!offsets)
+                    return ERROR;
+                F->offsets = offsets;
+            }
+            // SATLIB 格式的文件以 % 行结束
+            if (ch == '%')
+                break;
+            p = SkipLine(p, end);
+            continue;
+        }
+        if (line_start && ch == 'e')
+        {
+            // 当前子句尚未开始时才能标记，"e" 后的文字直到 0 为一个恰好一个约束
+            if (F->offsets[F->num_clauses] != F->num_lits)
+            {
+                fprintf(stderr, "Exactly-one constraint inside a clause in CNF file: %s\n", filename);
+                return ERROR;
+            }
+            if (!MarkExactlyOne(F, &exactly_one_cap))
+                return ERROR;
+            line_start = false;
+            p++;
+            continue;
+        }
+        line_start = false;
+
+        bool negative = false;
+        if (ch == '-')
+        {
+            negative = true;
+            p++;
+        }
+        if (p >= end || !isdigit((unsigned char)*p))
+        {
+            fprintf(stderr, "Unexpected character '%c' in CNF file: %s\n", ch, filename);
+            return ERROR;
+        }
+        long value = 0;
+        while (p < end && isdigit((unsigned char)*p))
+        {
+            value = value * 10 + (*p++ - '0');
+            if (value > INT_MAX / 2)
+            {
+                fprintf(stderr, "Variable out of range in CNF file: %s\n", filename);
+                return ERROR;
+            }
+        }
+
+        if (value == 0)
+        {
+            if (!EndClause(F, &offsets_cap))
+                return ERROR;
+            continue;
+        }
+        if (value > F->num_vars)
+            F->num_vars = (int)value;
+        F->lits[F->num_lits++] = negative ? -(int)value : (int)value;
+    }
+
+    // 最后一个子句（或最后一行 e）缺少结尾的 0 时仍然接受
+    bool open_constraint = F->num_exactly_one > 0 && F->exactly_one[F->num_exactly_one - 1] == F->num_clauses;
+    if ((F->offsets[F->num_clauses] != F->num_lits || open_constraint) && !EndClause(F, &offsets_cap))
+        return ERROR;
+    if (header_vars > F->num_vars)
+        F->num_vars = header_vars;
+    return OK;
+}
+
+// 解析映射后的文本，失败时返回 NULL
+static CnfFormula *ParseMapped(const char *data, size_t size, const char *filename)
+{
+    CnfFormula *F = (CnfFormula *)calloc(1, sizeof(CnfFormula));
+    if (!F || !ParseCnf(F, data, data + size, filename))
+    {
+        CnfFree(F);
+        return NULL;
+    }
+
+    // 按实际文字数收缩预先分配的空间
+    int *lits = (int *)realloc(F->lits, sizeof(int) * (F->num_lits + 1));
+    if (lits)
+        F->lits = lits;
+    return F;
+}
+
+// 读取 CNF 文件为 CSR 形式：第 c 个子句为 lits[offsets[c]] 到 lits[offsets[c + 1] - 1]
+CnfFormula *CnfLoad(const char *filename)
+{
+    size_t size;
+    void *handle;
+    const char *data = MapFile(filename, &size, &handle);
+    if (!data)
+    {
+        printf("Error opening file: %s\n", filename);
+        return NULL;
+    }
+
+    CnfFormula *F = ParseMapped(data, size, filename);
+    UnmapFile(handle, size);
+    return F;
+}
+
+void CnfFree(CnfFormula *F)
+{
+    if (!F)
+        return;
+    free(F->lits);
+    free(F->offsets);
+    free(F->exactly_one);
+    free(F);
+}
+
+// 打印 CNF 公式，恰好一个约束以 "e " 开头
+void clause_print(const CnfFormula *F, FILE *output_file)
+{
+    for (int c = 0, next = 0; c < F->num_clauses; c++)
+    {
+        if (next < F->num_exactly_one && F->exactly_one[next] == c)
+        {
+            fprintf(output_file, "e ");
+            next++;
+        }
+        for (int k = F->offsets[c]; k < F->offsets[c + 1]; k++)
+            fprintf(output_file, "%d ", F->lits[k]);
+        fprintf(output_file, "0\n"); // 每个子句结束以0结尾
+    }
+}
+
+// ---------- 以文件内容哈希为键的二进制缓存 ----------
+//
+// 缓存文件名为 <哈希>-<长度>.cnfb（16 位十六进制的哈希、短横线与十六进制的文件长度），内容依次为 CnfCacheHeader、int32 的 lits[num_lits]、
+// offsets[num_clauses + 1] 与 exactly_one[num_exactly_one]，按本机字节序存放。命中时直接读入数组，不再解析文本。
+// 缓存目录的总大小超过上限时，按修改时间删除最久未使用的文件，命中时会更新修改时间。
+
+#define CACHE_MAGIC "CNFB"
+#define CACHE_VERSION 1
+#define CACHE_SUFFIX ".cnfb"
+
+typedef struct CnfCacheHeader
+{
+    char magic[4];
+    int32_t version;
+    uint64_t hash;
+    int32_t num_vars;
+    int32_t num_clauses;
+    int32_t num_lits;
+    int32_t num_exactly_one; // 原为保留字段，旧缓存中为 0
+} CnfCacheHeader;
+
+// FNV-1a 64 位哈希
+static uint64_t HashBytes(const char *data, size_t size)
+{
+    uint64_t h = 14695981039346656037ULL;
+    for (size_t i = 0; i < size; i++)
+    {
+        h ^= (unsigned char)data[i];
+        h *= 1099511628211ULL;
+    }
+    return h;
+}
+
+static void CachePath(char *path, size_t cap, const char *cache_dir, uint64_t hash, size_t size)
+{
+    snprintf(path, cap, "%s/%016llx-%llx%s", cache_dir, (unsigned long long)hash,
+             (unsigned long long)size, CACHE_SUFFIX);
+}
+
+// 读取缓存文件，文件不存在或内容不一致时返回 NULL
+static CnfFormula *ReadCache(const char *path, uint64_t hash)
+{
+    FILE *file = fopen(path, "rb");
+    if (!file)
+        return NULL;
+
+    CnfCacheHeader header;
+    CnfFormula *F = NULL;
+    if (fread(&header, sizeof(header), 1, file) == 1 && memcmp(header.magic, CACHE_MAGIC, 4) == 0 &&
+        header.version == CACHE_VERSION && header.hash == hash && header.num_lits >= 0 &&
+        header.num_clauses >= 0 && header.num_exactly_one >= 0 &&
+        (F = (CnfFormula *)calloc(1, sizeof(CnfFormula))))
+    {
+        F->num_vars = header.num_vars;
+        F->num_clauses = header.num_clauses;
+        F->num_lits = header.num_lits;
+        F->num_exactly_one = header.num_exactly_one;
+        F->lits = (int *)malloc(sizeof(int) * (F->num_lits + 1));
+        F->offsets = (int *)malloc(sizeof(int) * (F->num_clauses + 1));
+        F->exactly_one = (int *)malloc(sizeof(int) * (F->num_exactly_one + 1));
+        if (!F->lits || !F->offsets || !F->exactly_one ||
+            fread(F->lits, sizeof(int), F->num_lits, file) != (size_t)F->num_lits ||
+            fread(F->offsets, sizeof(int), F->num_clauses + 1, file) != (size_t)F->num_clauses + 1 ||
+            fread(F->exactly_one, sizeof(int), F->num_exactly_one, file) != (size_t)F->num_exactly_one ||
+            F->offsets[0] != 0 || F->offsets[F->num_clauses] != F->num_lits)
+        {
+            CnfFree(F);
+            F = NULL;
+        }
+    }
+    fclose(file);
+    return F;
+}
+
+// 写入缓存文件，先写临时文件再改名，避免被中断的进程留下不完整的缓存
+static status WriteCache(const char *path, const CnfFormula *F, uint64_t hash)
+{
+    char tmp_path[4096 + 32];
+    snprintf(tmp_path, sizeof(tmp_path), "%s.%ld.tmp", path, (long)getpid());
+    FILE *file = fopen(tmp_path, "wb");
+    if (!file)
+        return ERROR;
+
+    CnfCacheHeader header = {{0}, CACHE_VERSION, hash, F->num_vars, F->num_clauses, F->num_lits,
+                             F->num_exactly_one};
+    memcpy(header.magic, CACHE_MAGIC, 4);
+    bool written = fwrite(&header, sizeof(header), 1, file) == 1 &&
+                   fwrite(F->lits, sizeof(int), F->num_lits, file) == (size_t)F->num_lits &&
+                   fwrite(F->offsets, sizeof(int), F->num_clauses + 1, file) == (size_t)F->num_clauses + 1 &&
+                   (F->num_exactly_one == 0 ||
+                    fwrite(F->exactly_one, sizeof(int), F->num_exactly_one, file) == (size_t)F->num_exactly_one);
+    if (fclose(file) != 0 || !written)
+    {
+        remove(tmp_path);
+        return ERROR;
+    }
+#ifdef _WIN32
+    remove(path);
+#endif
+    if (rename(tmp_path, path) != 0)
+    {
+        remove(tmp_path);
+        return ERROR;
+    }
+    return OK;
+}
+
+typedef struct CacheEntry
+{
+    char name[256];
+    time_t mtime;
+    long long size;
+} CacheEntry;
+
+static int CompareMtime(const void *a, const void *b)
+{
+    time_t ta = ((const CacheEntry *)a)->mtime, tb = ((const CacheEntry *)b)->mtime;
+    return (ta > tb) - (ta < tb);
+}
+
+// 缓存目录总大小超过 max_bytes 时，从最久未使用的文件开始删除
+static void EvictCache(const char *cache_dir, long long max_bytes)
+{
+    DIR *dir = opendir(cache_dir);
+    if (!dir)
+        return;
+
+    int count = 0, cap = 64;
+    long long total = 0;
+    CacheEntry *entries = (CacheEntry *)malloc(sizeof(CacheEntry) * cap);
+    struct dirent *ent;
+    char path[4096];
+    while (entries && (ent = readdir(dir)))
+    {
+        size_t len = strlen(ent->d_name);
+        if (len < strlen(CACHE_SUFFIX) || len >= sizeof(entries->name) ||
+            strcmp(ent->d_name + len - strlen(CACHE_SUFFIX), CACHE_SUFFIX) != 0)
+            continue;
+        struct stat st;
+        snprintf(path, sizeof(path), "%s/%s", cache_dir, ent->d_name);
+        if (stat(path, &st) != 0)
+            continue;
+        if (count == cap)
+        {
+            cap *= 2;
+            CacheEntry *grown = (CacheEntry *)realloc(entries, sizeof(CacheEntry) * cap);
+            if (!grown)
+                break;
+            entries = grown;
+        }
+        strcpy(entries[count].name, ent->d_name);
+        entries[count].mtime = st.st_mtime;
+        entries[count].size = (long long)st.st_size;
+        total += entries[count].size;
+        count++;
+    }
+    closedir(dir);
+    if (!entries)
+        return;
+
+    qsort(entries, count, sizeof(CacheEntry), CompareMtime);
+    for (int i = 0; i < count && total > max_bytes; i++)
+    {
+        snprintf(path, sizeof(path), "%s/%s", cache_dir, entries[i].name);
+        if (remove(path) == 0)
+            total -= entries[i].size;
+    }
+    free(entries);
+}
+
+// 与 CnfLoad 相同，但先按文件内容的哈希查找 cache_dir 中的二进制缓存，
+// 未命中时解析文本并写入缓存，缓存目录总大小不超过 max_bytes
+CnfFormula *CnfLoadCached(const char *filename, const char *cache_dir, long long max_bytes)
+{
+    size_t size;
+    void *handle;
+    const char *data = MapFile(filename, &size, &handle);
+    if (!data)
+    {
+        printf("Error opening file: %s\n", filename);
+        return NULL;
+    }
+
+    uint64_t hash = HashBytes(data, size);
+    char path[4096];
+    CachePath(path, sizeof(path), cache_dir, hash, size);
+    CnfFormula *F = ReadCache(path, hash);
+    if (F)
+    {
+        UnmapFile(handle, size);
+        utime(path, NULL); // 更新修改时间，记录最近一次使用
+        return F;
+    }
+
+    F = ParseMapped(data, size, filename);
+    UnmapFile(handle, size);
+    if (F && MakeDir(cache_dir) == 0 && WriteCache(path, F, hash))
+        EvictCache(cache_dir, max_bytes);
+    return F;
+}
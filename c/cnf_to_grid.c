@@ -2,48 +2,26 @@
 
 #include "head.h"
 
-// 初始化数独网格
-void initializeGrid(int grid[N][N])
-{
-    for (int i = 0; i < N; i++)
-        for (int j = 0; j < N; j++)
-            grid[i][j] = 0;
-}
-
-// 从CNF文件读取并转换为数独网格
-int readCNFToGrid(const char *cnfFile, int grid[N][N])
+// 从语义编码的CNF文件读取并转换为数独网格，返回盘面边长，出错时返回 0
+int readCNFToGrid(const char *cnfFile, int *grid)
 {
     FILE *file = fopen(cnfFile, "r");
     if (!file)
     {
         fprintf(stderr, "Error opening CNF file: %s\n", cnfFile);
-        return 1;
-    }
-
-    char line[256];
-    while (fgets(line, sizeof(line), file))
-    {
-        if (line[0] == 'c' || line[0] == 'p')
-            continue; // 跳过注释和头信息行
-
-        int lit;
-        sscanf(line, "%d", &lit);
-
-        if (lit > 0)
-        { // 确保是正文字
-            int row = (lit / 100) - 1;
-            int col = ((lit / 10) % 10) - 1;
-            int num = (lit % 10);
-            grid[row][col] = num;
-        }
+        return 0;
     }
 
+    // 文件中 c size 行给出边长，没有时为 9x9
+    int n = ReadSemanticGrid(file, grid);
     fclose(file);
-    return 0;
+    if (!n)
+        fprintf(stderr, "Invalid literal in CNF file: %s\n", cnfFile);
+    return n;
 }
 
 // 打印数独网格到文件
-void printGridToFile(int grid[N][N], const char *outputFile)
+void printGridToFile(int n, const int *grid, const char *outputFile)
 {
     FILE *file = fopen(outputFile, "w");
     if (!file)
@@ -52,18 +30,7 @@ void printGridToFile(int grid[N][N], const char *outputFile)
         return;
     }
 
-    for (int i = 0; i < N; i++)
-    {
-        for (int j = 0; j < N; j++)
-        {
-            if (grid[i][j] == 0)
-                fprintf(file, "0 ");
-            else
-                fprintf(file, "%d ", grid[i][j]);
-        }
-        fprintf(file, "\n");
-    }
-
+    PrintGrid(file, n, grid);
     fclose(file);
 }
 
@@ -77,16 +44,15 @@ int main(int argc, char *argv[])
 
     const char *cnfFile = argv[1];
     const char *outputFile = argv[2];
-    int grid[N][N];
-
-    initializeGrid(grid);
+    int grid[MAX_CELLS];
 
-    if (readCNFToGrid(cnfFile, grid) != 0)
+    int n = readCNFToGrid(cnfFile, grid);
+    if (!n)
     {
         return 1;
     }
 
-    printGridToFile(grid, outputFile);
+    printGridToFile(n, grid, outputFile);
     printf("Puzzle parsed and grid generated, saved to: %s\n", outputFile);
 
     return 0;
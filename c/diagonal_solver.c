@@ -0,0 +1,240 @@
+// diagonal_solver.c
+// n x n 对角线数独的专用求解器：每行、每列、每宫与两条对角线各用一个 n 位掩码记录已填的数字，
+// 单元格的候选数为所在各组掩码之并的补集。反复填入唯一候选数（naked single）与
+// 组内唯一位置（hidden single），无法继续时在候选数最少的单元格上分支。
+// DiagonalSolveMany 在一次调用中依次求解连续存放的多道题目，也可以去掉对角线约束求解普通数独。
+
+#include "head.h"
+
+#define MAX_CELL_GROUPS 5 // 中心格同时属于行、列、宫与两条对角线
+
+// 搜索时每层复制一份盘面，单元格用 unsigned char 存放以减小复制量
+typedef struct DiagonalBoard
+{
+    unsigned char cells[MAX_CELLS]; // 0 表示空格
+    unsigned int used[MAX_GROUPS];  // 各组已填数字的掩码，第 d - 1 位表示数字 d
+    int empty;                      // 空格数
+} DiagonalBoard;
+
+// 一次求解所用的表格与搜索结点预算。放在调用者的栈上而不用全局变量：
+// ctypes 调用时释放 GIL，多个线程可能同时求解不同边长或规则的题目
+typedef struct DiagonalContext
+{
+    int size, cells, groups, all_digits;                // n、n * n、组数（3n + 2，普通数独为 3n）与 n 位全 1 的掩码
+    int cell_groups[MAX_CELLS][MAX_CELL_GROUPS + 1];    // 每个单元格所属的组，以 -1 结尾
+    int group_cells[MAX_GROUPS][MAX_N];                 // 每组的 n 个单元格
+    long long nodes_left;                               // 剩余可搜索的结点数，小于 0 表示不限
+} DiagonalContext;
+
+// 建立 n x n 盘面中单元格与组之间的对应关系，diagonal 为 0 时不含两条对角线
+static void BuildTables(DiagonalContext *C, int n, int diagonal)
+{
+    int group_size[MAX_GROUPS] = {0};
+    C->size = n;
+    C->cells = n * n;
+    C->groups = diagonal ? 3 * n + 2 : 3 * n;
+    C->all_digits = (int)((1u << n) - 1);
+    for (int cell = 0; cell < C->cells; cell++)
+    {
+        int *groups = C->cell_groups[cell];
+        int k = CellGroups(n, cell, groups);
+        if (!diagonal)
+            k = 3; // 对角线的组排在行、列、宫之后
+        for (int i = 0; i < k; i++)
+            C->group_cells[groups[i]][group_size[groups[i]]++] = cell;
+        groups[k] = -1;
+    }
+}
+
+// 单元格当前的候选数掩码
+static int Candidates(const DiagonalContext *C, const DiagonalBoard *B, int cell)
+{
+    int used = 0;
+    for (const int *g = C->cell_groups[cell]; *g >= 0; g++)
+        used |= B->used[*g];
+    return ~used & C->all_digits;
+}
+
+// 在单元格中填入数字，与所在组冲突时返回 ERROR
+static status Place(const DiagonalContext *C, DiagonalBoard *B, int cell, int digit)
+{
+    int bit = 1 << (digit - 1);
+    for (const int *g = C->cell_groups[cell]; *g >= 0; g++)
+        if (B->used[*g] & bit)
+            return ERROR;
+    for (const int *g = C->cell_groups[cell]; *g >= 0; g++)
+        B->used[*g] |= bit;
+    B->cells[cell] = digit;
+    B->empty--;
+    return OK;
+}
+
+// 反复填入唯一候选数与组内唯一位置，出现矛盾时返回 ERROR
+static status Propagate(const DiagonalContext *C, DiagonalBoard *B)
+{
+    int changed = 1;
+    while (changed && B->empty > 0)
+    {
+        changed = 0;
+        for (int cell = 0; cell < C->cells; cell++)
+        {
+            if (B->cells[cell])
+                continue;
+            int candidates = Candidates(C, B, cell);
+            if (!candidates)
+                return ERROR;
+            if (!(candidates & (candidates - 1)))
+            {
+                Place(C, B, cell, __builtin_ctz(candidates) + 1);
+                changed = 1;
+            }
+        }
+        for (int group = 0; group < C->groups; group++)
+        {
+            // once 为恰有一个位置可填的数字，twice 为至少有两个位置可填的数字
+            int once = 0, twice = 0;
+            for (int i = 0; i < C->size; i++)
+            {
+                int cell = C->group_cells[group][i];
+                if (B->cells[cell])
+                    continue;
+                int candidates = Candidates(C, B, cell);
+                twice |= once & candidates;
+                once |= candidates;
+            }
+            if ((once | (int)B->used[group]) != C->all_digits)
+                return ERROR; // 某个数字在组内已无位置可填
+            once &= ~twice;
+            for (int i = 0; i < C->size && once; i++)
+            {
+                int cell = C->group_cells[group][i];
+                if (B->cells[cell])
+                    continue;
+                int single = Candidates(C, B, cell) & once;
+                if (!single)
+                    continue;
+                if (single & (single - 1))
+                    return ERROR; // 同一格是两个数字的唯一位置
+                Place(C, B, cell, __builtin_ctz(single) + 1);
+                once &= ~single;
+                changed = 1;
+            }
+        }
+    }
+    return OK;
+}
+
+// 深度优先搜索，找到的解数达到 limit 或结点数用完时停止，第一个解写入 solution
+static void Search(DiagonalContext *C, DiagonalBoard *B, int *solution, int limit, int *count)
+{
+    if (C->nodes_left == 0 || (C->nodes_left > 0 && --C->nodes_left == 0))
+        return;
+    if (Propagate(C, B) == ERROR)
+        return;
+    if (B->empty == 0)
+    {
+        if ((*count)++ == 0 && solution)
+            for (int cell = 0; cell < C->cells; cell++)
+                solution[cell] = B->cells[cell];
+        return;
+    }
+
+    // 选择候选数最少的空格
+    int best = -1, best_count = C->size + 1;
+    for (int cell = 0; cell < C->cells && best_count > 2; cell++)
+    {
+        if (B->cells[cell])
+            continue;
+        int n = __builtin_popcount(Candidates(C, B, cell));
+        if (n < best_count)
+        {
+            best = cell;
+            best_count = n;
+        }
+    }
+
+    int candidates = Candidates(C, B, best);
+    while (candidates && *count < limit && C->nodes_left != 0)
+    {
+        int digit = __builtin_ctz(candidates) + 1;
+        candidates &= candidates - 1;
+        DiagonalBoard next = *B;
+        Place(C, &next, best, digit);
+        Search(C, &next, solution, limit, count);
+    }
+}
+
+// 用已建立的表格求解一道题目，参数与返回值同 DiagonalCount
+static int Count(DiagonalContext *C, const int *puzzle, int *solution, int limit, long long max_nodes)
+{
+    DiagonalBoard B;
+    memset(&B, 0, sizeof(B));
+    B.empty = C->cells;
+    for (int cell = 0; cell < C->cells; cell++)
+    {
+        if (puzzle[cell] == 0)
+            continue;
+        if (puzzle[cell] < 0 || puzzle[cell] > C->size || Place(C, &B, cell, puzzle[cell]) == ERROR)
+            return 0;
+    }
+
+    int count = 0;
+    limit = limit < 1 ? 1 : limit;
+    C->nodes_left = max_nodes > 0 ? max_nodes : -1;
+    Search(C, &B, solution, limit, &count);
+    return count < limit && C->nodes_left == 0 ? -1 : count;
+}
+
+// 按边长与规则建立表格后求解一道题目
+static int CountWithRules(int n, int diagonal, const int *puzzle, int *solution, int limit, long long max_nodes)
+{
+    DiagonalContext C;
+    BuildTables(&C, n, diagonal);
+    return Count(&C, puzzle, solution, limit, max_nodes);
+}
+
+// 求解以行优先存放的 n * n 个数字（0 表示空格）构成的对角线数独，n 为 4、9、16 或 25。
+// 返回找到的解数（不超过 limit），有解时第一个解写入 solution（可为 NULL）；max_nodes 大于 0 时
+// 最多搜索这么多个结点，用完时还没有数到 limit 个解则返回 -1。
+// 边长不受支持、题目中的数字超出范围或彼此冲突时返回 0。
+int DiagonalCount(int n, const int *puzzle, int *solution, int limit, long long max_nodes)
+{
+    if (!BoxSize(n))
+        return 0;
+    return CountWithRules(n, 1, puzzle, solution, limit, max_nodes);
+}
+
+// 不限搜索结点数的 DiagonalCount
+int DiagonalSolve(int n, const int *puzzle, int *solution, int limit)
+{
+    return DiagonalCount(n, puzzle, solution, limit, 0);
+}
+
+// 依次求解 count 道 n x n 题目：puzzles 中每道题占 n * n 个字节（行优先，每字节为 0 到 n，0 表示空格），
+// 解写入 solutions 中相同的位置，无解的题目对应的字节全为 0。diagonal 为 0 时按普通数独（不含对角线约束）求解。
+// 一次调用求解一批题目，表格按 (n, diagonal) 在本次调用中只建立一次，省去逐题调用与建表的开销。
+// 返回有解的题目数，边长不受支持时返回 -1
+int DiagonalSolveMany(int n, int diagonal, const unsigned char *puzzles, int count, unsigned char *solutions)
+{
+    if (!BoxSize(n))
+        return -1;
+    DiagonalContext C;
+    BuildTables(&C, n, diagonal != 0);
+    int cells = C.cells, puzzle[MAX_CELLS], solution[MAX_CELLS], solved = 0;
+    for (int i = 0; i < count; i++)
+    {
+        const unsigned char *in = puzzles + (size_t)i * cells;
+        unsigned char *out = solutions + (size_t)i * cells;
+        for (int cell = 0; cell < cells; cell++)
+            puzzle[cell] = in[cell];
+        if (Count(&C, puzzle, solution, 1, 0) == 1)
+        {
+            for (int cell = 0; cell < cells; cell++)
+                out[cell] = (unsigned char)solution[cell];
+            solved++;
+        }
+        else
+            memset(out, 0, cells);
+    }
+    return solved;
+}
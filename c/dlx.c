@@ -0,0 +1,169 @@
+// dlx.c
+// n x n 对角线数独的精确覆盖模型，用舞蹈链（Dancing Links, DLX）统计解的个数。
+// 每个候选行对应“在 (r, c) 填入 d”，覆盖以下各列（每类 n * n 列，对角线共 2n 列）：
+//   单元格 (r, c)、第 r 行的数字 d、第 c 列的数字 d、所在宫的数字 d，
+//   以及位于主对角线或副对角线上时该对角线的数字 d。
+
+#include "head.h"
+
+#define DLX_MAX_COLUMNS (4 * MAX_CELLS + 2 * MAX_N)
+#define DLX_MAX_ROW_NODES 6 // 中心格的候选行覆盖 6 列
+#define DLX_MAX_NODES (DLX_MAX_COLUMNS + 1 + MAX_CELLS * MAX_N * DLX_MAX_ROW_NODES)
+
+// 节点 0 为根，1 到 columns 为列头，其余为候选行中的节点
+typedef struct Dlx
+{
+    int left[DLX_MAX_NODES], right[DLX_MAX_NODES];
+    int up[DLX_MAX_NODES], down[DLX_MAX_NODES];
+    int column[DLX_MAX_NODES];       // 节点所在的列头
+    int size[DLX_MAX_COLUMNS + 1];   // 每列剩余的节点数
+    int taken[DLX_MAX_COLUMNS + 1];  // 已被题目中的数字覆盖的列
+    int row_first[MAX_CELLS * MAX_N]; // 每个候选行的第一个节点
+    int columns;                     // 列数
+    int nodes;
+} Dlx;
+
+static Dlx dlx; // 每次计数时重新建立，程序中同时只有一个计数在进行
+
+// 建立 columns 列的空列头链表
+static void DlxInit(Dlx *D, int columns)
+{
+    D->columns = columns;
+    for (int c = 0; c <= columns; c++)
+    {
+        D->left[c] = c == 0 ? columns : c - 1;
+        D->right[c] = c == columns ? 0 : c + 1;
+        D->up[c] = D->down[c] = c;
+        D->column[c] = c;
+        D->size[c] = 0;
+        D->taken[c] = 0;
+    }
+    D->nodes = columns + 1;
+}
+
+// 加入一个覆盖 columns[0..n-1]（从 0 开始编号）的候选行
+static void DlxAddRow(Dlx *D, int id, const int *columns, int n)
+{
+    int first = D->nodes;
+    for (int i = 0; i < n; i++)
+    {
+        int node = D->nodes++, c = columns[i] + 1;
+        D->column[node] = c;
+        D->up[node] = D->up[c];
+        D->down[node] = c;
+        D->down[D->up[c]] = node;
+        D->up[c] = node;
+        D->size[c]++;
+        D->left[node] = first + (i + n - 1) % n;
+        D->right[node] = first + (i + 1) % n;
+    }
+    D->row_first[id] = first;
+}
+
+// 从列头链表中删去第 c 列，并删去与该列相交的全部候选行
+static void DlxCover(Dlx *D, int c)
+{
+    D->right[D->left[c]] = D->right[c];
+    D->left[D->right[c]] = D->left[c];
+    for (int i = D->down[c]; i != c; i = D->down[i])
+        for (int j = D->right[i]; j != i; j = D->right[j])
+        {
+            D->down[D->up[j]] = D->down[j];
+            D->up[D->down[j]] = D->up[j];
+            D->size[D->column[j]]--;
+        }
+}
+
+// DlxCover 的逆操作，按相反的顺序恢复
+static void DlxUncover(Dlx *D, int c)
+{
+    for (int i = D->up[c]; i != c; i = D->up[i])
+        for (int j = D->left[i]; j != i; j = D->left[j])
+        {
+            D->size[D->column[j]]++;
+            D->down[D->up[j]] = j;
+            D->up[D->down[j]] = j;
+        }
+    D->right[D->left[c]] = c;
+    D->left[D->right[c]] = c;
+}
+
+// 算法 X：每次选择剩余节点最少的列，解的个数达到 limit 时停止
+static void DlxSearch(Dlx *D, int limit, int *count)
+{
+    if (D->right[0] == 0)
+    {
+        (*count)++;
+        return;
+    }
+
+    int best = D->right[0];
+    for (int c = D->right[best]; c != 0; c = D->right[c])
+        if (D->size[c] < D->size[best])
+            best = c;
+    if (D->size[best] == 0)
+        return;
+
+    DlxCover(D, best);
+    for (int r = D->down[best]; r != best && *count < limit; r = D->down[r])
+    {
+        for (int j = D->right[r]; j != r; j = D->right[j])
+            DlxCover(D, D->column[j]);
+        DlxSearch(D, limit, count);
+        for (int j = D->left[r]; j != r; j = D->left[j])
+            DlxUncover(D, D->column[j]);
+    }
+    DlxUncover(D, best);
+}
+
+// 统计 n x n 对角线数独 grid（行优先，0 表示空格）的解的个数，最多数到 limit。
+// 题目中的数字超出范围或彼此冲突时返回 0。
+int DlxCountSolutions(int n, const int *grid, int limit)
+{
+    Dlx *D = &dlx;
+    int box = BoxSize(n), cells = n * n;
+    int row_base = cells, col_base = 2 * cells, box_base = 3 * cells, diag_base = 4 * cells;
+    DlxInit(D, 4 * cells + 2 * n);
+    for (int r = 0; r < n; r++)
+        for (int c = 0; c < n; c++)
+            for (int d = 0; d < n; d++)
+            {
+                int columns[DLX_MAX_ROW_NODES], k = 0;
+                columns[k++] = r * n + c;
+                columns[k++] = row_base + r * n + d;
+                columns[k++] = col_base + c * n + d;
+                columns[k++] = box_base + ((r / box) * box + c / box) * n + d;
+                if (r == c)
+                    columns[k++] = diag_base + d;
+                if (r + c == n - 1)
+                    columns[k++] = diag_base + n + d;
+                DlxAddRow(D, (r * n + c) * n + d, columns, k);
+            }
+
+    // 题目中已有的数字直接选入覆盖
+    for (int cell = 0; cell < cells; cell++)
+    {
+        int d = grid[cell];
+        if (d == UNASSIGNED)
+            continue;
+        if (d < 1 || d > n)
+            return 0;
+        int first = D->row_first[cell * n + d - 1], j = first;
+        do
+        {
+            if (D->taken[D->column[j]])
+                return 0;
+            j = D->right[j];
+        } while (j != first);
+        do
+        {
+            D->taken[D->column[j]] = 1;
+            DlxCover(D, D->column[j]);
+            j = D->right[j];
+        } while (j != first);
+    }
+
+    int count = 0;
+    DlxSearch(D, limit < 1 ? 1 : limit, &count);
+    return count;
+}
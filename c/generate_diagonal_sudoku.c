@@ -2,293 +2,169 @@
 
 #include "head.h"
 
+#ifdef _WIN32
+#include <process.h>
+#define getpid _getpid
+#else
+#include <unistd.h>
+#endif
+
 int solutionCount; // 全局变量来计数解的数量
+int useBacktracking = 0; // 为 1 时用逐格回溯代替 DLX 检查唯一解（-b 选项）
+const char *mapFile = NULL; // 指定时输出代入已知数后的剩余公式与变元映射（-m 选项）
+AmoEncoding amoEncoding = AMO_PAIRWISE; // 至多一个约束的编码（-a 选项）
+int n = DEFAULT_N; // 盘面边长（-s 选项）
+int box = 3;       // 宫的边长
+
+#define FILL_NODES 20000        // 补全盘面时最多搜索的结点数
+#define UNIQUE_CHECK_NODES 500 // 大盘面检查唯一解时最多搜索的结点数
 
-// 检查数字 num 能否放置在 grid[row][col]
-int isSafe(int grid[N][N], int row, int col, int num)
+// 检查数字 num 能否放置在 (row, col)，grid 行优先存放
+int isSafe(const int *grid, int row, int col, int num)
 {
     int x, y;
-    for (x = 0; x < N; x++)
-        if (grid[row][x] == num || grid[x][col] == num)
+    for (x = 0; x < n; x++)
+        if (grid[row * n + x] == num || grid[x * n + col] == num)
             return 0;
 
-    int startRow = row - row % 3, startCol = col - col % 3;
-    for (x = 0; x < 3; x++)
-        for (y = 0; y < 3; y++)
-            if (grid[x + startRow][y + startCol] == num)
+    int startRow = row - row % box, startCol = col - col % box;
+    for (x = 0; x < box; x++)
+        for (y = 0; y < box; y++)
+            if (grid[(x + startRow) * n + y + startCol] == num)
                 return 0;
 
-
-    return 1;
-}
-
-// 递归填充数独元素
-int fillSudoku(int grid[N][N], int row, int col)
-{
-    if (row == N - 1 && col == N)
-        return 1;
-    if (col == N)
+    // 对角线约束：两条对角线上的数字也不能重复
+    for (x = 0; x < n; x++)
     {
-        row++;
-        col = 0;
+        if (row == col && grid[x * n + x] == num)
+            return 0;
+        if (row + col == n - 1 && grid[x * n + n - 1 - x] == num)
+            return 0;
     }
-    if (grid[row][col] != UNASSIGNED)
-        return fillSudoku(grid, row, col + 1);
 
-    int num;
-    for (num = 1; num <= N; num++)
-    {
-        if (isSafe(grid, row, col, num))
-        {
-            grid[row][col] = num;
-            if (fillSudoku(grid, row, col + 1))
-                return 1;
-        }
-        grid[row][col] = UNASSIGNED;
-    }
-    return 0;
+    return 1;
 }
 
 // 计算数独的解的数量
-void solveWithCount(int grid[N][N], int row, int col)
+void solveWithCount(int *grid, int row, int col)
 {
-    if (row == N - 1 && col == N)
+    if (row == n - 1 && col == n)
     {
         solutionCount++;
         return;
     }
-    if (col == N)
+    if (col == n)
     {
         row++;
         col = 0;
     }
-    if (grid[row][col] != UNASSIGNED)
+    if (grid[row * n + col] != UNASSIGNED)
     {
         solveWithCount(grid, row, col + 1);
         return;
     }
 
     int num;
-    for (num = 1; num <= N && solutionCount < 2; num++) // 只计算到两个解即可
+    for (num = 1; num <= n && solutionCount < 2; num++) // 只计算到两个解即可
     {
         if (isSafe(grid, row, col, num))
         {
-            grid[row][col] = num;
+            grid[row * n + col] = num;
             solveWithCount(grid, row, col + 1);
         }
-        grid[row][col] = UNASSIGNED;
+        grid[row * n + col] = UNASSIGNED;
     }
 }
 
-// 验证当前数独是否只有一个解
-int isUniqueSolution(int grid[N][N])
+// 验证当前数独是否只有一个解。16x16 以上的盘面空格多，DLX 的精确覆盖搜索分支过多，
+// 改用带唯一候选数与隐性唯一推理的对角线数独求解器数解，并限制搜索的结点数：
+// 限制内未能确定解数的盘面当作不唯一，这一格不挖
+int isUniqueSolution(int *grid)
 {
+    if (!useBacktracking && n > DEFAULT_N)
+        return DiagonalCount(n, grid, NULL, 2, UNIQUE_CHECK_NODES) == 1;
+    if (!useBacktracking)
+        return DlxCountSolutions(n, grid, 2) == 1;
     solutionCount = 0;
     solveWithCount(grid, 0, 0);
     return solutionCount == 1;
 }
 
 // 随机生成第一行
-void randomFirstRow(int grid[N][N])
+void randomFirstRow(int *grid)
 {
     int i, j;
-    int row[N];
-    srand((unsigned)time(NULL));
 
-    for (i = 0; i < N; i++)
+    for (i = 0; i < n; i++)
     {
-        row[i] = rand() % 9 + 1;
+        grid[i] = rand() % n + 1;
         j = 0;
         while (j < i)
         {
-            if (row[i] == row[j])
+            if (grid[i] == grid[j])
             {
-                row[i] = rand() % 9 + 1;
+                grid[i] = rand() % n + 1;
                 j = 0;
             }
             else
                 j++;
         }
     }
-
-    for (i = 0; i < N; i++)
-        grid[0][i] = row[i];
 }
 
-// 随机生成初盘，确保唯一解
-void createStartingGrid(int grid[N][N], int holes)
+// 随机生成第一行后用对角线数独求解器补全整个盘面，第一行无法补全或搜索结点数用完时换一行重试
+void fillGrid(int *grid)
 {
-    int x, y;
-    int attempts = 0; // 增加尝试次数计数
-
-    while (holes > 0) // 限制最大尝试次数为100
+    int first[MAX_CELLS];
+    do
     {
-        x = rand() % N;
-        y = rand() % N;
-
-        if (grid[x][y] == UNASSIGNED)
-        {
-            attempts++;
-            continue; // 如果该位置已经是空格，则跳过
-        }
-
-        int backup = grid[x][y];
-        grid[x][y] = UNASSIGNED;
-
-        if (!isUniqueSolution(grid))
-        {
-            grid[x][y] = backup; // 如果不是唯一解，撤销操作
-            attempts++;          // 增加尝试次数
-        }
-        else
-        {
-            holes--;
-        }
-    }
+        memset(first, 0, sizeof(first));
+        randomFirstRow(first);
+    } while (DiagonalCount(n, first, grid, 1, FILL_NODES) != 1);
 }
 
-// 将语义编码转换为自然编码
-int semanticToNatural(int i, int j, int k)
+// 随机生成初盘，确保唯一解。按随机顺序逐格尝试挖去，每格只试一次：
+// 挖去某格后不唯一的盘面再多挖几格仍不唯一，失败的格子不必再试。所有格子都试过仍不够时按已挖的洞数结束
+void createStartingGrid(int *grid, int holes)
 {
-    return ((i - 1) * 81 + (j - 1) * 9 + k);
-}
+    int order[MAX_CELLS];
+    int cells = n * n, tried;
+    for (int i = 0; i < cells; i++)
+        order[i] = i;
 
-// 将自然编码转换为语义编码
-void naturalToSemantic(int code, int *i, int *j, int *k)
-{
-    // 计算 k
-    *k = (code % 9 == 0) ? 9 : code % 9;
-
-    // 计算 i
-    *i = (code - *k) / 81 + 1;
-
-    // 计算 j
-    *j = ((code - (*i - 1) * 81 - *k) / 9) + 1;
-}
-
-// 生成单元格约束
-void addCellConstraints(FILE *file_nat)
-{
-    for (int i = 1; i <= 9; i++)
+    for (tried = 0; tried < cells && holes > 0; tried++)
     {
-        for (int j = 1; j <= 9; j++)
-        {
-            // 至少填入一个数字的子句
-            for (int k = 1; k <= 9; k++)
-            {
-                fprintf(file_nat, "%d ", semanticToNatural(i, j, k));
-            }
-            fprintf(file_nat, "0\n");
+        // 从尚未尝试的格子中随机取一个
+        int j = tried + rand() % (cells - tried);
+        int cell = order[j];
+        order[j] = order[tried];
+        order[tried] = cell;
 
-            // 互斥性子句，确保每个单元格只能填一个数字
-            for (int k1 = 1; k1 <= 8; k1++)
-            {
-                for (int k2 = k1 + 1; k2 <= 9; k2++)
-                {
-                    fprintf(file_nat, "-%d -%d 0\n", semanticToNatural(i, j, k1), semanticToNatural(i, j, k2));
-                }
-            }
-        }
-    }
-}
-
-// 生成行、列和3x3子盒约束
-void addRowColumnBoxConstraints(FILE *file_nat)
-{
-    // 行约束和列约束
-    for (int num = 1; num <= 9; num++)
-    {
-        for (int i = 1; i <= 9; i++)
-        {
-            // 行约束：每行包含1到9
-            for (int j = 1; j <= 9; j++)
-            {
-                fprintf(file_nat, "%d ", semanticToNatural(i, j, num));
-            }
-            fprintf(file_nat, "0\n");
+        int backup = grid[cell];
+        grid[cell] = UNASSIGNED;
 
-            // 列约束：每列包含1到9
-            for (int j = 1; j <= 9; j++)
-            {
-                fprintf(file_nat, "%d ", semanticToNatural(j, i, num));
-            }
-            fprintf(file_nat, "0\n");
-
-            // 互斥性约束：行和列中每个数字不重复
-            for (int j1 = 1; j1 <= 8; j1++)
-            {
-                for (int j2 = j1 + 1; j2 <= 9; j2++)
-                {
-                    fprintf(file_nat, "-%d -%d 0\n", semanticToNatural(i, j1, num), semanticToNatural(i, j2, num)); // 行互斥
-                    fprintf(file_nat, "-%d -%d 0\n", semanticToNatural(j1, i, num), semanticToNatural(j2, i, num)); // 列互斥
-                }
-            }
-        }
-    }
-
-    // 3x3子盒约束
-    for (int num = 1; num <= 9; num++)
-    {
-        for (int boxRow = 0; boxRow < 3; boxRow++)
-        {
-            for (int boxCol = 0; boxCol < 3; boxCol++)
-            {
-                for (int i = 1; i <= 3; i++)
-                {
-                    for (int j = 1; j <= 3; j++)
-                    {
-                        fprintf(file_nat, "%d ", semanticToNatural(boxRow * 3 + i, boxCol * 3 + j, num));
-                    }
-                }
-                fprintf(file_nat, "0\n");
-
-                // 3x3 子盒的唯一性约束
-                for (int i1 = 1; i1 <= 3; i1++)
-                {
-                    for (int j1 = 1; j1 <= 3; j1++)
-                    {
-                        for (int i2 = i1; i2 <= 3; i2++)
-                        {
-                            for (int j2 = (i1 == i2 ? j1 + 1 : 1); j2 <= 3; j2++)
-                            {
-                                fprintf(file_nat, "-%d -%d 0\n", semanticToNatural(boxRow * 3 + i1, boxCol * 3 + j1, num), semanticToNatural(boxRow * 3 + i2, boxCol * 3 + j2, num));
-                            }
-                        }
-                    }
-                }
-            }
-        }
+        if (!isUniqueSolution(grid))
+            grid[cell] = backup; // 如果不是唯一解，撤销操作
+        else
+            holes--;
     }
+    if (holes > 0)
+        printf("Stopped digging after trying all %d cells, %d holes short.\n", cells, holes);
 }
 
 void createSudokuToCNF(const char *semanticFile, const char *naturalFile, int holes)
 {
-    int grid[N][N] = {0};
-    randomFirstRow(grid);   // 随机生成第一行
-    fillSudoku(grid, 1, 0); // 递归生成后续行
+    int grid[MAX_CELLS] = {0};
+    fillGrid(grid);
 
     printf("Initial Sudoku Grid after filling:\n");
-    for (int i = 0; i < N; i++)
-    {
-        for (int j = 0; j < N; j++)
-        {
-            printf("%d ", grid[i][j]);
-        }
-        printf("\n");
-    }
+    PrintGrid(stdout, n, grid);
 
     // 生成初盘，确保唯一解
     createStartingGrid(grid, holes);
 
     printf("Sudoku Grid after creating starting grid with holes:\n");
-    for (int i = 0; i < N; i++)
-    {
-        for (int j = 0; j < N; j++)
-        {
-            printf("%d ", grid[i][j]);
-        }
-        printf("\n");
-    }
+    PrintGrid(stdout, n, grid);
 
     // 输出为语义编码的CNF文件
     FILE *file_sem = fopen(semanticFile, "w");
@@ -306,22 +182,24 @@ void createSudokuToCNF(const char *semanticFile, const char *naturalFile, int ho
         return;
     }
 
-    for (int row = 0; row < N; row++)
+    WriteSemanticGivens(file_sem, n, grid);
+
+    // 自然编码的 CNF：完整编码中已知数为单子句；指定 -m 时只输出代入已知数后的剩余公式
+    FILE *file_map = NULL;
+    if (mapFile)
     {
-        for (int col = 0; col < N; col++)
+        file_map = fopen(mapFile, "w");
+        if (!file_map)
         {
-            if (grid[row][col] != UNASSIGNED)
-            {
-                fprintf(file_sem, "%d%d%d 0\n", row + 1, col + 1, grid[row][col]);
-                int natural_encoded = semanticToNatural(row + 1, col + 1, grid[row][col]);
-                fprintf(file_nat, "%d 0\n", natural_encoded);
-            }
+            printf("无法创建变元映射文件: %s\n", mapFile);
+            fclose(file_sem);
+            fclose(file_nat);
+            return;
         }
     }
-    // 添加数独约束子句
-    addCellConstraints(file_nat);
-    addRowColumnBoxConstraints(file_nat);
-
+    SudokuCnf(n, grid, file_nat, file_map, amoEncoding);
+    if (file_map)
+        fclose(file_map);
 
     fclose(file_sem);
     fclose(file_nat);
@@ -330,9 +208,49 @@ void createSudokuToCNF(const char *semanticFile, const char *naturalFile, int ho
 
 int main(int argc, char *argv[])
 {
+    const char *program = argv[0];
+    while (argc > 1 && argv[1][0] == '-')
+    {
+        if (strcmp(argv[1], "-b") == 0)
+            useBacktracking = 1;
+        else if (strcmp(argv[1], "-m") == 0 && argc > 2)
+        {
+            mapFile = argv[2];
+            argc--;
+            argv++;
+        }
+        else if (strcmp(argv[1], "-a") == 0 && argc > 2)
+        {
+            int amo = FindAmoEncoding(argv[2]);
+            if (amo < 0)
+            {
+                printf("Unknown at-most-one encoding: %s\n", argv[2]);
+                return 1;
+            }
+            amoEncoding = (AmoEncoding)amo;
+            argc--;
+            argv++;
+        }
+        else if (strcmp(argv[1], "-s") == 0 && argc > 2)
+        {
+            n = atoi(argv[2]);
+            box = BoxSize(n);
+            if (!box)
+            {
+                printf("Board size should be 4, 9, 16 or 25.\n");
+                return 1;
+            }
+            argc--;
+            argv++;
+        }
+        else
+            break;
+        argc--;
+        argv++;
+    }
     if (argc != 4)
     {
-        printf("Usage: %s <difficulty_level> <semantic_output.cnf> <natural_output.cnf>\n", argv[0]);
+        printf("Usage: %s [-b] [-s 4|9|16|25] [-m <map_output.map>] [-a pairwise|sequential|commander|product|native] <difficulty_level> <semantic_output.cnf> <natural_output.cnf>\n", program);
         return 1;
     }
 
@@ -340,7 +258,7 @@ int main(int argc, char *argv[])
     const char *semanticFile = argv[2];
     const char *naturalFile = argv[3];
 
-    // 根据难度生成挖洞数目
+    // 根据难度生成挖洞数目（9x9 盘面的数目，其他边长按格子数等比例换算）
     int maxHoles[] = {20, 30, 40, 50};
     int maxRange = 5;
     if (difficulty < 1 || difficulty > 4)
@@ -349,8 +267,10 @@ int main(int argc, char *argv[])
         return 1;
     }
 
-    srand((unsigned)time(NULL));
+    // 混入进程号，同一秒内并行启动的多个生成进程也得到不同的题目
+    srand((unsigned)time(NULL) ^ ((unsigned)getpid() << 16));
     int holes = maxHoles[difficulty - 1] - (rand() % (maxRange * 2 + 1) - maxRange);
+    holes = holes * n * n / (DEFAULT_N * DEFAULT_N);
 
     createSudokuToCNF(semanticFile, naturalFile, holes);
     return 0;
@@ -3,6 +3,7 @@
 #ifndef HEAD_H
 #define HEAD_H
 
+#include <limits.h>
 #include <math.h>
 #include <stdbool.h>
 #include <stdio.h>
@@ -17,40 +18,69 @@ typedef int status;
 #define ERROR 0
 #define FOUND 1
 #define NOTFOUND 0
+#define UNKNOWN 2 // 到达资源限制，未得出结论
 #define UNASSIGNED 0
 #define YES 1
 #define NO 0
-#define N 9 // 数独的大小
+#define DEFAULT_N 9 // 默认的盘面边长
+#define MAX_N 25    // 支持的最大盘面边长，边长须为 4、9、16 或 25（宫的边长为其平方根）
+#define MAX_CELLS (MAX_N * MAX_N)
+#define MAX_GROUPS (3 * MAX_N + 2)
+
+// 盘面以 n * n 个整数行优先存放，0 表示空格。
+// 自然编码：第 row 行第 col 列（从 0 开始）填入 digit 对应变元 (row * n + col) * n + digit，与边长无关地连续编号。
+// 语义编码：(row + 1) * B * B + (col + 1) * B + digit，B 为大于 n 的最小的 10 的幂，
+// 9x9 时即 “行列数” 三位数；语义编码的文件以 “c size n” 注释行记录边长，没有该行时为 9x9
 
 // 定义数据结构
-typedef struct LiteralNode
+// CNF 公式以 CSR 形式存放：第 c 个子句为 lits[offsets[c]] 到 lits[offsets[c + 1] - 1]。
+// 文件中以 e 开头的行（如 "e 1 2 3 0"）为恰好一个约束，与普通子句一起存放，
+// 其序号记录在 exactly_one 中；不认识这种约束的程序把它当作“至少一个”的子句
+typedef struct CnfFormula
 {
-    int data;
-    struct LiteralNode *right;
-} LiteralNode;
+    int num_vars;        // 变元数，取 p 行与实际出现的最大变元中较大者
+    int num_clauses;     // 子句数，含恰好一个约束
+    int num_lits;        // 文字总数（不含子句结尾的 0）
+    int *lits;           // 全部文字，按子句顺序连续存放
+    int *offsets;        // 子句起点，共 num_clauses + 1 项
+    int num_exactly_one; // 恰好一个约束的个数
+    int *exactly_one;    // 恰好一个约束的子句序号，升序
+} CnfFormula;
 
-typedef struct ClauseNode
+// 数独编码中“至多一个”约束的写法，AMO_NATIVE 直接写为求解器支持的恰好一个约束
+typedef enum AmoEncoding
 {
-    struct LiteralNode *right;
-    struct ClauseNode *down;
-} ClauseNode;
+    AMO_PAIRWISE,   // 两两互斥，不引入辅助变元
+    AMO_SEQUENTIAL, // 序列计数器
+    AMO_COMMANDER,  // commander 编码，每组 3 个变元
+    AMO_PRODUCT,    // product 编码
+    AMO_NATIVE,     // 原生恰好一个约束（e 行）
+    AMO_COUNT
+} AmoEncoding;
+
+extern const char *AmoEncodingNames[AMO_COUNT];
 
 // 函数声明
-ClauseNode *AddClause(ClauseNode *s, int var);
-ClauseNode *IsUnitClause(ClauseNode *s);
-ClauseNode *CopyS(ClauseNode *s);
-ClauseNode *CopyClause(ClauseNode *s);
-ClauseNode *DeleteClause(ClauseNode *s);
-ClauseNode *DeleteLiteral(ClauseNode *s, int var);
-status Print(ClauseNode *s);
-status IsEmptyClause(ClauseNode *s);
-status RecordTruth(ClauseNode *s, int *truth_table);
-status RemoveVar(ClauseNode *s, int var);
-int PickVar(ClauseNode *s);
-ClauseNode *CnfParser(int *literal_num, char *filename, int *max_var);
-int PickVar_1(ClauseNode *s);
-int PickVar_2(ClauseNode *s);
-int PickVar_3(ClauseNode *s);
-void clause_print(ClauseNode *root, FILE *output_file);
+CnfFormula *CnfLoad(const char *filename);
+CnfFormula *CnfLoadCached(const char *filename, const char *cache_dir, long long max_bytes);
+void CnfFree(CnfFormula *F);
+void clause_print(const CnfFormula *F, FILE *output_file);
+int DiagonalSolve(int n, const int *puzzle, int *solution, int limit);
+int DiagonalCount(int n, const int *puzzle, int *solution, int limit, long long max_nodes);
+int DiagonalSolveMany(int n, int diagonal, const unsigned char *puzzles, int count, unsigned char *solutions);
+int DlxCountSolutions(int n, const int *grid, int limit);
+int FindAmoEncoding(const char *name);
+int SudokuCnf(int n, const int *grid, FILE *cnf_file, FILE *map_file, AmoEncoding amo);
+int BoxSize(int n);
+int CellGroups(int n, int cell, int groups[5]);
+int NaturalVar(int n, int row, int col, int digit);
+void NaturalDecode(int n, int var, int *row, int *col, int *digit);
+int SemanticBase(int n);
+int SemanticVar(int n, int row, int col, int digit);
+void SemanticDecode(int n, int lit, int *row, int *col, int *digit);
+int ReadGrid(FILE *file, int *grid);
+int ReadSemanticGrid(FILE *file, int *grid);
+void WriteSemanticGivens(FILE *file, int n, const int *grid);
+void PrintGrid(FILE *file, int n, const int *grid);
 
 #endif // HEAD_H
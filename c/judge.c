@@ -1,35 +1,42 @@
-#include <stdio.h>
-#include <stdlib.h>
-#include <stdbool.h>
+#include "head.h"
 
-#define N 9
-
-// 检查当前数字是否可以放在指定位置
-bool is_safe(int grid[N][N], int row, int col, int num) {
-    for (int x = 0; x < N; x++) {
+// 检查当前数字是否可以放在指定位置，grid 为行优先存放的 n x n 盘面
+bool is_safe(int n, const int *grid, int row, int col, int num) {
+    for (int x = 0; x < n; x++) {
         // 检查行和列
-        if (grid[row][x] == num || grid[x][col] == num) {
+        if (grid[row * n + x] == num || grid[x * n + col] == num) {
             return false;
         }
     }
 
-    // 检查3x3子方块
-    int start_row = row - row % 3, start_col = col - col % 3;
-    for (int i = 0; i < 3; i++) {
-        for (int j = 0; j < 3; j++) {
-            if (grid[i + start_row][j + start_col] == num) {
+    // 检查宫
+    int box = BoxSize(n);
+    int start_row = row - row % box, start_col = col - col % box;
+    for (int i = 0; i < box; i++) {
+        for (int j = 0; j < box; j++) {
+            if (grid[(i + start_row) * n + j + start_col] == num) {
                 return false;
             }
         }
     }
+
+    // 检查两条对角线
+    for (int i = 0; i < n; i++) {
+        if (row == col && grid[i * n + i] == num) {
+            return false;
+        }
+        if (row + col == n - 1 && grid[i * n + n - 1 - i] == num) {
+            return false;
+        }
+    }
     return true;
 }
 
 // 找到第一个未填的位置
-bool find_unassigned_location(int grid[N][N], int *row, int *col) {
-    for (*row = 0; *row < N; (*row)++) {
-        for (*col = 0; *col < N; (*col)++) {
-            if (grid[*row][*col] == 0) {
+bool find_unassigned_location(int n, const int *grid, int *row, int *col) {
+    for (*row = 0; *row < n; (*row)++) {
+        for (*col = 0; *col < n; (*col)++) {
+            if (grid[*row * n + *col] == 0) {
                 return true;
             }
         }
@@ -38,33 +45,39 @@ bool find_unassigned_location(int grid[N][N], int *row, int *col) {
 }
 
 // 解决数独问题，返回解决方案数量
-int solve_sudoku(int grid[N][N], int *solution_count) {
+int solve_sudoku(int n, int *grid, int *solution_count) {
     int row, col;
 
     // 如果没有未分配的空间，则解决方案已找到
-    if (!find_unassigned_location(grid, &row, &col)) {
+    if (!find_unassigned_location(n, grid, &row, &col)) {
         (*solution_count)++;
         return *solution_count > 1; // 超过1个解就停止搜索
     }
 
-    for (int num = 1; num <= 9; num++) {
-        if (is_safe(grid, row, col, num)) {
-            grid[row][col] = num;
+    for (int num = 1; num <= n; num++) {
+        if (is_safe(n, grid, row, col, num)) {
+            grid[row * n + col] = num;
 
             // 递归解决
-            if (solve_sudoku(grid, solution_count)) {
+            if (solve_sudoku(n, grid, solution_count)) {
                 return true;
             }
 
-            grid[row][col] = 0; // 撤销分配
+            grid[row * n + col] = 0; // 撤销分配
         }
     }
     return false;
 }
 
 int main(int argc, char *argv[]) {
+    // -b：用逐格回溯代替 DLX 统计解的个数
+    bool use_backtracking = argc == 3 && strcmp(argv[1], "-b") == 0;
+    if (use_backtracking) {
+        argc--;
+        argv++;
+    }
     if (argc != 2) {
-        printf("Usage: %s <input_file>\n", argv[0]);
+        printf("Usage: %s [-b] <input_file>\n", argv[0]);
         return 1;
     }
 
@@ -74,20 +87,21 @@ int main(int argc, char *argv[]) {
         return 1;
     }
 
-    int grid[N][N];
-    for (int i = 0; i < N; i++) {
-        for (int j = 0; j < N; j++) {
-            if (fscanf(file, "%d", &grid[i][j]) != 1) {
-                printf("Invalid input format\n");
-                fclose(file);
-                return 1;
-            }
-        }
-    }
+    // 盘面边长由数字个数确定（16、81、256 或 625 个）
+    int grid[MAX_CELLS];
+    int n = ReadGrid(file, grid);
     fclose(file);
+    if (!n) {
+        printf("Invalid input format\n");
+        return 1;
+    }
 
     int solution_count = 0;
-    solve_sudoku(grid, &solution_count);
+    if (use_backtracking) {
+        solve_sudoku(n, grid, &solution_count);
+    } else {
+        solution_count = DlxCountSolutions(n, grid, 2);
+    }
 
     if (solution_count == 0) {
         printf("No solution exists\n");
@@ -0,0 +1,215 @@
+// sat.h
+
+#ifndef SAT_H
+#define SAT_H
+
+#include "head.h"
+#include <limits.h>
+
+// 文字编码：变元 v 的正文字为 2v，负文字为 2v+1
+#define LIT(x) ((x) > 0 ? 2 * (x) : -2 * (x) + 1)
+#define LIT_VAR(l) ((l) >> 1)
+#define LIT_NEG(l) ((l) ^ 1)
+#define LIT_INT(l) (((l) & 1) ? -((l) >> 1) : ((l) >> 1))
+
+// 变元取值
+#define VAL_FALSE 0
+#define VAL_TRUE 1
+#define VAL_UNDEF -1
+
+#define NO_CONFLICT -1
+#define NO_REASON -1
+#define EO_CONFLICT -2          // 冲突来自恰好一个约束，冲突文字保存在 eo_conflict 中
+#define EO_REASON(e) (-3 - (e)) // 赋值由第 e 个恰好一个约束蕴含
+#define EO_INDEX(r) (-3 - (r))
+
+// 监视表：记录监视某个文字的子句编号
+typedef struct WatchList
+{
+    int *clauses;
+    int size;
+    int cap;
+} WatchList;
+
+typedef struct Solver Solver;
+typedef struct Preprocessor Preprocessor;
+
+// 预处理技术
+enum
+{
+    PRE_UNIT,       // 单子句传播
+    PRE_PURE,       // 纯文字消去
+    PRE_SUBSUME,    // 向后包含消去
+    PRE_STRENGTHEN, // 自包含归结强化
+    PRE_ELIMINATE,  // 有界变元消去
+    PRE_COUNT
+};
+
+#define PRE_DEFAULT_BUDGET_MS 1000.0
+
+// 每项技术的开关与时间预算（毫秒）
+typedef struct PreprocessOptions
+{
+    bool enabled[PRE_COUNT];
+    double budget_ms[PRE_COUNT];
+} PreprocessOptions;
+
+// 每项技术删去的子句数、变元数与文字数，由该技术导出的单子句的传播结果也计入其中
+typedef struct PreprocessStats
+{
+    int clauses_removed;
+    int clauses_added; // 变元消去加入的消解式
+    int vars_removed;
+    int lits_removed;
+    double ms;
+} PreprocessStats;
+
+// 求解的资源限制，各项为 0 时不限制。到达任一限制时求解器返回 UNKNOWN
+typedef struct SolverLimits
+{
+    double time_ms;      // 墙钟时间（毫秒），从求解器的 start_ms 起算
+    long long decisions; // 决策次数
+    long long conflicts; // 冲突次数
+    long long memory_mb; // 进程的常驻内存（MB）
+} SolverLimits;
+
+// 变元选择策略
+typedef struct Heuristic
+{
+    const char *name;
+    const char *description;
+    void (*init)(Solver *S);                               // 计算初始分数
+    int (*pick)(Solver *S);                                // 选取下一个决策变元
+    void (*on_learnt)(Solver *S, const int *lits, int n); // 学习到新子句时增量更新分数
+    bool bump_conflicts;                                   // 是否按冲突提高变元分数
+} Heuristic;
+
+// 基于双文字监视的求解器
+struct Solver
+{
+    int num_vars;
+    int num_clauses;
+
+    // 子句集连续存放：第 i 个子句的文字为 lits[clause_start[i]] 起的 clause_size[i] 个
+    // 每个子句的前两个文字即为其监视文字
+    int *lits;
+    int lits_size;
+    int lits_cap;
+    int *clause_start;
+    int *clause_size;
+    int *clause_lbd; // 学习子句的 LBD 值，原始子句为 0
+    int clauses_cap;
+    int num_learnts;
+
+    WatchList *watches; // 以文字为下标
+    signed char *value; // 以变元为下标，取值为 VAL_TRUE / VAL_FALSE / VAL_UNDEF
+
+    // 赋值轨迹：按赋值顺序保存所有已赋值的文字，qhead 之后的部分即为传播队列
+    int *trail;
+    int trail_size;
+    int qhead;
+    int *level;          // 以变元为下标，记录其被赋值时的决策层
+    int *reason;         // 以变元为下标，记录蕴含该赋值的子句，决策或顶层赋值为 NO_REASON
+    signed char *phase;  // 以变元为下标，保存变元最近一次的取值
+
+    // 变元选择策略的状态
+    const Heuristic *heuristic;
+    double *activity;    // 以变元为下标，变元的分数
+    double activity_inc;
+    double *lit_score;   // 以文字为下标，静态策略统计的文字分数
+    int *heap;           // 以分数为键的大根堆，存放候选变元
+    int heap_size;
+    int *heap_pos;       // 变元在堆中的位置，不在堆中为 -1
+    int next_var;        // 方案2的游标
+    int *first_lits;     // 原始方案：按读入时的顺序保存的原始子句（双文字监视会调换子句中文字的位置）
+    int *first_start;    // first_lits 中第 c 个子句的起点，共 first_clauses + 1 项
+    int first_clauses;
+    int moms_size;       // MOMS 统计的最短子句长度
+    int *trail_lim;      // 第 d 层决策文字在轨迹中的位置
+    bool *flipped;       // 第 d 层的决策是否已经尝试过相反取值
+    int levels_cap;      // trail_lim 与 flipped 的容量，带假设求解时超过变元数
+    int decision_level;
+    int max_learnts;     // 学习子句数超过该值时在重启时删去一半
+
+    // 恰好一个约束，由求解器直接传播：第 e 个约束的文字为 eo_lits[eo_start[e]] 起的 eo_size[e] 个，
+    // eo_occurs 以文字为下标记录含该文字的约束。某个文字为真时其余文字赋为假，
+    // 只剩一个文字未赋值且其余为假时将其赋为真
+    int num_eo;
+    int *eo_lits;
+    int eo_lits_size;
+    int eo_lits_cap;
+    int *eo_start;
+    int *eo_size;
+    int eo_cap;
+    WatchList *eo_occurs;
+    int *eo_cause;    // 以变元为下标，因约束中另一个文字为真而被赋为假时记录那个文字
+    int *eo_conflict; // 冲突时的冲突文字（均为假）
+    int eo_conflict_size;
+    int *explain;     // 把约束的蕴含解释为子句时使用的缓冲区
+    int explain_cap;  // eo_conflict 与 explain 的容量，不小于最长约束的长度
+
+    bool empty_clause; // 是否读入了空子句或在顶层出现冲突
+    char *seen;        // 添加子句时用于去重的标记数组
+
+    long long decisions;
+    long long propagations;
+    long long conflicts;
+    long long restarts;
+    long long learnts;
+
+    // 进度输出：progress_ms 大于 0 时每隔 progress_ms 毫秒输出一行 "c progress ..."
+    double progress_ms;
+    double next_progress; // 下一次输出进度的墙钟时间（毫秒）
+
+    // 资源限制：决策与冲突数每步比较，时钟与内存每 1024 步检查一次
+    SolverLimits limits;
+    double start_ms;         // 计时起点，默认为 SolverNew 时的墙钟时间
+    long long steps;         // 主循环的迭代次数
+    const char *stop_reason; // 到达的限制（time、decisions、conflicts、memory），未到达时为 NULL
+};
+
+Solver *SolverNew(int num_vars);
+void SolverFree(Solver *S);
+status SolverAddClause(Solver *S, const int *lits, int size);
+status SolverAddClauses(Solver *S, const int *lits, const int *offsets, int num_clauses);
+status SolverAddExactlyOne(Solver *S, const int *lits, int size);
+status SolverAddConstraints(Solver *S, const int *lits, const int *offsets, int num_clauses,
+                            const int *exactly_one, int num_exactly_one);
+const int *SolverExplain(Solver *S, int reason, int lit, int *size);
+status SolverSolve(Solver *S, const int *assumptions, int n);
+int SolverValue(Solver *S, int lit);
+status SolverAssign(Solver *S, int lit, int reason);
+int SolverPropagate(Solver *S);
+int SolverLitValue(Solver *S, int lit);
+void SolverNewDecision(Solver *S, int lit);
+void SolverBacktrack(Solver *S, int level);
+status SolverModel(Solver *S, int *truth_table);
+void SolverPrintStats(Solver *S, FILE *out);
+double WallClockMs(void);
+long long ResidentKb(void);
+
+extern const Heuristic Heuristics[];
+const Heuristic *FindHeuristic(const char *name);
+void SolverSetHeuristic(Solver *S, const Heuristic *h);
+void SolverLearntAdded(Solver *S, const int *lits, int n);
+void SolverBumpVar(Solver *S, int v);
+void SolverDecayActivity(Solver *S);
+void HeapInsert(Solver *S, int v);
+int PickVar(Solver *S);
+int PickVar_1(Solver *S);
+int PickVar_2(Solver *S);
+int PickVar_First(Solver *S);
+int PickVar_3(Solver *S);
+status DpllSolver(Solver *S);
+
+extern const char *PreprocessNames[PRE_COUNT];
+Preprocessor *PreprocessNew(const CnfFormula *F);
+void PreprocessFree(Preprocessor *P);
+status PreprocessParseOptions(PreprocessOptions *opt, const char *spec);
+status PreprocessRun(Preprocessor *P, const PreprocessOptions *opt);
+void PreprocessLoad(Preprocessor *P, Solver *S);
+void PreprocessExtendModel(Preprocessor *P, Solver *S);
+void PreprocessPrintStats(Preprocessor *P, const PreprocessOptions *opt, FILE *out);
+status CdclSolver(Solver *S);
+
+#endif // SAT_H
@@ -0,0 +1,357 @@
+// sat_heuristics.c
+
+#include "sat.h"
+
+// ---------- 以变元分数为键的二叉大根堆 ----------
+
+static bool HeapBetter(Solver *S, int a, int b)
+{
+    if (S->activity[a] != S->activity[b])
+        return S->activity[a] > S->activity[b];
+    return a < b;
+}
+
+static void HeapUp(Solver *S, int i)
+{
+    int v = S->heap[i];
+    while (i > 0)
+    {
+        int parent = (i - 1) / 2;
+        if (!HeapBetter(S, v, S->heap[parent]))
+            break;
+        S->heap[i] = S->heap[parent];
+        S->heap_pos[S->heap[i]] = i;
+        i = parent;
+    }
+    S->heap[i] = v;
+    S->heap_pos[v] = i;
+}
+
+static void HeapDown(Solver *S, int i)
+{
+    int v = S->heap[i];
+    while (2 * i + 1 < S->heap_size)
+    {
+        int child = 2 * i + 1;
+        if (child + 1 < S->heap_size && HeapBetter(S, S->heap[child + 1], S->heap[child]))
+            child++;
+        if (!HeapBetter(S, S->heap[child], v))
+            break;
+        S->heap[i] = S->heap[child];
+        S->heap_pos[S->heap[i]] = i;
+        i = child;
+    }
+    S->heap[i] = v;
+    S->heap_pos[v] = i;
+}
+
+// 将变元放回堆中（已在堆中则忽略）
+void HeapInsert(Solver *S, int v)
+{
+    if (S->heap_pos[v] >= 0)
+        return;
+    S->heap[S->heap_size] = v;
+    S->heap_pos[v] = S->heap_size++;
+    HeapUp(S, S->heap_pos[v]);
+}
+
+// 取出分数最高的变元
+static int HeapPop(Solver *S)
+{
+    int top = S->heap[0];
+    S->heap_pos[top] = -1;
+    if (--S->heap_size > 0)
+    {
+        S->heap[0] = S->heap[S->heap_size];
+        S->heap_pos[S->heap[0]] = 0;
+        HeapDown(S, 0);
+    }
+    return top;
+}
+
+// ---------- 分数维护 ----------
+
+// 由两个文字的分数得到变元分数
+static void UpdateVarScore(Solver *S, int v)
+{
+    double pos = S->lit_score[2 * v], neg = S->lit_score[2 * v + 1];
+    S->activity[v] = pos + neg;
+    if (S->heap_pos[v] >= 0)
+        HeapUp(S, S->heap_pos[v]);
+}
+
+// 提高变元分数，数值过大时整体缩小
+void SolverBumpVar(Solver *S, int v)
+{
+    if ((S->activity[v] += S->activity_inc) > 1e100)
+    {
+        for (int u = 1; u <= S->num_vars; u++)
+            S->activity[u] *= 1e-100;
+        S->activity_inc *= 1e-100;
+    }
+    if (S->heap_pos[v] >= 0)
+        HeapUp(S, S->heap_pos[v]);
+}
+
+// 每次冲突后增大增量，相当于让旧的分数逐渐衰减
+void SolverDecayActivity(Solver *S)
+{
+    S->activity_inc /= 0.95;
+}
+
+// 出现次数：每个文字的分数为其在子句中出现的次数
+static void CountOccurrence(Solver *S, const int *lits, int n)
+{
+    for (int k = 0; k < n; k++)
+        S->lit_score[lits[k]] += 1.0;
+}
+
+// Jeroslow-Wang：长度为 n 的子句为其中每个文字贡献 2^-n
+static void CountJeroslowWang(Solver *S, const int *lits, int n)
+{
+    double w = ldexp(1.0, -n);
+    for (int k = 0; k < n; k++)
+        S->lit_score[lits[k]] += w;
+}
+
+// MOMS：只统计最短子句中的出现次数
+static void CountMoms(Solver *S, const int *lits, int n)
+{
+    if (n > S->moms_size)
+        return;
+    for (int k = 0; k < n; k++)
+        S->lit_score[lits[k]] += 1.0;
+}
+
+// MOMS 分数采用 Freeman 的组合方式，偏向两个取值都频繁出现的变元
+static void UpdateMomsScore(Solver *S, int v)
+{
+    double pos = S->lit_score[2 * v], neg = S->lit_score[2 * v + 1];
+    S->activity[v] = (pos * neg) * 1024 + pos + neg;
+    if (S->heap_pos[v] >= 0)
+        HeapUp(S, S->heap_pos[v]);
+}
+
+// 初始取值偏向分数较高的文字
+static void InitPhase(Solver *S)
+{
+    for (int v = 1; v <= S->num_vars; v++)
+        S->phase[v] = S->lit_score[2 * v] >= S->lit_score[2 * v + 1] ? VAL_TRUE : VAL_FALSE;
+}
+
+// 对全部原始子句统计一次文字分数，恰好一个约束按其中“至少一个”的子句计
+static void ScanClauses(Solver *S, void (*count)(Solver *, const int *, int))
+{
+    memset(S->lit_score, 0, sizeof(double) * 2 * (S->num_vars + 1));
+    for (int c = 0; c < S->num_clauses; c++)
+        if (S->clause_lbd[c] == 0)
+            count(S, S->lits + S->clause_start[c], S->clause_size[c]);
+    for (int e = 0; e < S->num_eo; e++)
+        count(S, S->eo_lits + S->eo_start[e], S->eo_size[e]);
+}
+
+static void InitFrequency(Solver *S)
+{
+    ScanClauses(S, CountOccurrence);
+    for (int v = 1; v <= S->num_vars; v++)
+        UpdateVarScore(S, v);
+    InitPhase(S);
+}
+
+static void InitNext(Solver *S)
+{
+    memset(S->phase, VAL_TRUE, S->num_vars + 1);
+    S->next_var = 1;
+}
+
+// 原始方案按原始子句链表的顺序选择文字。原来的读入程序把每个子句和每个文字都插在链表头部，
+// 因此这里按与文件相反的顺序保存子句及其文字；恰好一个约束按其中“至少一个”的子句计
+static void InitFirst(Solver *S)
+{
+    int total = S->eo_lits_size;
+    for (int c = 0; c < S->num_clauses; c++)
+        if (S->clause_lbd[c] == 0)
+            total += S->clause_size[c];
+    free(S->first_lits);
+    free(S->first_start);
+    S->first_lits = (int *)malloc(sizeof(int) * (total + 1));
+    S->first_start = (int *)malloc(sizeof(int) * (S->num_clauses + S->num_eo + 1));
+
+    int n = 0, k = 0;
+    for (int e = S->num_eo - 1; e >= 0; e--)
+    {
+        S->first_start[n++] = k;
+        for (int i = S->eo_size[e] - 1; i >= 0; i--)
+            S->first_lits[k++] = S->eo_lits[S->eo_start[e] + i];
+    }
+    for (int c = S->num_clauses - 1; c >= 0; c--)
+    {
+        if (S->clause_lbd[c] != 0)
+            continue;
+        S->first_start[n++] = k;
+        for (int i = S->clause_size[c] - 1; i >= 0; i--)
+            S->first_lits[k++] = S->lits[S->clause_start[c] + i];
+    }
+    S->first_start[n] = k;
+    S->first_clauses = n;
+    InitNext(S);
+}
+
+static void InitJeroslowWang(Solver *S)
+{
+    ScanClauses(S, CountJeroslowWang);
+    for (int v = 1; v <= S->num_vars; v++)
+        UpdateVarScore(S, v);
+    InitPhase(S);
+}
+
+static void InitMoms(Solver *S)
+{
+    S->moms_size = INT_MAX;
+    for (int c = 0; c < S->num_clauses; c++)
+        if (S->clause_size[c] < S->moms_size)
+            S->moms_size = S->clause_size[c];
+    ScanClauses(S, CountMoms);
+    for (int v = 1; v <= S->num_vars; v++)
+        UpdateMomsScore(S, v);
+    InitPhase(S);
+}
+
+static void InitVsids(Solver *S)
+{
+    memset(S->phase, VAL_FALSE, S->num_vars + 1);
+}
+
+// 学习到新子句时增量更新静态分数，不重新扫描子句集
+static void LearntFrequency(Solver *S, const int *lits, int n)
+{
+    CountOccurrence(S, lits, n);
+    for (int k = 0; k < n; k++)
+        UpdateVarScore(S, LIT_VAR(lits[k]));
+}
+
+static void LearntJeroslowWang(Solver *S, const int *lits, int n)
+{
+    CountJeroslowWang(S, lits, n);
+    for (int k = 0; k < n; k++)
+        UpdateVarScore(S, LIT_VAR(lits[k]));
+}
+
+static void LearntMoms(Solver *S, const int *lits, int n)
+{
+    if (n > S->moms_size)
+        return;
+    CountMoms(S, lits, n);
+    for (int k = 0; k < n; k++)
+        UpdateMomsScore(S, LIT_VAR(lits[k]));
+}
+
+// ---------- 变元选择 ----------
+
+// 选取分数最高的未赋值变元，返回 0 表示全部已赋值
+static int PickVarByScore(Solver *S)
+{
+    while (S->heap_size > 0)
+    {
+        int v = HeapPop(S);
+        if (S->value[v] == VAL_UNDEF)
+            return v;
+    }
+    return 0;
+}
+
+// 方案1：选择出现次数最多的变元
+int PickVar_1(Solver *S)
+{
+    return PickVarByScore(S);
+}
+
+// 方案2：选择下一个未赋值的变元，回溯时游标随之回退
+int PickVar_2(Solver *S)
+{
+    while (S->next_var <= S->num_vars && S->value[S->next_var] != VAL_UNDEF)
+        S->next_var++;
+    return S->next_var <= S->num_vars ? S->next_var : 0;
+}
+
+// 原始方案：选择第一个未满足子句中的第一个未赋值文字，取值使该文字为真。
+// 原始子句全部满足后按方案2为其余变元赋值
+int PickVar_First(Solver *S)
+{
+    for (int c = 0; c < S->first_clauses; c++)
+    {
+        int pick = 0;
+        for (int k = S->first_start[c]; k < S->first_start[c + 1]; k++)
+        {
+            int value = SolverLitValue(S, S->first_lits[k]);
+            if (value == VAL_TRUE)
+            {
+                pick = 0;
+                break;
+            }
+            if (value == VAL_UNDEF && !pick)
+                pick = S->first_lits[k];
+        }
+        if (pick)
+        {
+            S->phase[LIT_VAR(pick)] = (pick & 1) ? VAL_FALSE : VAL_TRUE;
+            return LIT_VAR(pick);
+        }
+    }
+    return PickVar_2(S);
+}
+
+// 方案3：为所在子句较短的变元分配较大权重（Jeroslow-Wang）
+int PickVar_3(Solver *S)
+{
+    return PickVarByScore(S);
+}
+
+// 按当前策略选取变元
+int PickVar(Solver *S)
+{
+    return S->heuristic->pick(S);
+}
+
+// 策略表，名称用于命令行 -h 参数
+const Heuristic Heuristics[] = {
+    {"first", "选择第一个未满足子句中的第一个文字（原始方案，DPLL 的默认策略）", InitFirst, PickVar_First, NULL, false},
+    {"freq", "选择出现次数最多的变元（方案1）", InitFrequency, PickVar_1, LearntFrequency, false},
+    {"next", "选择下一个变元（方案2）", InitNext, PickVar_2, NULL, false},
+    {"jw", "为所在子句较短的变元分配较大权重（方案3，Jeroslow-Wang）", InitJeroslowWang, PickVar_3, LearntJeroslowWang, false},
+    {"moms", "选择在最短子句中出现最多的变元（MOMS）", InitMoms, PickVarByScore, LearntMoms, false},
+    {"vsids", "选择最近参与冲突最多的变元（VSIDS）", InitVsids, PickVarByScore, NULL, true},
+    {NULL, NULL, NULL, NULL, NULL, false},
+};
+
+// 按名称查找策略
+const Heuristic *FindHeuristic(const char *name)
+{
+    for (const Heuristic *h = Heuristics; h->name; h++)
+        if (strcmp(h->name, name) == 0)
+            return h;
+    return NULL;
+}
+
+// 设置变元选择策略，计算初始分数并建堆
+void SolverSetHeuristic(Solver *S, const Heuristic *h)
+{
+    S->heuristic = h;
+    memset(S->activity, 0, sizeof(double) * (S->num_vars + 1));
+    S->activity_inc = 1.0;
+    S->heap_size = 0;
+    for (int v = 0; v <= S->num_vars; v++)
+        S->heap_pos[v] = -1;
+
+    h->init(S);
+    for (int v = 1; v <= S->num_vars; v++)
+        if (S->value[v] == VAL_UNDEF)
+            HeapInsert(S, v);
+}
+
+// 通知策略有新的学习子句
+void SolverLearntAdded(Solver *S, const int *lits, int n)
+{
+    if (S->heuristic->on_learnt)
+        S->heuristic->on_learnt(S, lits, n);
+}
@@ -0,0 +1,719 @@
+// sat_preprocess.c
+
+#include "sat.h"
+
+#include <stdint.h>
+
+// 有界变元消去的限制：正负出现次数之积与消解式长度的上限
+#define ELIM_MAX_PRODUCT 400
+#define ELIM_MAX_RESOLVENT 24
+
+// 检查时间预算的间隔（循环次数）
+#define BUDGET_CHECK_INTERVAL 64
+
+typedef struct IntVec
+{
+    int *data;
+    int size;
+    int cap;
+} IntVec;
+
+// 预处理器内部使用与求解器相同的文字编码
+struct Preprocessor
+{
+    int num_vars;
+
+    // 子句集连续存放，消去变元得到的消解式追加在末尾
+    int *lits;
+    int lits_size;
+    int lits_cap;
+    int *clause_start;
+    int *clause_size;
+    uint64_t *clause_sig; // 子句中变元的签名，用于快速排除不可能的包含关系
+    bool *clause_deleted;
+    int num_clauses;
+    int clauses_cap;
+
+    IntVec *occ;   // 每个文字出现的子句，删除的子句延迟清理
+    int *num_occ;  // 每个文字在未删除子句中的出现次数
+    bool *mark;    // 按文字标记，用于子集判断
+    signed char *value;
+    bool *eliminated;
+
+    IntVec units;  // 待传播的文字
+    int units_head;
+    IntVec stack;  // 模型重建栈，每项为 [主文字, 其余文字..., 长度]
+    bool unsat;
+
+    IntVec scratch[2]; // 临时数组：包含检查中待删除/待强化的子句，变元消去中正负出现的子句
+
+    double deadline; // 当前技术的时间预算截止的墙钟时间（毫秒）
+    int budget_counter;
+    PreprocessStats stats[PRE_COUNT];
+};
+
+const char *PreprocessNames[PRE_COUNT] = {"unit", "pure", "subsume", "strengthen", "eliminate"};
+
+static void VecPush(IntVec *v, int x)
+{
+    if (v->size == v->cap)
+    {
+        v->cap = v->cap ? v->cap * 2 : 4;
+        v->data = (int *)realloc(v->data, sizeof(int) * v->cap);
+    }
+    v->data[v->size++] = x;
+}
+
+static void VecRemove(IntVec *v, int x)
+{
+    for (int i = 0; i < v->size; i++)
+        if (v->data[i] == x)
+        {
+            v->data[i] = v->data[--v->size];
+            return;
+        }
+}
+
+static inline int *ClauseLits(Preprocessor *P, int c)
+{
+    return P->lits + P->clause_start[c];
+}
+
+static uint64_t Signature(const int *lits, int n)
+{
+    uint64_t sig = 0;
+    for (int k = 0; k < n; k++)
+        sig |= 1ULL << (LIT_VAR(lits[k]) & 63);
+    return sig;
+}
+
+static inline int LitValue(Preprocessor *P, int lit)
+{
+    int v = P->value[LIT_VAR(lit)];
+    return v == VAL_UNDEF ? VAL_UNDEF : v ^ (lit & 1);
+}
+
+// 开始一项技术的计时
+static void StartBudget(Preprocessor *P, double budget_ms)
+{
+    P->deadline = WallClockMs() + budget_ms;
+    P->budget_counter = 0;
+}
+
+// 每隔若干次检查一次是否超出时间预算
+static bool OverBudget(Preprocessor *P)
+{
+    if (++P->budget_counter < BUDGET_CHECK_INTERVAL)
+        return false;
+    P->budget_counter = 0;
+    return WallClockMs() > P->deadline;
+}
+
+// 加入一个文字编码的子句（已去重、无重言式），返回子句编号
+static int AddClause(Preprocessor *P, const int *lits, int n)
+{
+    if (P->num_clauses == P->clauses_cap)
+    {
+        P->clauses_cap = P->clauses_cap ? P->clauses_cap * 2 : 64;
+        P->clause_start = (int *)realloc(P->clause_start, sizeof(int) * P->clauses_cap);
+        P->clause_size = (int *)realloc(P->clause_size, sizeof(int) * P->clauses_cap);
+        P->clause_sig = (uint64_t *)realloc(P->clause_sig, sizeof(uint64_t) * P->clauses_cap);
+        P->clause_deleted = (bool *)realloc(P->clause_deleted, sizeof(bool) * P->clauses_cap);
+    }
+    while (P->lits_size + n > P->lits_cap)
+    {
+        P->lits_cap = P->lits_cap ? P->lits_cap * 2 : 256;
+        P->lits = (int *)realloc(P->lits, sizeof(int) * P->lits_cap);
+    }
+
+    int c = P->num_clauses++;
+    P->clause_start[c] = P->lits_size;
+    P->clause_size[c] = n;
+    P->clause_sig[c] = Signature(lits, n);
+    P->clause_deleted[c] = false;
+    memcpy(P->lits + P->lits_size, lits, sizeof(int) * n);
+    P->lits_size += n;
+    for (int k = 0; k < n; k++)
+    {
+        VecPush(&P->occ[lits[k]], c);
+        P->num_occ[lits[k]]++;
+    }
+    if (n == 0)
+        P->unsat = true;
+    return c;
+}
+
+static void DeleteClause(Preprocessor *P, int c, int technique)
+{
+    P->clause_deleted[c] = true;
+    int *lits = ClauseLits(P, c);
+    for (int k = 0; k < P->clause_size[c]; k++)
+        P->num_occ[lits[k]]--;
+    P->stats[technique].clauses_removed++;
+}
+
+// 赋值并记入重建栈，单子句传播开启时随后由 Propagate 化简子句集
+static void Assign(Preprocessor *P, int lit, int technique)
+{
+    int v = LIT_VAR(lit);
+    if (P->value[v] != VAL_UNDEF)
+    {
+        if (LitValue(P, lit) == VAL_FALSE)
+            P->unsat = true;
+        return;
+    }
+    P->value[v] = (lit & 1) ? VAL_FALSE : VAL_TRUE;
+    P->stats[technique].vars_removed++;
+    VecPush(&P->stack, lit);
+    VecPush(&P->stack, 1);
+    VecPush(&P->units, lit);
+}
+
+// 子句变为单子句时的处理：开启单子句传播则赋值，否则保留为单子句
+static void ClauseShrunk(Preprocessor *P, int c, const PreprocessOptions *opt, int technique)
+{
+    if (P->clause_size[c] == 0)
+        P->unsat = true;
+    else if (P->clause_size[c] == 1 && opt->enabled[PRE_UNIT])
+        Assign(P, ClauseLits(P, c)[0], technique);
+}
+
+// 从子句 c 中删去文字 lit
+static void RemoveLit(Preprocessor *P, int c, int lit, const PreprocessOptions *opt, int technique)
+{
+    int *lits = ClauseLits(P, c);
+    int n = P->clause_size[c];
+    for (int k = 0; k < n; k++)
+        if (lits[k] == lit)
+        {
+            lits[k] = lits[n - 1];
+            break;
+        }
+    P->clause_size[c] = n - 1;
+    P->clause_sig[c] = Signature(lits, n - 1);
+    VecRemove(&P->occ[lit], c);
+    P->num_occ[lit]--;
+    P->stats[technique].lits_removed++;
+    ClauseShrunk(P, c, opt, technique);
+}
+
+// 传播已赋值的文字：删除被满足的子句，从其余子句中删去为假的文字
+static void Propagate(Preprocessor *P, const PreprocessOptions *opt, int technique)
+{
+    while (P->units_head < P->units.size && !P->unsat)
+    {
+        int lit = P->units.data[P->units_head++];
+        int neg = LIT_NEG(lit);
+
+        IntVec *sat = &P->occ[lit];
+        for (int i = 0; i < sat->size; i++)
+            if (!P->clause_deleted[sat->data[i]])
+                DeleteClause(P, sat->data[i], technique);
+        sat->size = 0;
+
+        // 先摘下 neg 的出现表，删去文字时不再逐个从表中移除
+        IntVec falsified = P->occ[neg];
+        P->occ[neg] = (IntVec){NULL, 0, 0};
+        for (int i = 0; i < falsified.size && !P->unsat; i++)
+        {
+            int c = falsified.data[i];
+            if (P->clause_deleted[c])
+                continue;
+            int *lits = ClauseLits(P, c);
+            int n = P->clause_size[c];
+            for (int k = 0; k < n; k++)
+                if (lits[k] == neg)
+                {
+                    lits[k] = lits[n - 1];
+                    break;
+                }
+            P->clause_size[c] = n - 1;
+            P->clause_sig[c] = Signature(lits, n - 1);
+            P->stats[technique].lits_removed++;
+            ClauseShrunk(P, c, opt, technique);
+        }
+        P->num_occ[neg] = 0;
+        free(falsified.data);
+    }
+}
+
+// ---------- 纯文字消去 ----------
+
+static void EliminatePure(Preprocessor *P)
+{
+    bool changed = true;
+    while (changed && !P->unsat)
+    {
+        changed = false;
+        for (int v = 1; v <= P->num_vars && !P->unsat; v++)
+        {
+            if (OverBudget(P))
+                return;
+            if (P->value[v] != VAL_UNDEF || P->eliminated[v])
+                continue;
+            int pos = P->num_occ[2 * v], neg = P->num_occ[2 * v + 1];
+            if ((pos == 0) == (neg == 0))
+                continue;
+            // 纯文字只出现在一种极性中，令其为真即可满足它所在的全部子句
+            int lit = pos ? 2 * v : 2 * v + 1;
+            P->value[v] = (lit & 1) ? VAL_FALSE : VAL_TRUE;
+            P->stats[PRE_PURE].vars_removed++;
+            VecPush(&P->stack, lit);
+            VecPush(&P->stack, 1);
+            IntVec *occ = &P->occ[lit];
+            for (int i = 0; i < occ->size; i++)
+                if (!P->clause_deleted[occ->data[i]])
+                    DeleteClause(P, occ->data[i], PRE_PURE);
+            occ->size = 0;
+            changed = true;
+        }
+    }
+}
+
+// ---------- 向后包含消去与自包含归结强化 ----------
+
+// 用子句 c 检查其他子句：c 包含于 d 时删除 d；
+// c 中恰有一个文字 l 以 ¬l 出现在 d 中、其余文字都在 d 中时，从 d 中删去 ¬l
+static void BackwardCheck(Preprocessor *P, int c, const PreprocessOptions *opt, IntVec *queue, bool *queued)
+{
+    bool subsume = opt->enabled[PRE_SUBSUME], strengthen = opt->enabled[PRE_STRENGTHEN];
+    int n = P->clause_size[c];
+    int *lits = ClauseLits(P, c);
+
+    // 选取出现次数最少的文字，只需检查它所在的子句
+    int best = lits[0];
+    for (int k = 1; k < n; k++)
+    {
+        int cost = P->num_occ[lits[k]] + (strengthen ? P->num_occ[LIT_NEG(lits[k])] : 0);
+        int best_cost = P->num_occ[best] + (strengthen ? P->num_occ[LIT_NEG(best)] : 0);
+        if (cost < best_cost)
+            best = lits[k];
+    }
+
+    for (int k = 0; k < n; k++)
+        P->mark[lits[k]] = true;
+
+    IntVec *subsumed = &P->scratch[0], *strengthened = &P->scratch[1];
+    subsumed->size = strengthened->size = 0;
+    uint64_t sig = P->clause_sig[c];
+    for (int side = 0; side < (strengthen ? 2 : 1); side++)
+    {
+        IntVec *occ = &P->occ[side ? LIT_NEG(best) : best];
+        for (int i = 0; i < occ->size; i++)
+        {
+            int d = occ->data[i];
+            if (d == c || P->clause_deleted[d] || P->clause_size[d] < n || (sig & ~P->clause_sig[d]))
+                continue;
+            int matched = 0, flipped = -1, *dl = ClauseLits(P, d);
+            for (int k = 0; k < P->clause_size[d]; k++)
+            {
+                if (P->mark[dl[k]])
+                    matched++;
+                else if (P->mark[LIT_NEG(dl[k])])
+                {
+                    if (flipped >= 0)
+                    {
+                        flipped = -2;
+                        break;
+                    }
+                    flipped = dl[k];
+                }
+            }
+            if (flipped == -1 && matched == n && subsume)
+                VecPush(subsumed, d);
+            else if (flipped >= 0 && matched == n - 1 && strengthen)
+            {
+                VecPush(strengthened, d);
+                VecPush(strengthened, flipped);
+            }
+        }
+    }
+
+    for (int k = 0; k < n; k++)
+        P->mark[lits[k]] = false;
+
+    for (int i = 0; i < subsumed->size; i++)
+        if (!P->clause_deleted[subsumed->data[i]])
+            DeleteClause(P, subsumed->data[i], PRE_SUBSUME);
+    for (int i = 0; i < strengthened->size && !P->unsat; i += 2)
+    {
+        int d = strengthened->data[i];
+        if (P->clause_deleted[d])
+            continue;
+        RemoveLit(P, d, strengthened->data[i + 1], opt, PRE_STRENGTHEN);
+        // 强化后的子句可能包含或强化更多子句
+        if (!queued[d])
+        {
+            queued[d] = true;
+            VecPush(queue, d);
+        }
+    }
+}
+
+static void Subsume(Preprocessor *P, const PreprocessOptions *opt, double budget_ms)
+{
+    IntVec queue = {NULL, 0, 0};
+    bool *queued = (bool *)calloc(P->num_clauses + 1, sizeof(bool));
+    for (int c = 0; c < P->num_clauses; c++)
+        if (!P->clause_deleted[c])
+        {
+            queued[c] = true;
+            VecPush(&queue, c);
+        }
+
+    StartBudget(P, budget_ms);
+    for (int i = 0; i < queue.size && !P->unsat && !OverBudget(P); i++)
+    {
+        int c = queue.data[i];
+        queued[c] = false;
+        if (!P->clause_deleted[c] && P->clause_size[c] > 0)
+            BackwardCheck(P, c, opt, &queue, queued);
+        Propagate(P, opt, opt->enabled[PRE_STRENGTHEN] ? PRE_STRENGTHEN : PRE_SUBSUME);
+    }
+    free(queue.data);
+    free(queued);
+}
+
+// ---------- 有界变元消去 ----------
+
+// 计算子句 a、b 关于变元 v 的消解式，重言式返回 -1
+static int Resolve(Preprocessor *P, int a, int b, int v, int *out)
+{
+    int n = 0;
+    int *al = ClauseLits(P, a), *bl = ClauseLits(P, b);
+    for (int k = 0; k < P->clause_size[a]; k++)
+        if (LIT_VAR(al[k]) != v)
+        {
+            P->mark[al[k]] = true;
+            out[n++] = al[k];
+        }
+    bool tautology = false;
+    for (int k = 0; k < P->clause_size[b]; k++)
+    {
+        int lit = bl[k];
+        if (LIT_VAR(lit) == v || P->mark[lit])
+            continue;
+        if (P->mark[LIT_NEG(lit)])
+        {
+            tautology = true;
+            break;
+        }
+        out[n++] = lit;
+    }
+    for (int k = 0; k < P->clause_size[a]; k++)
+        P->mark[al[k]] = false;
+    return tautology ? -1 : n;
+}
+
+// 收集变元 v 某一极性的未删除子句
+static void LiveOcc(Preprocessor *P, int lit, IntVec *out)
+{
+    IntVec *occ = &P->occ[lit];
+    int j = 0;
+    out->size = 0;
+    for (int i = 0; i < occ->size; i++)
+        if (!P->clause_deleted[occ->data[i]])
+        {
+            occ->data[j++] = occ->data[i];
+            VecPush(out, occ->data[i]);
+        }
+    occ->size = j;
+}
+
+// 消解式个数不超过原有子句数时消去变元 v，返回是否消去
+static bool TryEliminate(Preprocessor *P, int v, const PreprocessOptions *opt, int *buffer)
+{
+    IntVec *pos = &P->scratch[0], *neg = &P->scratch[1];
+    LiveOcc(P, 2 * v, pos);
+    LiveOcc(P, 2 * v + 1, neg);
+    if (pos->size == 0 || neg->size == 0 || pos->size * neg->size > ELIM_MAX_PRODUCT)
+        return false;
+
+    int resolvents = 0;
+    for (int i = 0; i < pos->size; i++)
+        for (int j = 0; j < neg->size; j++)
+        {
+            int n = Resolve(P, pos->data[i], neg->data[j], v, buffer);
+            if (n < 0)
+                continue;
+            if (++resolvents > pos->size + neg->size || n > ELIM_MAX_RESOLVENT)
+                return false;
+        }
+
+    // 将原有子句记入重建栈后删除，再加入全部非重言的消解式
+    for (int side = 0; side < 2; side++)
+    {
+        IntVec *list = side ? neg : pos;
+        int pivot = side ? 2 * v + 1 : 2 * v;
+        for (int i = 0; i < list->size; i++)
+        {
+            int c = list->data[i], *lits = ClauseLits(P, c);
+            VecPush(&P->stack, pivot);
+            for (int k = 0; k < P->clause_size[c]; k++)
+                if (lits[k] != pivot)
+                    VecPush(&P->stack, lits[k]);
+            VecPush(&P->stack, P->clause_size[c]);
+            DeleteClause(P, c, PRE_ELIMINATE);
+        }
+    }
+    for (int i = 0; i < pos->size; i++)
+        for (int j = 0; j < neg->size; j++)
+        {
+            int n = Resolve(P, pos->data[i], neg->data[j], v, buffer);
+            if (n < 0)
+                continue;
+            int c = AddClause(P, buffer, n);
+            P->stats[PRE_ELIMINATE].clauses_added++;
+            ClauseShrunk(P, c, opt, PRE_ELIMINATE);
+        }
+    P->occ[2 * v].size = P->occ[2 * v + 1].size = 0;
+    P->eliminated[v] = true;
+    P->stats[PRE_ELIMINATE].vars_removed++;
+    return true;
+}
+
+static int *elim_cost;
+
+static int CompareElimCost(const void *a, const void *b)
+{
+    int ca = elim_cost[*(const int *)a], cb = elim_cost[*(const int *)b];
+    return (ca > cb) - (ca < cb);
+}
+
+static void Eliminate(Preprocessor *P, const PreprocessOptions *opt)
+{
+    int *order = (int *)malloc(sizeof(int) * (P->num_vars + 1));
+    int *buffer = (int *)malloc(sizeof(int) * (2 * P->num_vars + 2));
+    elim_cost = (int *)malloc(sizeof(int) * (P->num_vars + 1));
+
+    bool changed = true;
+    while (changed && !P->unsat)
+    {
+        changed = false;
+        // 从出现次数之积最小的变元开始尝试
+        int count = 0;
+        for (int v = 1; v <= P->num_vars; v++)
+            if (P->value[v] == VAL_UNDEF && !P->eliminated[v] && P->num_occ[2 * v] + P->num_occ[2 * v + 1] > 0)
+            {
+                elim_cost[v] = P->num_occ[2 * v] * P->num_occ[2 * v + 1];
+                order[count++] = v;
+            }
+        qsort(order, count, sizeof(int), CompareElimCost);
+
+        for (int i = 0; i < count && !P->unsat; i++)
+        {
+            if (OverBudget(P))
+            {
+                changed = false;
+                break;
+            }
+            int v = order[i];
+            if (P->value[v] != VAL_UNDEF || P->eliminated[v])
+                continue;
+            if (TryEliminate(P, v, opt, buffer))
+            {
+                changed = true;
+                Propagate(P, opt, PRE_ELIMINATE);
+            }
+        }
+    }
+    free(order);
+    free(buffer);
+    free(elim_cost);
+}
+
+// ---------- 对外接口 ----------
+
+Preprocessor *PreprocessNew(const CnfFormula *F)
+{
+    Preprocessor *P = (Preprocessor *)calloc(1, sizeof(Preprocessor));
+    int n = F->num_vars;
+    P->num_vars = n;
+    P->occ = (IntVec *)calloc(2 * (n + 1), sizeof(IntVec));
+    P->num_occ = (int *)calloc(2 * (n + 1), sizeof(int));
+    P->mark = (bool *)calloc(2 * (n + 1), sizeof(bool));
+    P->value = (signed char *)malloc(n + 1);
+    memset(P->value, VAL_UNDEF, n + 1);
+    P->eliminated = (bool *)calloc(n + 1, sizeof(bool));
+
+    // 读入时去掉重复文字与重言式
+    int *buffer = (int *)malloc(sizeof(int) * (n + 1));
+    for (int c = 0; c < F->num_clauses; c++)
+    {
+        int size = 0;
+        bool tautology = false;
+        for (int k = F->offsets[c]; k < F->offsets[c + 1]; k++)
+        {
+            int lit = LIT(F->lits[k]);
+            if (P->mark[LIT_NEG(lit)])
+                tautology = true;
+            if (!P->mark[lit])
+            {
+                P->mark[lit] = true;
+                buffer[size++] = lit;
+            }
+        }
+        for (int k = 0; k < size; k++)
+            P->mark[buffer[k]] = false;
+        if (!tautology)
+            AddClause(P, buffer, size);
+    }
+    free(buffer);
+    return P;
+}
+
+void PreprocessFree(Preprocessor *P)
+{
+    for (int l = 0; l < 2 * (P->num_vars + 1); l++)
+        free(P->occ[l].data);
+    free(P->occ);
+    free(P->num_occ);
+    free(P->mark);
+    free(P->value);
+    free(P->eliminated);
+    free(P->lits);
+    free(P->clause_start);
+    free(P->clause_size);
+    free(P->clause_sig);
+    free(P->clause_deleted);
+    free(P->units.data);
+    free(P->stack.data);
+    free(P->scratch[0].data);
+    free(P->scratch[1].data);
+    free(P);
+}
+
+// 按单子句传播、纯文字、包含与强化、变元消去的顺序化简，返回 NOTFOUND 表示已判定不可满足
+status PreprocessRun(Preprocessor *P, const PreprocessOptions *opt)
+{
+    double begin = WallClockMs();
+    if (opt->enabled[PRE_UNIT] && !P->unsat)
+    {
+        for (int c = 0; c < P->num_clauses; c++)
+            if (!P->clause_deleted[c] && P->clause_size[c] == 1)
+                Assign(P, ClauseLits(P, c)[0], PRE_UNIT);
+        Propagate(P, opt, PRE_UNIT);
+        P->stats[PRE_UNIT].ms = WallClockMs() - begin;
+    }
+    if (opt->enabled[PRE_PURE] && !P->unsat)
+    {
+        begin = WallClockMs();
+        StartBudget(P, opt->budget_ms[PRE_PURE]);
+        EliminatePure(P);
+        P->stats[PRE_PURE].ms = WallClockMs() - begin;
+    }
+    if ((opt->enabled[PRE_SUBSUME] || opt->enabled[PRE_STRENGTHEN]) && !P->unsat)
+    {
+        begin = WallClockMs();
+        // 两项技术在同一趟检查中完成，预算取二者之和
+        double budget = (opt->enabled[PRE_SUBSUME] ? opt->budget_ms[PRE_SUBSUME] : 0) +
+                        (opt->enabled[PRE_STRENGTHEN] ? opt->budget_ms[PRE_STRENGTHEN] : 0);
+        Subsume(P, opt, budget);
+        double ms = WallClockMs() - begin;
+        P->stats[opt->enabled[PRE_SUBSUME] ? PRE_SUBSUME : PRE_STRENGTHEN].ms = ms;
+    }
+    if (opt->enabled[PRE_ELIMINATE] && !P->unsat)
+    {
+        begin = WallClockMs();
+        StartBudget(P, opt->budget_ms[PRE_ELIMINATE]);
+        Eliminate(P, opt);
+        P->stats[PRE_ELIMINATE].ms = WallClockMs() - begin;
+    }
+    return P->unsat ? NOTFOUND : FOUND;
+}
+
+// 将化简后的子句集装入求解器，已判定不可满足时装入空子句
+void PreprocessLoad(Preprocessor *P, Solver *S)
+{
+    if (P->unsat)
+    {
+        SolverAddClause(S, NULL, 0);
+        return;
+    }
+    int *buffer = (int *)malloc(sizeof(int) * (P->num_vars + 1));
+    for (int c = 0; c < P->num_clauses; c++)
+    {
+        if (P->clause_deleted[c])
+            continue;
+        int *lits = ClauseLits(P, c);
+        for (int k = 0; k < P->clause_size[c]; k++)
+            buffer[k] = LIT_INT(lits[k]);
+        SolverAddClause(S, buffer, P->clause_size[c]);
+    }
+    free(buffer);
+}
+
+// 由求解器的模型重建原公式的模型：逆序检查重建栈，未满足的子句令其主文字为真
+void PreprocessExtendModel(Preprocessor *P, Solver *S)
+{
+    int i = P->stack.size;
+    while (i > 0)
+    {
+        int n = P->stack.data[i - 1];
+        int *lits = P->stack.data + i - 1 - n;
+        bool satisfied = false;
+        for (int k = 0; k < n && !satisfied; k++)
+            satisfied = SolverLitValue(S, lits[k]) == VAL_TRUE;
+        if (!satisfied)
+            S->value[LIT_VAR(lits[0])] = (lits[0] & 1) ? VAL_FALSE : VAL_TRUE;
+        i -= n + 1;
+    }
+}
+
+// 每项技术删去的子句数、变元数与文字数，每行格式为 "c <名称> <数值>"
+void PreprocessPrintStats(Preprocessor *P, const PreprocessOptions *opt, FILE *out)
+{
+    for (int t = 0; t < PRE_COUNT; t++)
+    {
+        if (!opt->enabled[t])
+            continue;
+        const PreprocessStats *st = &P->stats[t];
+        fprintf(out, "c pre_%s_clauses %d\n", PreprocessNames[t], st->clauses_removed - st->clauses_added);
+        fprintf(out, "c pre_%s_vars %d\n", PreprocessNames[t], st->vars_removed);
+        fprintf(out, "c pre_%s_lits %d\n", PreprocessNames[t], st->lits_removed);
+    }
+    int clauses = 0;
+    for (int c = 0; c < P->num_clauses; c++)
+        clauses += !P->clause_deleted[c];
+    int vars = 0;
+    for (int v = 1; v <= P->num_vars; v++)
+        vars += P->value[v] == VAL_UNDEF && !P->eliminated[v] && P->num_occ[2 * v] + P->num_occ[2 * v + 1] > 0;
+    fprintf(out, "c pre_remaining_clauses %d\n", P->unsat ? 0 : clauses);
+    fprintf(out, "c pre_remaining_vars %d\n", P->unsat ? 0 : vars);
+}
+
+// 解析 -p 参数，例如 "all"、"none"、"unit,pure,subsume:50,eliminate:200"，冒号后为该技术的时间预算（毫秒）
+status PreprocessParseOptions(PreprocessOptions *opt, const char *spec)
+{
+    for (int t = 0; t < PRE_COUNT; t++)
+    {
+        opt->enabled[t] = false;
+        opt->budget_ms[t] = PRE_DEFAULT_BUDGET_MS;
+    }
+    if (strcmp(spec, "none") == 0)
+        return OK;
+
+    char buffer[256];
+    snprintf(buffer, sizeof(buffer), "%s", spec);
+    for (char *item = strtok(buffer, ","); item; item = strtok(NULL, ","))
+    {
+        char *colon = strchr(item, ':');
+        double budget = PRE_DEFAULT_BUDGET_MS;
+        if (colon)
+        {
+            *colon = '\0';
+            budget = atof(colon + 1);
+        }
+        bool found = false;
+        for (int t = 0; t < PRE_COUNT; t++)
+            if (strcmp(item, "all") == 0 || strcmp(item, PreprocessNames[t]) == 0)
+            {
+                opt->enabled[t] = true;
+                opt->budget_ms[t] = budget;
+                found = true;
+            }
+        if (!found)
+            return ERROR;
+    }
+    return OK;
+}
@@ -0,0 +1,926 @@
+// sat_solver.c
+
+#include "sat.h"
+
+#ifdef _WIN32
+#define PSAPI_VERSION 2
+#include <windows.h>
+#include <psapi.h>
+#else
+#include <sys/resource.h>
+#include <unistd.h>
+#endif
+
+// 监视表追加子句
+static void WatchPush(WatchList *w, int clause)
+{
+    if (w->size == w->cap)
+    {
+        w->cap = w->cap ? w->cap * 2 : 4;
+        w->clauses = (int *)realloc(w->clauses, sizeof(int) * w->cap);
+    }
+    w->clauses[w->size++] = clause;
+}
+
+// 创建求解器
+Solver *SolverNew(int num_vars)
+{
+    Solver *S = (Solver *)calloc(1, sizeof(Solver));
+    S->num_vars = num_vars;
+
+    S->lits_cap = 1024;
+    S->lits = (int *)malloc(sizeof(int) * S->lits_cap);
+    S->clauses_cap = 256;
+    S->clause_start = (int *)malloc(sizeof(int) * S->clauses_cap);
+    S->clause_size = (int *)malloc(sizeof(int) * S->clauses_cap);
+    S->clause_lbd = (int *)malloc(sizeof(int) * S->clauses_cap);
+
+    S->watches = (WatchList *)calloc(2 * (num_vars + 1), sizeof(WatchList));
+    S->value = (signed char *)malloc(num_vars + 1);
+    memset(S->value, VAL_UNDEF, num_vars + 1);
+    S->trail = (int *)malloc(sizeof(int) * (num_vars + 1));
+    S->level = (int *)calloc(num_vars + 1, sizeof(int));
+    S->reason = (int *)malloc(sizeof(int) * (num_vars + 1));
+    S->phase = (signed char *)malloc(num_vars + 1);
+    memset(S->phase, VAL_FALSE, num_vars + 1);
+    S->activity = (double *)calloc(num_vars + 1, sizeof(double));
+    S->activity_inc = 1.0;
+    S->lit_score = (double *)calloc(2 * (num_vars + 1), sizeof(double));
+    S->heap = (int *)malloc(sizeof(int) * (num_vars + 1));
+    S->heap_pos = (int *)malloc(sizeof(int) * (num_vars + 1));
+    for (int v = 0; v <= num_vars; v++)
+        S->heap_pos[v] = -1;
+    S->levels_cap = num_vars + 1;
+    S->trail_lim = (int *)malloc(sizeof(int) * S->levels_cap);
+    S->flipped = (bool *)calloc(S->levels_cap, sizeof(bool));
+    S->seen = (char *)calloc(2 * (num_vars + 1), 1);
+    S->eo_occurs = (WatchList *)calloc(2 * (num_vars + 1), sizeof(WatchList));
+    S->eo_cause = (int *)calloc(num_vars + 1, sizeof(int));
+    S->start_ms = WallClockMs();
+    return S;
+}
+
+// 释放求解器
+void SolverFree(Solver *S)
+{
+    if (!S)
+        return;
+    for (int l = 0; l < 2 * (S->num_vars + 1); l++)
+    {
+        free(S->watches[l].clauses);
+        free(S->eo_occurs[l].clauses);
+    }
+    free(S->watches);
+    free(S->eo_occurs);
+    free(S->eo_lits);
+    free(S->eo_start);
+    free(S->eo_size);
+    free(S->eo_cause);
+    free(S->eo_conflict);
+    free(S->explain);
+    free(S->lits);
+    free(S->clause_start);
+    free(S->clause_size);
+    free(S->clause_lbd);
+    free(S->value);
+    free(S->trail);
+    free(S->level);
+    free(S->reason);
+    free(S->phase);
+    free(S->activity);
+    free(S->lit_score);
+    free(S->heap);
+    free(S->heap_pos);
+    free(S->first_lits);
+    free(S->first_start);
+    free(S->trail_lim);
+    free(S->flipped);
+    free(S->seen);
+    free(S);
+}
+
+// 文字的当前取值
+int SolverLitValue(Solver *S, int lit)
+{
+    signed char v = S->value[LIT_VAR(lit)];
+    if (v == VAL_UNDEF)
+        return VAL_UNDEF;
+    return v ^ (lit & 1);
+}
+
+// 将文字赋为真并加入传播队列，reason 为蕴含该文字的子句
+status SolverAssign(Solver *S, int lit, int reason)
+{
+    int val = SolverLitValue(S, lit);
+    if (val == VAL_FALSE)
+        return ERROR;
+    if (val == VAL_TRUE)
+        return OK;
+    S->value[LIT_VAR(lit)] = (lit & 1) ? VAL_FALSE : VAL_TRUE;
+    S->level[LIT_VAR(lit)] = S->decision_level;
+    S->reason[LIT_VAR(lit)] = reason;
+    S->trail[S->trail_size++] = lit;
+    return OK;
+}
+
+// 开启新的决策层并赋值决策文字
+void SolverNewDecision(Solver *S, int lit)
+{
+    S->trail_lim[S->decision_level++] = S->trail_size;
+    S->flipped[S->decision_level] = false;
+    S->decisions++;
+    SolverAssign(S, lit, NO_REASON);
+}
+
+// 回溯到第 level 层，撤销其后的全部赋值
+void SolverBacktrack(Solver *S, int level)
+{
+    if (S->decision_level <= level)
+        return;
+    int lim = S->trail_lim[level];
+    for (int i = S->trail_size - 1; i >= lim; i--)
+    {
+        int v = LIT_VAR(S->trail[i]);
+        S->phase[v] = S->value[v];
+        S->value[v] = VAL_UNDEF;
+        HeapInsert(S, v);
+        if (v < S->next_var)
+            S->next_var = v;
+    }
+    S->trail_size = lim;
+    S->qhead = lim;
+    S->decision_level = level;
+}
+
+// 为新子句预留存储空间
+static void ReserveClause(Solver *S, int size)
+{
+    if (S->num_clauses == S->clauses_cap)
+    {
+        S->clauses_cap *= 2;
+        S->clause_start = (int *)realloc(S->clause_start, sizeof(int) * S->clauses_cap);
+        S->clause_size = (int *)realloc(S->clause_size, sizeof(int) * S->clauses_cap);
+        S->clause_lbd = (int *)realloc(S->clause_lbd, sizeof(int) * S->clauses_cap);
+    }
+    while (S->lits_size + size > S->lits_cap)
+    {
+        S->lits_cap *= 2;
+        S->lits = (int *)realloc(S->lits, sizeof(int) * S->lits_cap);
+    }
+}
+
+// 将已写入 lits 末尾的 size 个文字登记为子句，并监视前两个文字
+static int AttachClause(Solver *S, int size, int lbd)
+{
+    int c = S->num_clauses++;
+    S->clause_start[c] = S->lits_size;
+    S->clause_size[c] = size;
+    S->clause_lbd[c] = lbd;
+    WatchPush(&S->watches[S->lits[S->lits_size]], c);
+    WatchPush(&S->watches[S->lits[S->lits_size + 1]], c);
+    S->lits_size += size;
+    return c;
+}
+
+// 添加子句（文字为 DIMACS 整数形式），去除重复文字，忽略恒真子句。
+// 可在两次求解之间添加：先回到第 0 层，下次传播时重新检查顶层赋值
+status SolverAddClause(Solver *S, const int *lits, int size)
+{
+    SolverBacktrack(S, 0);
+    S->qhead = 0;
+    ReserveClause(S, size);
+
+    int start = S->lits_size, n = 0;
+    bool tautology = false;
+    for (int i = 0; i < size; i++)
+    {
+        int l = LIT(lits[i]);
+        if (S->seen[LIT_NEG(l)])
+            tautology = true;
+        if (S->seen[l])
+            continue;
+        S->seen[l] = 1;
+        S->lits[start + n++] = l;
+    }
+    for (int i = 0; i < n; i++)
+        S->seen[S->lits[start + i]] = 0;
+
+    if (tautology)
+        return OK;
+    if (n == 0)
+    {
+        S->empty_clause = true;
+        return OK;
+    }
+    if (n == 1)
+    {
+        // 单子句直接作为顶层赋值
+        if (!SolverAssign(S, S->lits[start], NO_REASON))
+            S->empty_clause = true;
+        return OK;
+    }
+
+    AttachClause(S, n, 0);
+    return OK;
+}
+
+// 添加 CSR 形式的子句集：第 c 个子句为 lits[offsets[c]] 到 lits[offsets[c + 1] - 1]
+status SolverAddClauses(Solver *S, const int *lits, const int *offsets, int num_clauses)
+{
+    for (int c = 0; c < num_clauses; c++)
+        SolverAddClause(S, lits + offsets[c], offsets[c + 1] - offsets[c]);
+    return OK;
+}
+
+// 添加恰好一个约束（文字为 DIMACS 整数形式），去除重复文字。约束由求解器直接传播，
+// 不展开为子句；只有一个文字时作为单子句，没有文字时为空子句
+status SolverAddExactlyOne(Solver *S, const int *lits, int size)
+{
+    SolverBacktrack(S, 0);
+    S->qhead = 0;
+    if (S->num_eo == S->eo_cap)
+    {
+        S->eo_cap = S->eo_cap ? S->eo_cap * 2 : 64;
+        S->eo_start = (int *)realloc(S->eo_start, sizeof(int) * S->eo_cap);
+        S->eo_size = (int *)realloc(S->eo_size, sizeof(int) * S->eo_cap);
+    }
+    while (S->eo_lits_size + size > S->eo_lits_cap)
+    {
+        S->eo_lits_cap = S->eo_lits_cap ? S->eo_lits_cap * 2 : 1024;
+        S->eo_lits = (int *)realloc(S->eo_lits, sizeof(int) * S->eo_lits_cap);
+    }
+
+    int start = S->eo_lits_size, n = 0;
+    for (int i = 0; i < size; i++)
+    {
+        int l = LIT(lits[i]);
+        if (S->seen[l])
+            continue;
+        S->seen[l] = 1;
+        S->eo_lits[start + n++] = l;
+    }
+    for (int i = 0; i < n; i++)
+        S->seen[S->eo_lits[start + i]] = 0;
+
+    if (n == 0)
+    {
+        S->empty_clause = true;
+        return OK;
+    }
+    if (n == 1)
+    {
+        if (!SolverAssign(S, S->eo_lits[start], NO_REASON))
+            S->empty_clause = true;
+        return OK;
+    }
+    if (n > S->explain_cap)
+    {
+        S->explain_cap = n;
+        S->explain = (int *)realloc(S->explain, sizeof(int) * n);
+        S->eo_conflict = (int *)realloc(S->eo_conflict, sizeof(int) * n);
+    }
+
+    int e = S->num_eo++;
+    S->eo_start[e] = start;
+    S->eo_size[e] = n;
+    S->eo_lits_size += n;
+    for (int i = 0; i < n; i++)
+        WatchPush(&S->eo_occurs[S->eo_lits[start + i]], e);
+    return OK;
+}
+
+// 添加 CSR 形式的约束集：exactly_one 为升序的子句序号，这些子句作为恰好一个约束添加，其余为普通子句
+status SolverAddConstraints(Solver *S, const int *lits, const int *offsets, int num_clauses,
+                            const int *exactly_one, int num_exactly_one)
+{
+    for (int c = 0, next = 0; c < num_clauses; c++)
+    {
+        if (next < num_exactly_one && exactly_one[next] == c)
+        {
+            SolverAddExactlyOne(S, lits + offsets[c], offsets[c + 1] - offsets[c]);
+            next++;
+        }
+        else
+            SolverAddClause(S, lits + offsets[c], offsets[c + 1] - offsets[c]);
+    }
+    return OK;
+}
+
+// 把蕴含或冲突的原因表示为子句，供冲突分析使用，返回文字数组并将长度写入 *size。
+// reason 为子句编号、EO_CONFLICT 或 EO_REASON(e)；lit 为被蕴含的（为真的）文字，解释的第一个文字即为 lit。
+// 约束中某文字为真而 lit 的反文字被赋为假时，解释为二元子句 (lit ∨ ¬该文字)；
+// 其余文字都为假而 lit 被赋为真时，解释为约束中全部文字组成的子句
+const int *SolverExplain(Solver *S, int reason, int lit, int *size)
+{
+    if (reason >= 0)
+    {
+        *size = S->clause_size[reason];
+        return S->lits + S->clause_start[reason];
+    }
+    if (reason == EO_CONFLICT)
+    {
+        *size = S->eo_conflict_size;
+        return S->eo_conflict;
+    }
+    int e = EO_INDEX(reason);
+    const int *cl = S->eo_lits + S->eo_start[e];
+    int n = S->eo_size[e];
+    S->explain[0] = lit;
+    if (S->eo_cause[LIT_VAR(lit)] != 0)
+    {
+        S->explain[1] = LIT_NEG(S->eo_cause[LIT_VAR(lit)]);
+        *size = 2;
+        return S->explain;
+    }
+    int k = 1;
+    for (int i = 0; i < n; i++)
+        if (cl[i] != lit)
+            S->explain[k++] = cl[i];
+    *size = k;
+    return S->explain;
+}
+
+// 恰好一个约束的传播：文字 p 刚被赋为真。返回 EO_CONFLICT 或 NO_CONFLICT
+static int PropagateExactlyOne(Solver *S, int p)
+{
+    // 含 p 的约束中其余文字都必须为假
+    WatchList *w = &S->eo_occurs[p];
+    for (int i = 0; i < w->size; i++)
+    {
+        int e = w->clauses[i];
+        const int *cl = S->eo_lits + S->eo_start[e];
+        for (int k = 0; k < S->eo_size[e]; k++)
+        {
+            int l = cl[k];
+            if (l == p)
+                continue;
+            int val = SolverLitValue(S, l);
+            if (val == VAL_TRUE)
+            {
+                S->eo_conflict[0] = LIT_NEG(p);
+                S->eo_conflict[1] = LIT_NEG(l);
+                S->eo_conflict_size = 2;
+                return EO_CONFLICT;
+            }
+            if (val == VAL_UNDEF)
+            {
+                SolverAssign(S, LIT_NEG(l), EO_REASON(e));
+                S->eo_cause[LIT_VAR(l)] = p;
+            }
+        }
+    }
+
+    // 含 ¬p 的约束少了一个可能为真的文字：都为假时冲突，只剩一个未赋值时将其赋为真
+    w = &S->eo_occurs[LIT_NEG(p)];
+    for (int i = 0; i < w->size; i++)
+    {
+        int e = w->clauses[i];
+        const int *cl = S->eo_lits + S->eo_start[e];
+        int n = S->eo_size[e], open = 0, last = 0;
+        bool satisfied = false;
+        for (int k = 0; k < n && !satisfied; k++)
+        {
+            int val = SolverLitValue(S, cl[k]);
+            if (val == VAL_TRUE)
+                satisfied = true;
+            else if (val == VAL_UNDEF)
+            {
+                open++;
+                last = cl[k];
+            }
+        }
+        if (satisfied || open > 1)
+            continue;
+        if (open == 0)
+        {
+            memcpy(S->eo_conflict, cl, sizeof(int) * n);
+            S->eo_conflict_size = n;
+            return EO_CONFLICT;
+        }
+        SolverAssign(S, last, EO_REASON(e));
+        S->eo_cause[LIT_VAR(last)] = 0;
+    }
+    return NO_CONFLICT;
+}
+
+// DIMACS 文字的当前取值，求解返回 FOUND 后即为模型中的取值
+int SolverValue(Solver *S, int lit)
+{
+    if (lit == 0 || abs(lit) > S->num_vars)
+        return VAL_UNDEF;
+    return SolverLitValue(S, LIT(lit));
+}
+
+// 单子句传播：只访问监视了新假文字的子句，以及含该文字或其反文字的恰好一个约束
+// 返回冲突子句编号或 EO_CONFLICT，无冲突时返回 NO_CONFLICT
+int SolverPropagate(Solver *S)
+{
+    while (S->qhead < S->trail_size)
+    {
+        int false_lit = LIT_NEG(S->trail[S->qhead++]);
+        WatchList *w = &S->watches[false_lit];
+        int i = 0, j = 0;
+        S->propagations++;
+
+        while (i < w->size)
+        {
+            int c = w->clauses[i++];
+            int *cl = S->lits + S->clause_start[c];
+            int size = S->clause_size[c];
+
+            // 保证假文字位于第二个监视位置
+            if (cl[0] == false_lit)
+            {
+                cl[0] = cl[1];
+                cl[1] = false_lit;
+            }
+
+            // 另一个监视文字为真，子句已满足
+            if (SolverLitValue(S, cl[0]) == VAL_TRUE)
+            {
+                w->clauses[j++] = c;
+                continue;
+            }
+
+            // 寻找新的非假文字作为监视
+            bool moved = false;
+            for (int k = 2; k < size; k++)
+            {
+                if (SolverLitValue(S, cl[k]) != VAL_FALSE)
+                {
+                    cl[1] = cl[k];
+                    cl[k] = false_lit;
+                    WatchPush(&S->watches[cl[1]], c);
+                    moved = true;
+                    break;
+                }
+            }
+            if (moved)
+                continue;
+
+            // 子句成为单子句或冲突子句
+            w->clauses[j++] = c;
+            if (!SolverAssign(S, cl[0], c))
+            {
+                while (i < w->size)
+                    w->clauses[j++] = w->clauses[i++];
+                w->size = j;
+                S->qhead = S->trail_size;
+                S->conflicts++;
+                return c;
+            }
+        }
+        w->size = j;
+
+        if (S->num_eo > 0 && PropagateExactlyOne(S, LIT_NEG(false_lit)) == EO_CONFLICT)
+        {
+            S->qhead = S->trail_size;
+            S->conflicts++;
+            return EO_CONFLICT;
+        }
+    }
+    return NO_CONFLICT;
+}
+
+// 墙钟时间（毫秒），用于时间限制、进度输出与计时。clock() 是进程的 CPU 时间，
+// 等待 I/O 或与其他进程分享 CPU 时与用户看到的时间不一致。没有单调时钟的系统退回到 timespec_get
+double WallClockMs(void)
+{
+#ifdef _WIN32
+    return (double)GetTickCount64();
+#elif defined(CLOCK_MONOTONIC)
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return ts.tv_sec * 1000.0 + ts.tv_nsec / 1e6;
+#else
+    struct timespec ts;
+    timespec_get(&ts, TIME_UTC);
+    return ts.tv_sec * 1000.0 + ts.tv_nsec / 1e6;
+#endif
+}
+
+// 进程当前的常驻内存（KB）。Linux 下读取 /proc/self/statm，没有该文件的系统退回到峰值常驻内存
+long long ResidentKb(void)
+{
+#ifdef _WIN32
+    PROCESS_MEMORY_COUNTERS pmc;
+    if (GetProcessMemoryInfo(GetCurrentProcess(), &pmc, sizeof(pmc)))
+        return (long long)(pmc.WorkingSetSize >> 10);
+    return 0;
+#else
+    long long pages = 0;
+    FILE *f = fopen("/proc/self/statm", "r");
+    if (f)
+    {
+        if (fscanf(f, "%*s %lld", &pages) != 1)
+            pages = 0;
+        fclose(f);
+        if (pages > 0)
+            return pages * (sysconf(_SC_PAGESIZE) >> 10);
+    }
+    struct rusage usage;
+    getrusage(RUSAGE_SELF, &usage);
+#ifdef __APPLE__
+    return usage.ru_maxrss >> 10; // macOS 以字节为单位
+#else
+    return usage.ru_maxrss;
+#endif
+#endif
+}
+
+// 主循环每步调用一次，到达资源限制时记录原因并返回 true。
+// 决策与冲突数每步直接比较；时钟、常驻内存与进度输出每 1024 步才检查一次，
+// 到达进度输出间隔时输出一行 "c progress ..." 并立即刷新，供界面读取
+static bool OutOfBudget(Solver *S)
+{
+    const SolverLimits *L = &S->limits;
+    if (L->decisions > 0 && S->decisions >= L->decisions)
+        S->stop_reason = "decisions";
+    else if (L->conflicts > 0 && S->conflicts >= L->conflicts)
+        S->stop_reason = "conflicts";
+    if (S->stop_reason)
+        return true;
+    if ((++S->steps & 1023) != 0)
+        return false;
+
+    if (L->time_ms > 0 && WallClockMs() - S->start_ms >= L->time_ms)
+        S->stop_reason = "time";
+    else if (L->memory_mb > 0 && ResidentKb() >= (L->memory_mb << 10))
+        S->stop_reason = "memory";
+    if (S->stop_reason)
+        return true;
+
+    if (S->progress_ms > 0)
+    {
+        double now = WallClockMs();
+        if (now >= S->next_progress)
+        {
+            S->next_progress = now + S->progress_ms;
+            printf("c progress decisions %lld conflicts %lld assigned %d/%d\n",
+                   S->decisions, S->conflicts, S->trail_size, S->num_vars);
+            fflush(stdout);
+        }
+    }
+    return false;
+}
+
+// DPLL 求解器
+// 子句集在搜索过程中保持不变，回溯时只沿赋值轨迹撤销赋值
+status DpllSolver(Solver *S)
+{
+    printf("Starting DPLL solver...\n");
+    if (!S->heuristic)
+        SolverSetHeuristic(S, FindHeuristic("first"));
+    if (S->empty_clause)
+        return NOTFOUND;
+
+    while (true)
+    {
+        if (OutOfBudget(S))
+            return UNKNOWN;
+        int confl = SolverPropagate(S);
+        if (confl != NO_CONFLICT)
+        {
+            if (S->heuristic->bump_conflicts)
+            {
+                int size;
+                const int *cl = SolverExplain(S, confl, 0, &size);
+                for (int k = 0; k < size; k++)
+                    SolverBumpVar(S, LIT_VAR(cl[k]));
+                SolverDecayActivity(S);
+            }
+
+            // 回到最近一个尚未尝试相反取值的决策层
+            int d = S->decision_level;
+            while (d > 0 && S->flipped[d])
+                d--;
+            if (d == 0)
+                return NOTFOUND;
+
+            int lit = S->trail[S->trail_lim[d - 1]];
+            SolverBacktrack(S, d - 1);
+            SolverNewDecision(S, LIT_NEG(lit));
+            S->flipped[S->decision_level] = true;
+            continue;
+        }
+
+        int var = PickVar(S);
+        if (var == 0)
+            return FOUND;
+        SolverNewDecision(S, S->phase[var] == VAL_TRUE ? LIT(var) : LIT(-var));
+    }
+}
+
+// Luby 序列的第 x 项（x 从 0 开始）：1 1 2 1 1 2 4 ...
+static double Luby(double y, int x)
+{
+    int size, seq;
+    for (size = 1, seq = 0; size < x + 1; seq++, size = 2 * size + 1)
+        ;
+    while (size - 1 != x)
+    {
+        size = (size - 1) >> 1;
+        seq--;
+        x = x % size;
+    }
+    return pow(y, seq);
+}
+
+// 冲突分析：沿轨迹逆序归结至第一唯一蕴含点，生成学习子句
+// learnt[0] 为学习子句中当前层的唯一文字，返回回跳的目标层
+static int Analyze(Solver *S, int confl, int *learnt, int *size)
+{
+    char *seen = S->seen; // 此处以变元为下标
+    int path = 0, p = -1, idx = S->trail_size - 1, n = 1;
+
+    do
+    {
+        int sz;
+        const int *cl = SolverExplain(S, confl, p, &sz);
+        for (int k = (p == -1 ? 0 : 1); k < sz; k++)
+        {
+            int v = LIT_VAR(cl[k]);
+            if (!seen[v] && S->level[v] > 0)
+            {
+                seen[v] = 1;
+                if (S->heuristic->bump_conflicts)
+                    SolverBumpVar(S, v);
+                if (S->level[v] >= S->decision_level)
+                    path++;
+                else
+                    learnt[n++] = cl[k];
+            }
+        }
+        while (!seen[LIT_VAR(S->trail[idx])])
+            idx--;
+        p = S->trail[idx--];
+        confl = S->reason[LIT_VAR(p)];
+        seen[LIT_VAR(p)] = 0;
+        path--;
+    } while (path > 0);
+    learnt[0] = LIT_NEG(p);
+
+    // 化简：若某文字的蕴含子句中其余文字都已在学习子句中，则该文字冗余
+    // 化简前的文字备份在 learnt[n..2n) 中，用于之后清除标记
+    memcpy(learnt + n, learnt, sizeof(int) * n);
+    int m = 1;
+    for (int k = 1; k < n; k++)
+    {
+        int r = S->reason[LIT_VAR(learnt[k])];
+        bool redundant = r != NO_REASON;
+        if (redundant)
+        {
+            int sz;
+            const int *cl = SolverExplain(S, r, LIT_NEG(learnt[k]), &sz);
+            for (int t = 1; t < sz; t++)
+            {
+                int v = LIT_VAR(cl[t]);
+                if (!seen[v] && S->level[v] > 0)
+                {
+                    redundant = false;
+                    break;
+                }
+            }
+        }
+        if (!redundant)
+            learnt[m++] = learnt[k];
+    }
+    for (int k = 1; k < n; k++)
+        seen[LIT_VAR(learnt[n + k])] = 0;
+    n = m;
+
+    // 回跳到学习子句中次高的决策层，并将该层文字放在第二个监视位置
+    int bt = 0;
+    for (int k = 1; k < n; k++)
+    {
+        if (S->level[LIT_VAR(learnt[k])] > bt)
+        {
+            bt = S->level[LIT_VAR(learnt[k])];
+            int tmp = learnt[1];
+            learnt[1] = learnt[k];
+            learnt[k] = tmp;
+        }
+    }
+    *size = n;
+    return bt;
+}
+
+// 计算学习子句涉及的不同决策层数目（LBD）
+static int ComputeLbd(Solver *S, const int *learnt, int n, int *stamp, int stamp_id)
+{
+    int lbd = 0;
+    for (int k = 0; k < n; k++)
+    {
+        int lv = S->level[LIT_VAR(learnt[k])];
+        if (stamp[lv] != stamp_id)
+        {
+            stamp[lv] = stamp_id;
+            lbd++;
+        }
+    }
+    return lbd;
+}
+
+// 按 LBD 从大到小排序
+static int CompareLbdDesc(const void *a, const void *b)
+{
+    const int *x = (const int *)a, *y = (const int *)b;
+    if (x[0] != y[0])
+        return y[0] - x[0];
+    return x[1] - y[1];
+}
+
+// 删除约一半 LBD 较大的学习子句，并紧缩子句存储
+// 只在第 0 层调用，此时所有赋值都不再需要蕴含子句
+static void ReduceLearnts(Solver *S)
+{
+    int cand = 0;
+    int *keys = (int *)malloc(sizeof(int) * 2 * (S->num_learnts + 1));
+    for (int c = 0; c < S->num_clauses; c++)
+    {
+        if (S->clause_lbd[c] > 2)
+        {
+            keys[2 * cand] = S->clause_lbd[c];
+            keys[2 * cand + 1] = c;
+            cand++;
+        }
+    }
+    qsort(keys, cand, 2 * sizeof(int), CompareLbdDesc);
+
+    int limit = S->num_learnts / 2 < cand ? S->num_learnts / 2 : cand;
+    for (int k = 0; k < limit; k++)
+        S->clause_size[keys[2 * k + 1]] = 0;
+    free(keys);
+
+    int nc = 0, nl = 0;
+    S->num_learnts = 0;
+    for (int c = 0; c < S->num_clauses; c++)
+    {
+        int size = S->clause_size[c];
+        if (size == 0)
+            continue;
+        memmove(S->lits + nl, S->lits + S->clause_start[c], sizeof(int) * size);
+        S->clause_start[nc] = nl;
+        S->clause_size[nc] = size;
+        S->clause_lbd[nc] = S->clause_lbd[c];
+        if (S->clause_lbd[nc] > 0)
+            S->num_learnts++;
+        nl += size;
+        nc++;
+    }
+    S->num_clauses = nc;
+    S->lits_size = nl;
+
+    for (int l = 0; l < 2 * (S->num_vars + 1); l++)
+        S->watches[l].size = 0;
+    for (int c = 0; c < nc; c++)
+    {
+        WatchPush(&S->watches[S->lits[S->clause_start[c]]], c);
+        WatchPush(&S->watches[S->lits[S->clause_start[c] + 1]], c);
+    }
+    for (int i = 0; i < S->trail_size; i++)
+        S->reason[LIT_VAR(S->trail[i])] = NO_REASON;
+}
+
+// 在假设文字 assumptions[0..n-1]（DIMACS 整数形式）成立的前提下求解，用于增量求解。
+// 第 k 个假设作为第 k + 1 层的决策，已经为真的假设占用一个空的决策层；某个假设被公式与之前的假设
+// 推出为假时返回 NOTFOUND。学习子句只由公式本身导出，与假设无关，因此连同变元分数与保存的相位
+// 在多次调用之间保留。返回 FOUND 后模型保留在 value 中，直到下次求解或添加子句
+status SolverSolve(Solver *S, const int *assumptions, int n)
+{
+    SolverBacktrack(S, 0);
+    S->stop_reason = NULL;
+    if (!S->heuristic)
+        SolverSetHeuristic(S, FindHeuristic("vsids"));
+    if (S->empty_clause)
+        return NOTFOUND;
+
+    // 决策层数最多为变元数加假设数
+    if (S->levels_cap < S->num_vars + n + 1)
+    {
+        int cap = S->num_vars + n + 1;
+        S->trail_lim = (int *)realloc(S->trail_lim, sizeof(int) * cap);
+        S->flipped = (bool *)realloc(S->flipped, sizeof(bool) * cap);
+        memset(S->flipped + S->levels_cap, 0, sizeof(bool) * (cap - S->levels_cap));
+        S->levels_cap = cap;
+    }
+    if (S->max_learnts == 0)
+        S->max_learnts = S->num_clauses / 3 + 2000;
+
+    int *learnt = (int *)malloc(sizeof(int) * 2 * (S->num_vars + 1));
+    int *stamp = (int *)calloc(S->levels_cap, sizeof(int));
+    int stamp_id = 0;
+    long long restart_limit = 100, restart_conflicts = 0;
+    status result;
+
+    while (true)
+    {
+        if (OutOfBudget(S))
+        {
+            result = UNKNOWN;
+            break;
+        }
+        int confl = SolverPropagate(S);
+        if (confl != NO_CONFLICT)
+        {
+            if (S->decision_level == 0)
+            {
+                S->empty_clause = true;
+                result = NOTFOUND;
+                break;
+            }
+
+            int k;
+            int bt = Analyze(S, confl, learnt, &k);
+            SolverBacktrack(S, bt);
+            if (k == 1)
+            {
+                SolverAssign(S, learnt[0], NO_REASON);
+            }
+            else
+            {
+                int lbd = ComputeLbd(S, learnt, k, stamp, ++stamp_id);
+                ReserveClause(S, k);
+                memcpy(S->lits + S->lits_size, learnt, sizeof(int) * k);
+                int c = AttachClause(S, k, lbd);
+                S->num_learnts++;
+                SolverAssign(S, learnt[0], c);
+            }
+            SolverLearntAdded(S, learnt, k);
+            S->learnts++;
+            if (S->heuristic->bump_conflicts)
+                SolverDecayActivity(S);
+            restart_conflicts++;
+            continue;
+        }
+
+        if (restart_conflicts >= restart_limit)
+        {
+            SolverBacktrack(S, 0);
+            S->restarts++;
+            restart_conflicts = 0;
+            restart_limit = (long long)(100 * Luby(2, (int)S->restarts));
+            if (S->num_learnts >= S->max_learnts)
+            {
+                ReduceLearnts(S);
+                S->max_learnts += S->max_learnts / 10;
+            }
+            continue;
+        }
+
+        if (S->decision_level < n)
+        {
+            int lit = LIT(assumptions[S->decision_level]);
+            int val = SolverLitValue(S, lit);
+            if (val == VAL_FALSE)
+            {
+                result = NOTFOUND;
+                break;
+            }
+            if (val == VAL_TRUE)
+                S->trail_lim[S->decision_level++] = S->trail_size;
+            else
+                SolverNewDecision(S, lit);
+            continue;
+        }
+
+        int var = PickVar(S);
+        if (var == 0)
+        {
+            result = FOUND;
+            break;
+        }
+        SolverNewDecision(S, S->phase[var] == VAL_TRUE ? LIT(var) : LIT(-var));
+    }
+
+    free(learnt);
+    free(stamp);
+    return result;
+}
+
+// CDCL 求解器：冲突驱动的子句学习、非时序回跳、相位保存与 Luby 重启
+status CdclSolver(Solver *S)
+{
+    printf("Starting CDCL solver...\n");
+    return SolverSolve(S, NULL, 0);
+}
+
+// 记录模型中各变元的真值
+status SolverModel(Solver *S, int *truth_table)
+{
+    for (int v = 1; v <= S->num_vars; v++)
+        truth_table[v - 1] = S->value[v] == VAL_TRUE ? 1 : 0;
+    return OK;
+}
+
+// 输出求解过程的统计信息，每行格式为 "c <名称> <数值>"；到达资源限制时另输出 "c limit <限制>"
+void SolverPrintStats(Solver *S, FILE *out)
+{
+    fprintf(out, "c decisions %lld\n", S->decisions);
+    fprintf(out, "c propagations %lld\n", S->propagations);
+    fprintf(out, "c conflicts %lld\n", S->conflicts);
+    fprintf(out, "c restarts %lld\n", S->restarts);
+    fprintf(out, "c learnts %lld\n", S->learnts);
+    if (S->stop_reason)
+        fprintf(out, "c limit %s\n", S->stop_reason);
+}
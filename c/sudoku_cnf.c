@@ -0,0 +1,287 @@
+// sudoku_cnf.c
+// n x n 对角线数独的 CNF 编码：每个格子恰好填一个数字，每组（n 行、n 列、n 宫与两条对角线）中每个数字恰好出现一次。
+// “恰好一个”由“至少一个”的子句与可选的“至多一个”编码组成，也可以直接写成求解器原生支持的恰好一个约束（e 行）。
+//
+// 完整编码使用自然编码 (row * n + col) * n + digit 的 n^3 个变元（row、col 从 0 开始），已知数写为单子句。
+// 剩余公式编码在编码时直接代入已知数：已知数所在的格子、以及与同组已知数相同的数字对应的变元已确定，
+// 不再出现在公式中；被已知数满足的约束一并删去。剩下的变元按行优先顺序重新连续编号，
+// 另写一个变元映射文件，求解结果可据此还原为自然编码。
+// 序列计数器、commander 与 product 编码引入的辅助变元编号在数独变元之后。
+
+#include "head.h"
+
+#define MAX_CELL_GROUPS 5 // 中心格同时属于行、列、宫与两条对角线
+#define EXACTLY_ONE_MARK INT_MIN // 缓冲区中标记下一个子句为恰好一个约束
+
+const char *AmoEncodingNames[AMO_COUNT] = {"pairwise", "sequential", "commander", "product", "native"};
+
+typedef struct CnfBuffer
+{
+    int *lits; // 各子句依次存放，每个子句以 0 结尾
+    int size, capacity;
+    int num_clauses;
+    int num_vars; // 已分配的变元数，辅助变元从其后继续编号
+} CnfBuffer;
+
+// 按名称查找至多一个编码，找不到时返回 -1
+int FindAmoEncoding(const char *name)
+{
+    for (int i = 0; i < AMO_COUNT; i++)
+        if (strcmp(name, AmoEncodingNames[i]) == 0)
+            return i;
+    return -1;
+}
+
+static void BufferPush(CnfBuffer *B, int lit)
+{
+    if (B->size == B->capacity)
+    {
+        B->capacity = B->capacity ? B->capacity * 2 : 4096;
+        B->lits = (int *)realloc(B->lits, B->capacity * sizeof(int));
+    }
+    B->lits[B->size++] = lit;
+    if (lit == 0)
+        B->num_clauses++;
+}
+
+static void Binary(CnfBuffer *B, int a, int b)
+{
+    BufferPush(B, a);
+    BufferPush(B, b);
+    BufferPush(B, 0);
+}
+
+static void AtLeastOne(CnfBuffer *B, const int *vars, int n)
+{
+    for (int i = 0; i < n; i++)
+        BufferPush(B, vars[i]);
+    BufferPush(B, 0);
+}
+
+static void PairwiseAmo(CnfBuffer *B, const int *vars, int n)
+{
+    for (int i = 0; i < n; i++)
+        for (int j = i + 1; j < n; j++)
+            Binary(B, -vars[i], -vars[j]);
+}
+
+// vars 中至多一个为真
+static void AtMostOne(CnfBuffer *B, const int *vars, int n, AmoEncoding amo)
+{
+    if (n <= 1)
+        return;
+    if (amo == AMO_SEQUENTIAL)
+    {
+        // 序列计数器（Sinz）：辅助变元 s_i 表示前 i + 1 个变元中已有一个为真，3n - 4 个子句
+        int s = B->num_vars;
+        B->num_vars += n - 1;
+        Binary(B, -vars[0], s + 1);
+        for (int i = 1; i < n - 1; i++)
+        {
+            Binary(B, -vars[i], s + i + 1);
+            Binary(B, -(s + i), s + i + 1);
+            Binary(B, -vars[i], -(s + i));
+        }
+        Binary(B, -vars[n - 1], -(s + n - 1));
+    }
+    else if (amo == AMO_COMMANDER && n > 3)
+    {
+        // commander（Klieber 与 Kwon）：每 3 个变元一组，组内两两互斥，
+        // 组的 commander 变元为真当且仅当组内有变元为真，再对 commander 变元递归编码
+        int commanders[MAX_N], m = 0;
+        for (int i = 0; i < n; i += 3)
+        {
+            int k = n - i < 3 ? n - i : 3;
+            int c = ++B->num_vars;
+            PairwiseAmo(B, vars + i, k);
+            BufferPush(B, -c);
+            for (int j = 0; j < k; j++)
+                BufferPush(B, vars[i + j]);
+            BufferPush(B, 0);
+            for (int j = 0; j < k; j++)
+                Binary(B, -vars[i + j], c);
+            commanders[m++] = c;
+        }
+        AtMostOne(B, commanders, m, amo);
+    }
+    else if (amo == AMO_PRODUCT && n > 4)
+    {
+        // product（Chen）：变元排成 p x q 的网格，为真的变元蕴含所在行与列的辅助变元为真，
+        // 行与列的辅助变元再各自至多一个为真
+        int p = (int)ceil(sqrt((double)n)), q = (n + p - 1) / p;
+        int rows[MAX_N], cols[MAX_N];
+        for (int a = 0; a < p; a++)
+            rows[a] = ++B->num_vars;
+        for (int b = 0; b < q; b++)
+            cols[b] = ++B->num_vars;
+        for (int i = 0; i < n; i++)
+        {
+            Binary(B, -vars[i], rows[i / q]);
+            Binary(B, -vars[i], cols[i % q]);
+        }
+        AtMostOne(B, rows, p, amo);
+        AtMostOne(B, cols, q, amo);
+    }
+    else
+        PairwiseAmo(B, vars, n);
+}
+
+// vars 中恰好一个为真：原生约束写为 e 行，否则写“至少一个”的子句与至多一个编码
+static void ExactlyOne(CnfBuffer *B, const int *vars, int n, AmoEncoding amo)
+{
+    if (amo == AMO_NATIVE)
+    {
+        BufferPush(B, EXACTLY_ONE_MARK);
+        AtLeastOne(B, vars, n);
+        return;
+    }
+    AtLeastOne(B, vars, n);
+    AtMostOne(B, vars, n, amo);
+}
+
+// 写出 n x n 对角线数独 grid（行优先，0 表示空格）的 CNF（带 p 行），至多一个约束使用 amo 编码。
+// map_file 为 NULL 时写出完整编码；否则写出代入已知数后的剩余公式，并在 map_file 中写出变元映射：
+// g 行为已知数的自然编码，m 行为剩余公式中的变元及其自然编码（辅助变元不写入映射）。
+// 剩余公式中，已知数彼此冲突或某个空格已没有候选数时含空子句。返回公式的变元数（含辅助变元）
+int SudokuCnf(int n, const int *grid, FILE *cnf_file, FILE *map_file, AmoEncoding amo)
+{
+    int cells = n * n, groups = 3 * n + 2;
+    bool residual = map_file != NULL;
+    bool placed[MAX_GROUPS][MAX_N + 1] = {{false}}; // 剩余公式中组内已有已知数 d
+    bool conflict = false;
+    static int cell_groups[MAX_CELLS][MAX_CELL_GROUPS], cell_group_count[MAX_CELLS];
+    static int group_cells[MAX_GROUPS][MAX_N];
+    int group_size[MAX_GROUPS] = {0};
+
+    for (int cell = 0; cell < cells; cell++)
+    {
+        cell_group_count[cell] = CellGroups(n, cell, cell_groups[cell]);
+        for (int i = 0; i < cell_group_count[cell]; i++)
+        {
+            int g = cell_groups[cell][i];
+            group_cells[g][group_size[g]++] = cell;
+            int digit = grid[cell];
+            if (residual && digit != UNASSIGNED)
+            {
+                conflict |= placed[g][digit];
+                placed[g][digit] = true;
+            }
+        }
+    }
+
+    // 完整编码中每个格子的每个数字都是变元；剩余公式只保留空格中不与同组已知数相同的数字，按行优先顺序连续编号
+    static int var[MAX_CELLS][MAX_N + 1];
+    CnfBuffer B = {NULL, 0, 0, 0, 0};
+    memset(var, 0, sizeof(var));
+    for (int cell = 0; cell < cells; cell++)
+    {
+        if (!residual)
+        {
+            for (int digit = 1; digit <= n; digit++)
+                var[cell][digit] = NaturalVar(n, cell / n, cell % n, digit);
+            continue;
+        }
+        if (grid[cell] != UNASSIGNED)
+            continue;
+        for (int digit = 1; digit <= n; digit++)
+        {
+            bool excluded = false;
+            for (int i = 0; i < cell_group_count[cell] && !excluded; i++)
+                excluded = placed[cell_groups[cell][i]][digit];
+            if (!excluded)
+                var[cell][digit] = ++B.num_vars;
+        }
+    }
+    if (!residual)
+        B.num_vars = cells * n;
+    int num_sudoku_vars = B.num_vars;
+
+    int vars[MAX_N];
+    if (conflict)
+        BufferPush(&B, 0);
+
+    // 完整编码中已知数为单子句
+    for (int cell = 0; cell < cells && !residual; cell++)
+    {
+        int digit = grid[cell];
+        if (digit != UNASSIGNED)
+        {
+            BufferPush(&B, var[cell][digit]);
+            BufferPush(&B, 0);
+        }
+    }
+
+    // 每个（空）格恰好填一个数字，没有候选数时为空子句
+    for (int cell = 0; cell < cells; cell++)
+    {
+        if (residual && grid[cell] != UNASSIGNED)
+            continue;
+        int k = 0;
+        for (int digit = 1; digit <= n; digit++)
+            if (var[cell][digit])
+                vars[k++] = var[cell][digit];
+        ExactlyOne(&B, vars, k, amo);
+    }
+
+    // 每组中（尚未出现的）每个数字恰好出现一次，两两互斥时至多一个约束改为下面按格子对写出
+    for (int g = 0; g < groups; g++)
+        for (int digit = 1; digit <= n; digit++)
+        {
+            if (placed[g][digit])
+                continue;
+            int k = 0;
+            for (int i = 0; i < n; i++)
+                if (var[group_cells[g][i]][digit])
+                    vars[k++] = var[group_cells[g][i]][digit];
+            if (amo == AMO_PAIRWISE)
+                AtLeastOne(&B, vars, k);
+            else
+                ExactlyOne(&B, vars, k, amo);
+        }
+
+    // 两两互斥只需写同组的格子对：逐组列出格子对，两格同属多个组（如同行又同宫）时只在编号最小的公共组中写出
+    for (int g = 0; g < groups && amo == AMO_PAIRWISE; g++)
+        for (int i = 0; i < n; i++)
+            for (int j = i + 1; j < n; j++)
+            {
+                int a = group_cells[g][i], b = group_cells[g][j], first = g;
+                for (int x = 0; x < cell_group_count[a]; x++)
+                    for (int y = 0; y < cell_group_count[b]; y++)
+                        if (cell_groups[a][x] == cell_groups[b][y] && cell_groups[a][x] < first)
+                            first = cell_groups[a][x];
+                if (first != g)
+                    continue;
+                for (int digit = 1; digit <= n; digit++)
+                    if (var[a][digit] && var[b][digit])
+                        Binary(&B, -var[a][digit], -var[b][digit]);
+            }
+
+    if (residual)
+        fprintf(cnf_file, "c residual %dx%d diagonal sudoku, variables renumbered, see the map file\n", n, n);
+    else
+        fprintf(cnf_file, "c %dx%d diagonal sudoku, natural encoding\n", n, n);
+    fprintf(cnf_file, "c at-most-one encoding: %s\n", AmoEncodingNames[amo]);
+    fprintf(cnf_file, "p cnf %d %d\n", B.num_vars, B.num_clauses);
+    for (int i = 0; i < B.size; i++)
+    {
+        if (B.lits[i] == EXACTLY_ONE_MARK)
+            fprintf(cnf_file, "e ");
+        else
+            fprintf(cnf_file, B.lits[i] ? "%d " : "%d\n", B.lits[i]);
+    }
+    free(B.lits);
+
+    if (map_file)
+    {
+        fprintf(map_file, "c map %d %d\n", num_sudoku_vars, B.num_clauses);
+        fprintf(map_file, "c size %d\n", n);
+        for (int cell = 0; cell < cells; cell++)
+            if (grid[cell] != UNASSIGNED)
+                fprintf(map_file, "g %d\n", NaturalVar(n, cell / n, cell % n, grid[cell]));
+        for (int cell = 0; cell < cells; cell++)
+            for (int digit = 1; digit <= n; digit++)
+                if (var[cell][digit])
+                    fprintf(map_file, "m %d %d\n", var[cell][digit], NaturalVar(n, cell / n, cell % n, digit));
+    }
+    return B.num_vars;
+}
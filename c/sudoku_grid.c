@@ -0,0 +1,132 @@
+// sudoku_grid.c
+// n x n 对角线数独的盘面与编码：分组、自然编码与语义编码的换算，以及题目文件的读写。
+
+#include "head.h"
+
+// 宫的边长：n 为 4、9、16 或 25 时返回其平方根，否则返回 0
+int BoxSize(int n)
+{
+    for (int box = 2; box * box <= MAX_N; box++)
+        if (box * box == n)
+            return box;
+    return 0;
+}
+
+// 单元格所属的组（n 行、n 列、n 宫与两条对角线，依次编号），返回组数（3 到 5）
+int CellGroups(int n, int cell, int groups[5])
+{
+    int box = BoxSize(n), row = cell / n, col = cell % n, k = 0;
+    groups[k++] = row;
+    groups[k++] = n + col;
+    groups[k++] = 2 * n + (row / box) * box + col / box;
+    if (row == col)
+        groups[k++] = 3 * n;
+    if (row + col == n - 1)
+        groups[k++] = 3 * n + 1;
+    return k;
+}
+
+// 自然编码，row、col 从 0 开始，digit 从 1 开始
+int NaturalVar(int n, int row, int col, int digit)
+{
+    return (row * n + col) * n + digit;
+}
+
+void NaturalDecode(int n, int var, int *row, int *col, int *digit)
+{
+    *digit = (var - 1) % n + 1;
+    *col = (var - 1) / n % n;
+    *row = (var - 1) / (n * n);
+}
+
+// 语义编码中行、列、数字各占的进制：大于 n 的最小的 10 的幂
+int SemanticBase(int n)
+{
+    int base = 10;
+    while (base <= n)
+        base *= 10;
+    return base;
+}
+
+// 语义编码，row、col 从 0 开始，digit 从 1 开始
+int SemanticVar(int n, int row, int col, int digit)
+{
+    int base = SemanticBase(n);
+    return ((row + 1) * base + col + 1) * base + digit;
+}
+
+void SemanticDecode(int n, int lit, int *row, int *col, int *digit)
+{
+    int base = SemanticBase(n);
+    *digit = lit % base;
+    *col = lit / base % base - 1;
+    *row = lit / (base * base) - 1;
+}
+
+// 读取以空白分隔的 n * n 个数字（0 表示空格）构成的题目，返回边长 n；
+// 数字个数不是 16、81、256 或 625，或有数字超出 0 到 n 时返回 0
+int ReadGrid(FILE *file, int *grid)
+{
+    int count = 0, value;
+    while (fscanf(file, "%d", &value) == 1)
+    {
+        if (count == MAX_CELLS)
+            return 0;
+        grid[count++] = value;
+    }
+    if (!feof(file))
+        return 0;
+    int n = (int)lround(sqrt((double)count));
+    if (n * n != count || !BoxSize(n))
+        return 0;
+    for (int cell = 0; cell < count; cell++)
+        if (grid[cell] < 0 || grid[cell] > n)
+            return 0;
+    return n;
+}
+
+// 读取语义编码的题目文件（每行一个 “行列数 0” 形式的文字），返回边长 n，文件中的文字超出范围时返回 0
+int ReadSemanticGrid(FILE *file, int *grid)
+{
+    char line[256];
+    int n = DEFAULT_N;
+    memset(grid, 0, MAX_CELLS * sizeof(int));
+    while (fgets(line, sizeof(line), file))
+    {
+        int lit;
+        if (line[0] == 'c')
+        {
+            if (sscanf(line, "c size %d", &n) == 1 && !BoxSize(n))
+                return 0;
+            continue;
+        }
+        if (line[0] == 'p' || sscanf(line, "%d", &lit) != 1 || lit <= 0)
+            continue;
+        int row, col, digit;
+        SemanticDecode(n, lit, &row, &col, &digit);
+        if (row < 0 || row >= n || col < 0 || col >= n || digit < 1 || digit > n)
+            return 0;
+        grid[row * n + col] = digit;
+    }
+    return n;
+}
+
+// 以语义编码写出题目中已有的数字，首行记录边长
+void WriteSemanticGivens(FILE *file, int n, const int *grid)
+{
+    fprintf(file, "c size %d\n", n);
+    for (int cell = 0; cell < n * n; cell++)
+        if (grid[cell] != UNASSIGNED)
+            fprintf(file, "%d 0\n", SemanticVar(n, cell / n, cell % n, grid[cell]));
+}
+
+// 以每行 n 个以空格分隔的数字的格式写出盘面
+void PrintGrid(FILE *file, int n, const int *grid)
+{
+    for (int row = 0; row < n; row++)
+    {
+        for (int col = 0; col < n; col++)
+            fprintf(file, "%d ", grid[row * n + col]);
+        fprintf(file, "\n");
+    }
+}
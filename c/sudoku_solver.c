@@ -1,331 +1,223 @@
 // sudoku_solver.c
 
-#include "head.h"
+#include "sat.h"
 
-// DPLL 求解器
-status DpllSolver(ClauseNode *s, int *truth_table)
+// 按 test_case 中 .res 文件的 s/v/t 格式写出求解结果，并用注释行记录求解配置。
+// 到达资源限制时 s 行为 -1，t 行为停止前已用的时间
+status WriteRes(const char *res_path, Solver *S, status result, const char *engine, double ms)
 {
-    ClauseNode *s_tmp = s;
-    ClauseNode *unit_clause = IsUnitClause(s_tmp);
+    FILE *res_file = fopen(res_path, "w");
+    if (!res_file)
+        return ERROR;
 
-    printf("Starting DPLL solver...\n");
-
-    while (unit_clause)
-    {
-        RecordTruth(unit_clause, truth_table);
-        int var = unit_clause->right->data;
-
-        RemoveVar(s, var);
-
-        if (s->down == NULL)
-        {
-            
-            return FOUND;
-        }
-        else if (IsEmptyClause(s))
-        {
-           
-            return NOTFOUND;
-        }
-
-        s_tmp = s;
-        unit_clause = IsUnitClause(s_tmp);
-    }
-
-    int var = PickVar(s);
-
-    if (DpllSolver(AddClause(CopyS(s), var), truth_table))
+    fprintf(res_file, "c config -e %s -h %s\n", engine, S->heuristic->name);
+    fprintf(res_file, "s %d\n", result == FOUND ? 1 : result == UNKNOWN ? -1 : 0);
+    if (result == FOUND)
     {
-        
-        return FOUND;
+        fprintf(res_file, "v ");
+        for (int v = 1; v <= S->num_vars; v++)
+            fprintf(res_file, "%d ", S->value[v] == VAL_TRUE ? v : -v);
+        fprintf(res_file, "\n");
     }
-
-
-    return DpllSolver(AddClause(s, -var), truth_table);
+    fprintf(res_file, "t %.2f\n", ms);
+    fclose(res_file);
+    return OK;
 }
 
-// 添加子句至子句集
-ClauseNode *AddClause(ClauseNode *s, int var)
+// CNF 文件是否为 convert_to_cnf.exe 或 generate_diagonal_sudoku.exe 的 -m 选项写出的剩余公式（首行为 "c residual ..."）
+static bool IsResidualCnf(const char *cnf_path)
 {
-    ClauseNode *c_tmp = (ClauseNode *)malloc(sizeof(ClauseNode));
-    c_tmp->right = (LiteralNode *)malloc(sizeof(LiteralNode));
-    c_tmp->right->data = var;
-    c_tmp->right->right = NULL;
-    c_tmp->down = s->down;
-    s->down = c_tmp;
-    return s;
+    char line[64] = "";
+    FILE *f = fopen(cnf_path, "r");
+    if (!f)
+        return false;
+    if (!fgets(line, sizeof(line), f))
+        line[0] = '\0';
+    fclose(f);
+    return strncmp(line, "c residual", 10) == 0;
 }
 
-// 判断是否存在单子句
-ClauseNode *IsUnitClause(ClauseNode *s)
+// 读取剩余公式的变元映射（-m 选项写出的 .map 文件），把剩余公式的赋值 truth（下标为变元编号减 1）
+// 还原为完整编码的赋值 natural（下标为自然编码减 1，共 n^3 个）：已知数为真，m 行中为真的变元对应的自然编码为真。
+// 边长取映射中 "c size" 行记录的值并写入 *n。映射无法打开或内容超出范围时返回 ERROR
+static status ApplyVarMap(const char *map_path, const int *truth, int num_vars, int *n, int *natural)
 {
-    ClauseNode *c_tmp = s;
-    while (c_tmp)
+    FILE *f = fopen(map_path, "r");
+    if (!f)
+        return ERROR;
+    char line[128];
+    int size = *n, var, nat;
+    status ok = OK;
+    memset(natural, 0, MAX_CELLS * MAX_N * sizeof(int));
+    while (ok && fgets(line, sizeof(line), f))
     {
-        if (c_tmp->right && !c_tmp->right->right)
-            return c_tmp;
-        c_tmp = c_tmp->down;
+        if (sscanf(line, "c size %d", &size) == 1)
+            ok = BoxSize(size) ? OK : ERROR;
+        else if (sscanf(line, "g %d", &nat) == 1)
+            ok = nat > 0 && nat <= size * size * size ? (natural[nat - 1] = 1, OK) : ERROR;
+        else if (sscanf(line, "m %d %d", &var, &nat) == 2)
+        {
+            ok = var > 0 && var <= num_vars && nat > 0 && nat <= size * size * size ? OK : ERROR;
+            if (ok && truth[var - 1] == 1)
+                natural[nat - 1] = 1;
+        }
     }
-    return NULL;
+    fclose(f);
+    *n = size;
+    return ok;
 }
 
-// 复制子句集
-ClauseNode *CopyS(ClauseNode *s)
-{
-    ClauseNode *s_new, *c_tmp, *s_origin = s->down;
-    s_new = (ClauseNode *)malloc(sizeof(ClauseNode));
-    s_new->right = NULL;
-    c_tmp = s_new;
-
-    while (s_origin)
-    {
-        c_tmp->down = CopyClause(s_origin);
-        c_tmp = c_tmp->down;
-        s_origin = s_origin->down;
-    }
-    return s_new;
-}
+// 主程序入口
 
-// 复制单个子句
-ClauseNode *CopyClause(ClauseNode *s)
+int main(int argc, char *argv[])
 {
-    ClauseNode *clause_tmp = (ClauseNode *)malloc(sizeof(ClauseNode));
-    LiteralNode *literal_tmp, *s_tmp = s->right;
-
-    clause_tmp->down = NULL;
-    clause_tmp->right = NULL;
-
-    if (s_tmp)
-    {
-        literal_tmp = (LiteralNode *)malloc(sizeof(LiteralNode));
-        literal_tmp->data = s_tmp->data;
-        literal_tmp->right = NULL;
-        s_tmp = s_tmp->right;
-        clause_tmp->right = literal_tmp;
-    }
-
-    while (s_tmp)
+    const char *engine = "dpll";
+    const char *heuristic = NULL;
+    const char *res_path = NULL;
+    const char *cnf_path = NULL;
+    const char *preprocess = NULL;
+    const char *map_path = NULL; // 剩余公式的变元映射，指定时 solution.cnf 经映射还原为完整盘面
+    double progress_ms = 0;
+    double start_ms = WallClockMs(); // 时间限制包括读取与预处理
+    SolverLimits limits = {0};
+    PreprocessOptions pre_opt;
+    // 二进制缓存默认关闭，由 -c <目录> 或环境变量 SUDOKU_CNF_CACHE 指定缓存目录时才使用，-n 关闭缓存；
+    // 大小上限（MB）可由环境变量修改
+    const char *cache_dir = getenv("SUDOKU_CNF_CACHE");
+    long long cache_mb = getenv("SUDOKU_CNF_CACHE_MB") ? atoll(getenv("SUDOKU_CNF_CACHE_MB")) : 64;
+    int n = DEFAULT_N; // 数独盘面边长，决定解文件中前 n^3 个变元的换算
+    for (int i = 1; i < argc; i++)
     {
-        literal_tmp->right = (LiteralNode *)malloc(sizeof(LiteralNode));
-        literal_tmp->right->data = s_tmp->data;
-        literal_tmp->right->right = NULL;
-        literal_tmp = literal_tmp->right;
-        s_tmp = s_tmp->right;
+        if (strcmp(argv[i], "-e") == 0 && i + 1 < argc)
+            engine = argv[++i];
+        else if (strcmp(argv[i], "-h") == 0 && i + 1 < argc)
+            heuristic = argv[++i];
+        else if (strcmp(argv[i], "-r") == 0 && i + 1 < argc)
+            res_path = argv[++i];
+        else if (strcmp(argv[i], "-c") == 0 && i + 1 < argc)
+            cache_dir = argv[++i];
+        else if (strcmp(argv[i], "-n") == 0)
+            cache_dir = NULL;
+        else if (strcmp(argv[i], "-p") == 0 && i + 1 < argc)
+            preprocess = argv[++i];
+        else if (strcmp(argv[i], "-v") == 0 && i + 1 < argc)
+            progress_ms = atof(argv[++i]);
+        else if (strcmp(argv[i], "-t") == 0 && i + 1 < argc)
+            limits.time_ms = atof(argv[++i]) * 1000;
+        else if (strcmp(argv[i], "-d") == 0 && i + 1 < argc)
+            limits.decisions = atoll(argv[++i]);
+        else if (strcmp(argv[i], "-k") == 0 && i + 1 < argc)
+            limits.conflicts = atoll(argv[++i]);
+        else if (strcmp(argv[i], "-m") == 0 && i + 1 < argc)
+            limits.memory_mb = atoll(argv[++i]);
+        else if (strcmp(argv[i], "-s") == 0 && i + 1 < argc)
+            n = atoi(argv[++i]);
+        else if (strcmp(argv[i], "-M") == 0 && i + 1 < argc)
+            map_path = argv[++i];
+        else if (cnf_path)
+        {
+            cnf_path = NULL;
+            break;
+        }
+        else
+            cnf_path = argv[i];
     }
-    return clause_tmp;
-}
-
-// 删除子句
-ClauseNode *DeleteClause(ClauseNode *s)
-{
-    ClauseNode *c_tmp = s;
-    LiteralNode *l;
-    while (s->right)
+    if (!cnf_path || (strcmp(engine, "dpll") != 0 && strcmp(engine, "cdcl") != 0) ||
+        !BoxSize(n) || (heuristic && !FindHeuristic(heuristic)) || (preprocess && !PreprocessParseOptions(&pre_opt, preprocess)))
     {
-        l = s->right;
-        s->right = s->right->right;
-        free(l);
+        fprintf(stderr, "Usage: %s [-e dpll|cdcl] [-h heuristic] [-p techniques] [-v progress ms] [-t seconds] [-d decisions] [-k conflicts] [-m memory MB] [-s 4|9|16|25] [-M var map] [-r res file path] [-c cache dir | -n] <cnf file path>\n", argv[0]);
+        fprintf(stderr, "Heuristics:\n");
+        for (const Heuristic *h = Heuristics; h->name; h++)
+            fprintf(stderr, "  %-6s %s\n", h->name, h->description);
+        fprintf(stderr, "Preprocessing (-p all|none|name[:ms],...):");
+        for (int t = 0; t < PRE_COUNT; t++)
+            fprintf(stderr, " %s", PreprocessNames[t]);
+        fprintf(stderr, "\n");
+        return 1;
     }
-    s = s->down;
-    free(c_tmp);
-    return s;
-}
-
-// 删除负变元
-ClauseNode *DeleteLiteral(ClauseNode *s, int var)
-{
-    LiteralNode *l = s->right, *l_tmp;
+    CnfFormula *cnf = cache_dir && *cache_dir ? CnfLoadCached(cnf_path, cache_dir, cache_mb << 20) : CnfLoad(cnf_path);
 
-    if (l->data == -var)
-    {
-        l_tmp = s->right->right;
-        free(l);
-        s->right = l_tmp;
-        return s;
-    }
-    else if (l->data == var)
+    if (!cnf)
     {
-        return NULL;
+        fprintf(stderr, "Error reading CNF file: %s\n", cnf_path);
+        return 1;
     }
-
-    while (l)
+    int *truth_table = (int *)calloc(cnf->num_vars + n * n * n, sizeof(int));
+
+    // 将 CSR 形式的子句集装入求解器，开启预处理时装入化简后的子句集。
+    // 预处理只认识子句，公式含恰好一个约束时跳过预处理
+    Solver *S = SolverNew(cnf->num_vars);
+    Preprocessor *P = NULL;
+    double pre_begin = WallClockMs();
+    if (preprocess && cnf->num_exactly_one > 0)
     {
-        if (l->right && l->right->data == -var)
-        {
-            l_tmp = l->right;
-            l->right = l->right->right;
-            free(l_tmp);
-        }
-        else if (l->right && l->right->data == var)
-        {
-            return NULL;
-        }
-        l = l->right;
+        printf("c preprocessing skipped: %d exactly-one constraints\n", cnf->num_exactly_one);
+        preprocess = NULL;
     }
-    return s;
-}
-
-// 判断是否存在空子句
-status IsEmptyClause(ClauseNode *s)
-{
-    ClauseNode *c_tmp = s->down;
-    while (c_tmp)
+    if (preprocess)
     {
-        if (!c_tmp->right)
-            return YES;
-        c_tmp = c_tmp->down;
+        P = PreprocessNew(cnf);
+        PreprocessRun(P, &pre_opt);
+        PreprocessLoad(P, S);
+        PreprocessPrintStats(P, &pre_opt, stdout);
+        fflush(stdout); // 求解超时被结束时统计信息也已输出
     }
-    return NO;
-}
-
-// 记录单子句中元素的真值
-status RecordTruth(ClauseNode *s, int *truth_table)
-{
-    int idx = abs(s->right->data) - 1;
-    if (s->right->data > 0)
-        truth_table[idx] = 1;
     else
-        truth_table[idx] = 0;
-    return OK;
-}
-
-// 删除变元所在子句与负变元
-status RemoveVar(ClauseNode *s, int var)
-{
-    ClauseNode *c_tmp = s->down, *last_c_tmp = s;
-    while (c_tmp)
     {
-        c_tmp = DeleteLiteral(c_tmp, var);
-        if (c_tmp == NULL)
-        {
-            c_tmp = DeleteClause(last_c_tmp->down);
-            last_c_tmp->down = c_tmp;
-            continue;
-        }
-        if (c_tmp == NULL)
-            break;
-        last_c_tmp = c_tmp;
-        c_tmp = c_tmp->down;
+        SolverAddConstraints(S, cnf->lits, cnf->offsets, cnf->num_clauses, cnf->exactly_one, cnf->num_exactly_one);
     }
-    return OK;
-}
-
-// 选取一个变元
-int PickVar(ClauseNode *s)
-{
-    int var = s->down->right->data;
-    return var;
-}
-
-// 打印子句集
-status Print(ClauseNode *s)
-{
-    ClauseNode *c_tmp = s->down;
-    LiteralNode *l_tmp;
-    printf("\n-----Start-----\n");
-    while (c_tmp)
+    double pre_ms = WallClockMs() - pre_begin;
+    CnfFree(cnf);
+    if (heuristic)
+        SolverSetHeuristic(S, FindHeuristic(heuristic));
+    S->progress_ms = progress_ms;
+    S->limits = limits;
+    S->start_ms = start_ms;
+
+    double begin = WallClockMs();
+    status result = strcmp(engine, "cdcl") == 0 ? CdclSolver(S) : DpllSolver(S);
+    double ms = WallClockMs() - begin + pre_ms;
+    if (P)
     {
-        l_tmp = c_tmp->right;
-        while (l_tmp)
-        {
-
-            l_tmp = l_tmp->right;
-        }
-        if (c_tmp->right)
-            printf("\n");
-        else
-            printf("空\n");
-        c_tmp = c_tmp->down;
+        if (result == FOUND)
+            PreprocessExtendModel(P, S);
+        PreprocessFree(P);
     }
-    printf("------End------\n");
-    return OK;
-}
+    SolverPrintStats(S, stdout);
 
-// 解析 CNF 文件
-ClauseNode *CnfParser(int *literal_num, char *filename, int *max_var)
-{
-    FILE *file = fopen(filename, "r");
-    if (!file)
+    // 指定 .res 文件时只输出求解结果，不写数独解文件
+    if (res_path)
     {
-        printf("Error opening file: %s\n", filename);
-        return NULL;
+        status written = WriteRes(res_path, S, result, engine, ms);
+        if (!written)
+            fprintf(stderr, "Cannot open res file: %s\n", res_path);
+        SolverFree(S);
+        free(truth_table);
+        return written ? 0 : 1;
     }
 
-    ClauseNode *cnf = (ClauseNode *)malloc(sizeof(ClauseNode));
-    cnf->down = NULL;
-    cnf->right = NULL;
-    *max_var = 0;
-
-    char line[11000];
-    while (fgets(line, sizeof(line), file))
+    if (result == FOUND)
+        SolverModel(S, truth_table);
+
+    // solution.cnf 按自然编码换算为语义编码。剩余公式的变元重新编号过，须经 -M 指定的映射还原，
+    // 没有映射时不写语义编码的解；natural_solution.cnf 总是按 CNF 文件自身的变元编号写出
+    static int natural[MAX_CELLS * MAX_N];
+    const int *grid_truth = truth_table;
+    bool residual = IsResidualCnf(cnf_path);
+    int cnf_vars = residual ? S->num_vars : n * n * n; // natural_solution.cnf 中写出的变元范围
+    if (map_path)
     {
-        if (line[0] == 'c' || line[0] == 'p')
+        if (result == FOUND && !ApplyVarMap(map_path, truth_table, S->num_vars, &n, natural))
         {
-            continue;
+            fprintf(stderr, "Cannot read variable map: %s\n", map_path);
+            SolverFree(S);
+            free(truth_table);
+            return 1;
         }
-        ClauseNode *new_clause = (ClauseNode *)malloc(sizeof(ClauseNode));
-        new_clause->down = NULL;
-        new_clause->right = NULL;
-
-        char *token = strtok(line, " ");
-        while (token)
-        {
-            int lit = atoi(token);
-            if (lit == 0)
-                break;
-            if (abs(lit) > *max_var)
-                *max_var = abs(lit); // 记录最大变元编号
-            LiteralNode *literal = (LiteralNode *)malloc(sizeof(LiteralNode));
-            literal->data = lit;
-            literal->right = new_clause->right;
-            new_clause->right = literal;
-
-            token = strtok(NULL, " ");
-        }
-
-        new_clause->down = cnf->down;
-        cnf->down = new_clause;
+        grid_truth = natural;
     }
-    fclose(file);
-    return cnf;
-}
-// 将自然编码转换为语义编码
-void naturalToSemantic(int code, int *i, int *j, int *k)
-{
-    // 计算 k
-    *k = (code % 9 == 0) ? 9 : code % 9;
-
-    // 计算 i
-    *i = (code - *k) / 81 + 1;
-
-    // 计算 j
-    *j = ((code - (*i - 1) * 81 - *k) / 9) + 1;
-}
-
-// 主程序入口
-
-int main(int argc, char *argv[])
-{
-    if (argc != 2)
-    {
-        fprintf(stderr, "Usage: %s <cnf file path>\n", argv[0]);
-        return 1;
-    }
-
-    char cnf_path[256];
-    strcpy(cnf_path, argv[1]);
-    int truth_table[N * N * N] = {0}; // 调整为适应9x9数独
-    int max_var = 0;
-
-    ClauseNode *cnf = CnfParser(truth_table, cnf_path, &max_var);
-
-    if (!cnf)
-    {
-        fprintf(stderr, "Error reading CNF file: %s\n", cnf_path);
-        return 1;
-    }
-
-    status result = DpllSolver(cnf, truth_table);
+    else if (residual)
+        printf("c residual CNF without a variable map (-M), solution.cnf is not decoded\n");
 
     // 打开语义编码的输出文件
     FILE *output_file = fopen("solution.cnf", "w"); // 固定输出文件路径
@@ -346,33 +238,37 @@ int main(int argc, char *argv[])
 
     if (result == FOUND)
     {
-        for (int i = 0; i < N * N * N; i++)
+        if (map_path || !residual)
+            fprintf(output_file, "c size %d\n", n);
+        else
+            fprintf(output_file, "c residual CNF, decode natural_solution.cnf with its variable map\n");
+        for (int i = 0; i < n * n * n && (map_path || !residual); i++)
         {
-            if (truth_table[i] == 1)
+            if (grid_truth[i] == 1)
             {
-
-                // 将自然编码转换为语义编码
+                // 将自然编码转换为语义编码，写入语义编码文件
                 int row, col, num;
-                naturalToSemantic(i + 1, &row, &col, &num);
-
-                // 写入语义编码文件
-                fprintf(output_file, "%d%d%d 0\n", row, col, num);
-
-                // 写入自然编码文件
-                fprintf(natural_output_file, "%d 0\n", i + 1);
+                NaturalDecode(n, i + 1, &row, &col, &num);
+                fprintf(output_file, "%d 0\n", SemanticVar(n, row, col, num));
             }
         }
+        // 写入 CNF 文件自身编号下为真的变元
+        for (int i = 0; i < cnf_vars; i++)
+            if (truth_table[i] == 1)
+                fprintf(natural_output_file, "%d 0\n", i + 1);
     }
     else
     {
-        fprintf(output_file, "s 0\n");
-        fprintf(natural_output_file, "s 0\n");
+        int s = result == UNKNOWN ? -1 : 0;
+        fprintf(output_file, "s %d\n", s);
+        fprintf(natural_output_file, "s %d\n", s);
     }
 
     fclose(output_file);
     fclose(natural_output_file);
 
-    Print(cnf);
+    SolverFree(S);
+    free(truth_table);
 
     return 0;
 }
@@ -55,6 +55,17 @@ class Ui_MainWindow(object):
         font.setPointSize(22)
         self.expert.setFont(font)
         self.expert.setObjectName("expert")
+        self.board_size = QtWidgets.QComboBox(self.centralwidget)
+        self.board_size.setGeometry(QtCore.QRect(450, 640, 221, 61))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(18)
+        self.board_size.setFont(font)
+        self.board_size.setObjectName("board_size")
+        self.board_size.addItem("")
+        self.board_size.addItem("")
+        self.board_size.addItem("")
+        self.board_size.addItem("")
         self.difficulty_back = QtWidgets.QPushButton(self.centralwidget)
         self.difficulty_back.setGeometry(QtCore.QRect(100, 40, 171, 61))
         font = QtGui.QFont()
@@ -72,6 +83,7 @@ class Ui_MainWindow(object):
         MainWindow.setStatusBar(self.statusbar)
 
         self.retranslateUi(MainWindow)
+        self.board_size.setCurrentIndex(1)
         QtCore.QMetaObject.connectSlotsByName(MainWindow)
 
     def retranslateUi(self, MainWindow):
@@ -82,4 +94,8 @@ class Ui_MainWindow(object):
         self.simple.setText(_translate("MainWindow", "基础"))
         self.intermediate.setText(_translate("MainWindow", "中级"))
         self.expert.setText(_translate("MainWindow", "专家"))
+        self.board_size.setItemText(0, _translate("MainWindow", "4 × 4"))
+        self.board_size.setItemText(1, _translate("MainWindow", "9 × 9"))
+        self.board_size.setItemText(2, _translate("MainWindow", "16 × 16"))
+        self.board_size.setItemText(3, _translate("MainWindow", "25 × 25"))
         self.difficulty_back.setText(_translate("MainWindow", "返回"))
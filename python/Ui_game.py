@@ -52,6 +52,20 @@ class Ui_MainWindow(object):
         font.setPointSize(16)
         self.show_button.setFont(font)
         self.show_button.setObjectName("show_button")
+        self.hint_button = QtWidgets.QPushButton(self.centralwidget)
+        self.hint_button.setGeometry(QtCore.QRect(880, 450, 161, 51))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(16)
+        self.hint_button.setFont(font)
+        self.hint_button.setObjectName("hint_button")
+        self.export_button = QtWidgets.QPushButton(self.centralwidget)
+        self.export_button.setGeometry(QtCore.QRect(40, 470, 151, 61))
+        font = QtGui.QFont()
+        font.setFamily("Arial")
+        font.setPointSize(16)
+        self.export_button.setFont(font)
+        self.export_button.setObjectName("export_button")
         self.peek_count = QtWidgets.QLabel(self.centralwidget)
         self.peek_count.setGeometry(QtCore.QRect(900, 550, 171, 31))
         font = QtGui.QFont()
@@ -152,6 +166,7 @@ class Ui_MainWindow(object):
         self.listView.raise_()
         self.label.raise_()
         self.show_button.raise_()
+        self.hint_button.raise_()
         self.game_back.raise_()
         self.sudoku_table.raise_()
         MainWindow.setCentralWidget(self.centralwidget)
@@ -173,6 +188,8 @@ class Ui_MainWindow(object):
         self.check_button.setText(_translate("MainWindow", "检查"))
         self.peek_button.setText(_translate("MainWindow", "偷看答案"))
         self.show_button.setText(_translate("MainWindow", "显示题解"))
+        self.hint_button.setText(_translate("MainWindow", "提示"))
+        self.export_button.setText(_translate("MainWindow", "导出"))
         self.peek_count.setText(_translate("MainWindow", "偷看次数：0"))
         self.game_time.setText(_translate("MainWindow", "游戏时间：00:00"))
         self.check_information.setText(_translate("MainWindow", "这里会显示检查信息！"))
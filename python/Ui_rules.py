@@ -63,11 +63,11 @@ class Ui_RulesWindow(object):
 "p, li { white-space: pre-wrap; }\n"
 "</style></head><body style=\" font-family:\'Bahnschrift SemiLight\'; font-size:28pt; font-weight:400; font-style:normal;\">\n"
 "<h3 style=\" margin-top:14px; margin-bottom:12px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;\"><span style=\" font-size:14pt; font-weight:600;\">游戏目标：</span></h3>\n"
-"<p style=\" margin-top:12px; margin-bottom:12px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;\"><span style=\" font-size:14pt;\">数独是一款经典的数字填充游戏，玩家需要在一个 9x9 的网格中填写数字，使得每一行、每一列以及每个 3x3 宫内都包含 1 到 9 的数字，且每个数字不能重复。玩家可以选择</span><span style=\" font-size:14pt; font-weight:600;\">自动生成初盘</span><span style=\" font-size:14pt;\">或者</span><span style=\" font-size:14pt; font-weight:600;\">人工设置初盘</span><span style=\" font-size:14pt;\">，并且系统会检测人工设置的初盘是否合法。</span></p>\n"
+"<p style=\" margin-top:12px; margin-bottom:12px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;\"><span style=\" font-size:14pt;\">数独是一款经典的数字填充游戏，玩家需要在一个 9x9 的网格中填写数字，使得每一行、每一列、每个 3x3 宫以及两条对角线上都包含 1 到 9 的数字，且每个数字不能重复。玩家可以选择</span><span style=\" font-size:14pt; font-weight:600;\">自动生成初盘</span><span style=\" font-size:14pt;\">或者</span><span style=\" font-size:14pt; font-weight:600;\">人工设置初盘</span><span style=\" font-size:14pt;\">，并且系统会检测人工设置的初盘是否合法。</span></p>\n"
 "<h3 style=\" margin-top:14px; margin-bottom:12px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;\"><span style=\" font-size:14pt; font-weight:600;\">游戏模式：</span></h3>\n"
 "<ol style=\"margin-top: 0px; margin-bottom: 0px; margin-left: 0px; margin-right: 0px; -qt-list-indent: 1;\"><li style=\" font-size:14pt;\" style=\" margin-top:12px; margin-bottom:12px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;\"><span style=\" font-weight:600;\">自动生成初盘</span>：系统会根据玩家选择的难度自动生成一个随机数独题目，题目包含一定数量的空格（根据难度设定，空格数目不同）。玩家需要在规定时间内填入数字，完成数独解题。</li>\n"
-"<li style=\" font-size:14pt;\" style=\" margin-top:12px; margin-bottom:12px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;\"><span style=\" font-weight:600;\">人工设置初盘</span>：玩家可以手动输入数独初盘，通过键盘在 9x9 的网格中设置初始数字。系统将自动检测设置的初盘是否合法，确保每行、每列和每个 3x3 宫内数字不重复。如果初盘不合法，系统会提示玩家重新设置。</li>\n"
-"<li style=\" font-size:14pt;\" style=\" margin-top:12px; margin-bottom:12px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;\"><span style=\" font-weight:600;\">求解数独</span>：游戏提供了一个自动求解功能，使用DPLL算法来计算数独的解。如果玩家卡住了，可以点击“求解”按钮查看完整的答案。</li></ol>\n"
+"<li style=\" font-size:14pt;\" style=\" margin-top:12px; margin-bottom:12px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;\"><span style=\" font-weight:600;\">人工设置初盘</span>：玩家可以手动输入数独初盘，通过键盘在 9x9 的网格中设置初始数字。系统将自动检测设置的初盘是否合法，确保每行、每列、每个 3x3 宫和两条对角线上数字不重复。如果初盘不合法，系统会提示玩家重新设置。</li>\n"
+"<li style=\" font-size:14pt;\" style=\" margin-top:12px; margin-bottom:12px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;\"><span style=\" font-weight:600;\">求解数独</span>：游戏提供了一个自动求解功能，通过约束传播与回溯搜索来计算数独的解。如果玩家卡住了，可以点击“求解”按钮查看完整的答案。</li></ol>\n"
 "<h3 style=\" margin-top:14px; margin-bottom:12px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;\"><span style=\" font-size:14pt; font-weight:600;\">游戏交互功能：</span></h3>\n"
 "<ul style=\"margin-top: 0px; margin-bottom: 0px; margin-left: 0px; margin-right: 0px; -qt-list-indent: 1;\"><li style=\" font-size:14pt;\" style=\" margin-top:12px; margin-bottom:12px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;\"><span style=\" font-weight:600;\">检查</span>：当玩家填写完数独并点击“检查”按钮时，程序会标记出玩家填写正确和错误的数字。正确的答案会以绿色显示，错误的答案会以红色显示。几秒钟后，所有颜色恢复为默认状态。</li>\n"
 "<li style=\" font-size:14pt;\" style=\" margin-top:12px; margin-bottom:12px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;\"><span style=\" font-weight:600;\">偷看答案</span>：玩家可以在游戏过程中点击“偷看答案”按钮，系统会在十秒内展示完整的答案，并在十秒后自动恢复玩家的当前输入状态。</li>\n"
@@ -0,0 +1,183 @@
+"""
+批量求解：把目录或通配符匹配到的 CNF 文件与题目文件分给一组进程并行求解（默认与 CPU 核数相同），
+每个输入写出一个 s/v/t 格式的 .res 文件（与 test_case 中相同），最后输出汇总与吞吐量（每秒求解的算例数）。
+CNF 文件由 sudoku_solver.exe 求解，只写 .res 文件，不写 solution.cnf 等固定路径的文件，多个进程互不干扰。
+题目文件（n 行、每行 n 个以空格分隔的数字，0 表示空格）默认由对角线数独求解器求解，
+v 行为完整编码（convert_to_cnf.exe 不带 -m 时）下 n^3 个变元的赋值；指定 -e dpll|cdcl 时先转换为 CNF 再求解。
+"""
+import argparse
+import glob
+import os
+import subprocess
+import tempfile
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from benchmark import limit_args, read_res
+from board import Board
+from diagonal_solver import solve_cells
+from paths import program_path
+from verifier import STATUS_UNKNOWN, verify_files
+
+CNF_SUFFIX = ".cnf"
+PUZZLE_SUFFIX = ".txt"
+RES_SUFFIX = "_batch.res"  # 结果文件名，例如 1.cnf_batch.res，不覆盖 test_case 中的参考结果
+
+BatchResult = namedtuple("BatchResult", ["path", "res_path", "status", "solve_ms", "error"])
+STATUS_NAMES = {1: "sat", 0: "unsat", STATUS_UNKNOWN: "unknown", None: "failed"}
+
+
+def expand_inputs(patterns):
+    """
+    展开命令行给出的输入：目录取其中全部 .cnf 与 .txt 文件，含通配符时按通配符匹配，否则为文件本身。
+    结果去重并保持顺序
+    """
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths += sorted(glob.glob(os.path.join(pattern, '*' + CNF_SUFFIX)) +
+                            glob.glob(os.path.join(pattern, '*' + PUZZLE_SUFFIX)))
+        elif glob.has_magic(pattern):
+            paths += sorted(glob.glob(pattern))
+        else:
+            paths.append(pattern)
+    return [path for path in dict.fromkeys(paths) if os.path.isfile(path)]
+
+
+def res_path_for(path, output_dir=None):
+    """输入对应的 .res 文件路径，默认与输入在同一目录"""
+    return os.path.join(output_dir or os.path.dirname(path), os.path.basename(path) + RES_SUFFIX)
+
+
+def write_res(res_path, status, literals, ms, engine):
+    """按 sudoku_solver.exe 的 WriteRes 相同的格式写出 .res 文件"""
+    with open(res_path, 'w') as f:
+        f.write(f"c config -e {engine}\n")
+        f.write(f"s {status}\n")
+        if status == 1:
+            f.write("v " + " ".join(str(literal) for literal in literals) + " \n")
+        f.write(f"t {ms:.2f}\n")
+
+
+def solve_cnf(cnf_path, res_path, engine, heuristic, limits, timeout):
+    """用 sudoku_solver.exe 求解一个 CNF 文件，返回 (s 行的结果, t 行的毫秒数)，进程超时被结束时结果为 None"""
+    command = [program_path('sudoku_solver.exe'), '-e', engine, '-r', res_path, *limits]
+    if heuristic:
+        command += ['-h', heuristic]
+    if os.path.exists(res_path):
+        os.remove(res_path)
+    try:
+        subprocess.run(command + [cnf_path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return None, None
+    return read_res(res_path)
+
+
+def solve_puzzle(puzzle_path, res_path, engine, heuristic, limits, timeout, encoding):
+    """
+    求解一个题目文件。native 引擎直接调用对角线数独求解器，把解写成自然编码下的完整赋值；
+    其他引擎先在临时目录中用 convert_to_cnf.exe 转换为完整编码的 CNF，再由 sudoku_solver.exe 求解
+    """
+    if engine != "native":
+        with tempfile.TemporaryDirectory(prefix="batch_") as work_dir:
+            cnf_path = os.path.join(work_dir, "natural.cnf")
+            subprocess.run([program_path('convert_to_cnf.exe'), '-a', encoding, puzzle_path,
+                            os.path.join(work_dir, "semantic.cnf"), cnf_path],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+            return solve_cnf(cnf_path, res_path, engine, heuristic, limits, timeout)
+
+    board = Board.load(puzzle_path)
+    size = board.size
+    start = time.perf_counter()
+    count, cells = solve_cells(board.givens)
+    ms = (time.perf_counter() - start) * 1000
+    literals = []
+    if count:
+        literals = [var if cells[(var - 1) // size] == (var - 1) % size + 1 else -var
+                    for var in range(1, size ** 3 + 1)]
+    write_res(res_path, 1 if count else 0, literals, ms, engine)
+    return (1 if count else 0), ms
+
+
+def solve_one(path, res_path, engine, heuristic, limits, timeout, encoding, verify):
+    """（工作进程）求解一个输入并写出 .res 文件，出错时在 error 中给出原因"""
+    try:
+        if path.endswith(CNF_SUFFIX):
+            status, ms = solve_cnf(path, res_path, "cdcl" if engine == "native" else engine,
+                                   heuristic, limits, timeout)
+        else:
+            status, ms = solve_puzzle(path, res_path, engine, heuristic, limits, timeout, encoding)
+    except (OSError, ValueError, subprocess.CalledProcessError) as e:
+        return BatchResult(path, res_path, None, None, str(e))
+    if status is None:
+        return BatchResult(path, res_path, None, None, "timeout")
+    if verify and status == 1 and path.endswith(CNF_SUFFIX) and not verify_files(path, res_path).ok:
+        return BatchResult(path, res_path, None, ms, "wrong model")
+    return BatchResult(path, res_path, status, ms, None)
+
+
+def run_batch(paths, output_dir=None, workers=None, engine="native", heuristic=None, limits=(), timeout=None,
+              encoding="pairwise", verify=False, on_result=None):
+    """
+    在 workers 个进程（默认与 CPU 核数相同）中求解 paths 中的全部输入，返回 (BatchResult 列表, 墙钟秒数)。
+    on_result 不为 None 时每完成一个输入调用一次
+    """
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    results = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        futures = [executor.submit(solve_one, path, res_path_for(path, output_dir), engine, heuristic,
+                                   list(limits), timeout, encoding, verify) for path in paths]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if on_result:
+                on_result(result)
+    return results, time.perf_counter() - start
+
+
+def print_summary(results, elapsed):
+    counts = Counter(STATUS_NAMES[result.status] for result in results)
+    solve_ms = [result.solve_ms for result in results if result.solve_ms is not None]
+    print(f"{len(results)} instances in {elapsed:.2f} s, {len(results) / elapsed if elapsed else 0:.1f} instances/s")
+    print("  " + ", ".join(f"{name} {counts[name]}" for name in ("sat", "unsat", "unknown", "failed")))
+    if solve_ms:
+        print(f"  solver time: total {sum(solve_ms):.2f} ms, mean {sum(solve_ms) / len(solve_ms):.3f} ms, "
+              f"max {max(solve_ms):.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="并行求解目录或通配符匹配到的 CNF 文件与题目文件，每个输入写出一个 .res 文件")
+    parser.add_argument("inputs", nargs="+", help="CNF 文件、题目文件、目录或通配符（如 'puzzles/*.txt'）")
+    parser.add_argument("-o", "--output-dir", help=f".res 文件的输出目录，默认与输入相同，文件名为 <输入>{RES_SUFFIX}")
+    parser.add_argument("-j", "--workers", type=int, help="并行进程数，默认为 CPU 核数")
+    parser.add_argument("-e", "--engine", default="native", choices=["native", "dpll", "cdcl"],
+                        help="题目文件的求解引擎，CNF 文件在 native 时用 cdcl 求解")
+    parser.add_argument("-H", "--heuristic", help="sudoku_solver.exe 的变元选择策略")
+    parser.add_argument("-a", "--encoding", default="pairwise", help="题目文件转换为 CNF 时的至多一个编码")
+    parser.add_argument("-t", "--time-limit", type=float, help="每个输入的求解时间限制（秒），到达时 s 行为 -1")
+    parser.add_argument("--timeout", type=float, help="每个求解进程的超时（秒），超时后结束进程，结果记为 failed")
+    parser.add_argument("--verify", action="store_true", help="验证 CNF 文件的可满足结果")
+    parser.add_argument("-q", "--quiet", action="store_true", help="不逐个输出结果")
+    args = parser.parse_args()
+
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        print("No input files found.")
+        return 2
+
+    def report(result):
+        if not args.quiet or result.error:
+            detail = result.error or f"{result.solve_ms:.3f} ms"
+            print(f"{os.path.basename(result.path):<32} s {STATUS_NAMES[result.status]:<8} {detail}")
+
+    results, elapsed = run_batch(paths, args.output_dir, args.workers, args.engine, args.heuristic,
+                                 limit_args(args.time_limit), args.timeout, args.encoding, args.verify, report)
+    print_summary(results, elapsed)
+    return 1 if any(result.status is None for result in results) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,362 @@
+"""
+基准测试：用每种引擎与策略求解 test_case 中的全部算例，记录耗时、内存与求解器计数，并与基线比较。
+--encodings 时改为生成若干道题目，用每种至多一个编码转换为 CNF 后求解，比较子句数、内存与求解时间；
+--sizes 指定生成题目的盘面边长（4、9、16、25），比较各引擎与编码随题目规模增长的表现。
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+
+from diagonal_solver import read_semantic_cnf, write_grid
+from paths import program_path
+from verifier import STATUS_UNKNOWN, read_numbers, verify_files
+
+ENGINES = ["dpll", "cdcl"]
+HEURISTICS = ["first", "freq", "next", "jw", "moms", "vsids"]
+# 与 c/head.h 中的 AmoEncodingNames 一致
+ENCODINGS = ["pairwise", "sequential", "commander", "product", "native"]
+SIZES = [4, 9, 16, 25]
+DEFAULT_CASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../test_case')
+
+
+def read_res(res_path):
+    """读取 .res 文件，返回 (s 行的结果, t 行的毫秒数)，缺失的项为 None"""
+    status, solve_ms = None, None
+    try:
+        with open(res_path, 'r') as f:
+            for line in f:
+                if line.startswith("s "):
+                    status = int(line.split()[1])
+                elif line.startswith("t "):
+                    solve_ms = float(line.split()[1])
+    except OSError:
+        pass
+    return status, solve_ms
+
+
+def parse_counters(output):
+    """解析求解器输出中 "c <名称> <数值>" 形式的统计行"""
+    counters = {}
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) == 3 and parts[0] == "c" and parts[2].lstrip("-").isdigit():
+            counters[parts[1]] = int(parts[2])
+    return counters
+
+
+def parse_limit(output):
+    """求解器到达资源限制时输出的 "c limit <限制>" 中的限制名称，未到达时返回 None"""
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) == 3 and parts[:2] == ["c", "limit"]:
+            return parts[2]
+    return None
+
+
+def limit_args(time_limit=None, decisions=None, conflicts=None, memory_mb=None):
+    """资源限制对应的求解器参数，None 表示不限制"""
+    args = []
+    for flag, value in (('-t', time_limit), ('-d', decisions), ('-k', conflicts), ('-m', memory_mb)):
+        if value:
+            args += [flag, str(value)]
+    return args
+
+
+def run_once(cnf_path, engine, heuristic, res_path, timeout, preprocess=None, limits=()):
+    """
+    运行一次求解器，返回包含墙钟时间、峰值内存与计数的字典。limits 为 limit_args 生成的资源限制参数，
+    求解器到达限制时结果为 STATUS_UNKNOWN，limit 记录到达的限制。
+    峰值内存取自 os.wait4 的资源统计，仅在支持 wait4 的系统上可用。
+    求解器以 -n 运行，即使设置了 SUDOKU_CNF_CACHE 也不读写二进制缓存，每次都解析文本 CNF，
+    各次重复的计时条件相同，也不受之前运行留下的缓存影响。
+    """
+    command = [program_path('sudoku_solver.exe'), '-n', '-e', engine, '-h', heuristic, '-r', res_path, *limits]
+    if preprocess:
+        command += ['-p', preprocess]
+    command.append(cnf_path)
+    if os.path.exists(res_path):
+        os.remove(res_path)
+
+    with tempfile.TemporaryFile(mode='w+') as output:
+        start = time.perf_counter()
+        process = subprocess.Popen(command, stdout=output, stderr=subprocess.DEVNULL)
+        timer = threading.Timer(timeout, process.kill) if timeout else None
+        if timer:
+            timer.start()
+        peak_rss_kb = None
+        if hasattr(os, 'wait4'):
+            _, wait_status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(wait_status)
+            peak_rss_kb = usage.ru_maxrss
+        else:
+            process.wait()
+        wall_ms = (time.perf_counter() - start) * 1000
+        if timer:
+            timer.cancel()
+        output.seek(0)
+        text = output.read()
+        counters = parse_counters(text)
+
+    status, solve_ms = read_res(res_path) if process.returncode == 0 else (None, None)
+    # 可满足的结果用验证器检查赋值是否满足全部子句
+    verified = verify_files(cnf_path, res_path).ok if status == 1 else None
+    return {
+        "status": status,
+        "verified": verified,
+        "wall_ms": wall_ms,
+        "solve_ms": solve_ms,
+        "peak_rss_kb": peak_rss_kb,
+        "limit": parse_limit(text) if status == STATUS_UNKNOWN else None,
+        "counters": counters,
+    }
+
+
+def run_benchmark(cnf_paths, engines, heuristics, repeats, timeout, res_dir, preprocess=None, limits=()):
+    """
+    对每个算例与配置重复求解 repeats 次，汇总为记录列表，preprocess 为求解器的 -p 参数。
+    到达资源限制的运行不计入 solved_runs 与耗时统计，只有全部运行都未得出结论时记录的结果才为 STATUS_UNKNOWN。
+    """
+    os.makedirs(res_dir, exist_ok=True)
+    records = []
+    for cnf_path in cnf_paths:
+        instance = os.path.basename(cnf_path)
+        for engine in engines:
+            for heuristic in heuristics:
+                res_path = os.path.join(res_dir, f"{instance}_{engine}_{heuristic}.res")
+                runs = [run_once(cnf_path, engine, heuristic, res_path, timeout, preprocess, limits)
+                        for _ in range(repeats)]
+                solved = [run for run in runs if run["status"] in (0, 1)]
+                unknown = [run for run in runs if run["status"] == STATUS_UNKNOWN]
+                walls = [run["wall_ms"] for run in solved]
+                rss = [run["peak_rss_kb"] for run in runs if run["peak_rss_kb"] is not None]
+                record = {
+                    "instance": instance,
+                    "engine": engine,
+                    "heuristic": heuristic,
+                    "preprocess": preprocess,
+                    "status": solved[-1]["status"] if solved else STATUS_UNKNOWN if unknown else None,
+                    "verified": None if not solved or solved[-1]["status"] != 1 else
+                    all(run["verified"] for run in solved),
+                    "runs": repeats,
+                    "solved_runs": len(solved),
+                    "unknown_runs": len(unknown),
+                    "limit": unknown[-1]["limit"] if unknown else None,
+                    "wall_ms_median": statistics.median(walls) if walls else None,
+                    "wall_ms_min": min(walls) if walls else None,
+                    "wall_ms_max": max(walls) if walls else None,
+                    "solve_ms_median": statistics.median(run["solve_ms"] for run in solved) if solved else None,
+                    "peak_rss_kb": max(rss) if rss else None,
+                    "counters": solved[-1]["counters"] if solved else runs[-1]["counters"],
+                }
+                records.append(record)
+                wall = f"{record['wall_ms_median']:.2f} ms" if walls else \
+                    f"limit {record['limit']}" if unknown else "timeout"
+                wrong = "  WRONG MODEL" if record["verified"] is False else ""
+                print(f"{instance:<24} {engine}/{heuristic:<6} s {record['status']}  {wall}{wrong}")
+    return records
+
+
+def generate_encoded_cases(encodings, count, level, residual, directory, sizes=(9,)):
+    """
+    为每种盘面边长生成 count 道难度为 level 的题目，每道题目用每种编码转换为 CNF（residual 时为剩余公式），
+    返回 [(CNF 文件, 边长, 编码, 变元数, 子句数, 文件字节数)]
+    """
+    os.makedirs(directory, exist_ok=True)
+    cases = []
+    for size in sizes:
+        for index in range(count):
+            name = os.path.join(directory, f"size{size}_puzzle{index}")
+            semantic, puzzle = f"{name}_semantic.cnf", f"{name}.txt"
+            subprocess.run([program_path('generate_diagonal_sudoku.exe'), '-s', str(size), str(level), semantic,
+                            f"{name}_natural.cnf"], stdout=subprocess.DEVNULL, check=True)
+            write_grid(puzzle, read_semantic_cnf(semantic))
+            for encoding in encodings:
+                cnf_path = f"{name}_{encoding}.cnf"
+                command = [program_path('convert_to_cnf.exe'), '-a', encoding]
+                if residual:
+                    command += ['-m', f"{name}_{encoding}.map"]
+                subprocess.run(command + [puzzle, semantic, cnf_path], stdout=subprocess.DEVNULL, check=True)
+                _, header = read_numbers(cnf_path)
+                cases.append((cnf_path, size, encoding, header[0], header[1], os.path.getsize(cnf_path)))
+    return cases
+
+
+def run_encoding_benchmark(cases, engines, heuristics, repeats, timeout, res_dir, limits=()):
+    """对 generate_encoded_cases 生成的算例运行 run_benchmark，记录中加入盘面边长、编码与公式的规模"""
+    records = []
+    for cnf_path, size, encoding, num_vars, num_clauses, cnf_bytes in cases:
+        for record in run_benchmark([cnf_path], engines, heuristics, repeats, timeout, res_dir, limits=limits):
+            record.update(size=size, encoding=encoding, num_vars=num_vars, num_clauses=num_clauses,
+                          cnf_bytes=cnf_bytes)
+            records.append(record)
+    return records
+
+
+def summarize_encodings(records):
+    """按盘面边长、编码与引擎汇总：平均变元数、子句数、文件大小，最大峰值内存与中位求解时间"""
+    rows = []
+    keys = dict.fromkeys((record["size"], record["encoding"], record["engine"]) for record in records)
+    for size, encoding, engine in keys:
+        group = [record for record in records
+                 if (record["size"], record["encoding"], record["engine"]) == (size, encoding, engine)]
+        solved = [record["solve_ms_median"] for record in group if record["solve_ms_median"] is not None]
+        rss = [record["peak_rss_kb"] for record in group if record["peak_rss_kb"] is not None]
+        rows.append({
+            "size": size,
+            "encoding": encoding,
+            "engine": engine,
+            "num_vars": statistics.mean(record["num_vars"] for record in group),
+            "num_clauses": statistics.mean(record["num_clauses"] for record in group),
+            "cnf_kb": statistics.mean(record["cnf_bytes"] for record in group) / 1024,
+            "peak_rss_kb": max(rss) if rss else None,
+            "solve_ms_median": statistics.median(solved) if solved else None,
+            "solved": f"{len(solved)}/{len(group)}",
+        })
+    return rows
+
+
+def print_encoding_summary(rows):
+    print(f"{'size':>4} {'encoding':<11} {'engine':<6} {'vars':>7} {'clauses':>8} {'CNF KB':>7} {'RSS KB':>7} {'solve ms':>9} solved")
+    for row in rows:
+        rss = f"{row['peak_rss_kb']}" if row["peak_rss_kb"] is not None else "-"
+        solve = f"{row['solve_ms_median']:.3f}" if row["solve_ms_median"] is not None else "-"
+        print(f"{row['size']:>4} {row['encoding']:<11} {row['engine']:<6} {row['num_vars']:>7.0f} {row['num_clauses']:>8.0f} "
+              f"{row['cnf_kb']:>7.1f} {rss:>7} {solve:>9} {row['solved']}")
+
+
+def record_key(record):
+    key = f"{record['instance']}|{record['engine']}/{record['heuristic']}"
+    return f"{key}/{record['preprocess']}" if record.get('preprocess') else key
+
+
+def write_json(records, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(records, f, ensure_ascii=False, indent=2)
+
+
+def write_csv(records, path):
+    counter_names = sorted({name for record in records for name in record["counters"]})
+    fields = [name for name in records[0] if name != "counters"] if records else []
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(fields + counter_names)
+        for record in records:
+            writer.writerow([record[name] for name in fields] +
+                            [record["counters"].get(name) for name in counter_names])
+
+
+def save_baseline(records, path):
+    """把本次的中位耗时与结果保存为基线"""
+    baseline = {record_key(record): {"status": record["status"], "wall_ms": record["wall_ms_median"]}
+                for record in records}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2)
+
+
+def compare_baseline(records, path, threshold, slack_ms):
+    """
+    与基线比较，返回回归列表。
+    基线中已解出的配置本次未解出（超时或到达资源限制）、结果与基线不同，或中位耗时超过 基线 * threshold + slack_ms，
+    均视为回归。
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = []
+    for record in records:
+        base = baseline.get(record_key(record))
+        if not base or base["status"] in (None, STATUS_UNKNOWN):
+            continue
+        if record["status"] is None:
+            regressions.append(f"{record_key(record)}: unsolved, baseline {base['wall_ms']:.2f} ms")
+        elif record["status"] == STATUS_UNKNOWN:
+            regressions.append(f"{record_key(record)}: {record['limit']} limit reached, "
+                               f"baseline {base['wall_ms']:.2f} ms")
+        elif record["status"] != base["status"]:
+            regressions.append(f"{record_key(record)}: s {record['status']}, baseline s {base['status']}")
+        elif record["wall_ms_median"] > base["wall_ms"] * threshold + slack_ms:
+            regressions.append(f"{record_key(record)}: {record['wall_ms_median']:.2f} ms, "
+                               f"baseline {base['wall_ms']:.2f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对 test_case 中的算例运行基准测试")
+    parser.add_argument("cases", nargs="*", help="CNF 文件，默认为 test_case 目录下全部 .cnf 文件")
+    parser.add_argument("-e", "--engines", nargs="+", default=ENGINES, choices=ENGINES)
+    parser.add_argument("-H", "--heuristics", nargs="+", default=HEURISTICS, choices=HEURISTICS)
+    parser.add_argument("-p", "--preprocess", help="求解器的预处理参数，例如 all 或 unit,subsume:50")
+    parser.add_argument("-n", "--repeats", type=int, default=3, help="每个配置重复次数")
+    parser.add_argument("-t", "--timeout", type=float, default=10.0, help="单次求解超时（秒），超时后结束求解器进程")
+    parser.add_argument("--time-limit", type=float, help="求解器的时间限制（秒），到达时求解器自行停止并输出统计")
+    parser.add_argument("--decision-limit", type=int, help="求解器的决策次数限制")
+    parser.add_argument("--conflict-limit", type=int, help="求解器的冲突次数限制")
+    parser.add_argument("--memory-limit", type=int, help="求解器的常驻内存限制（MB）")
+    parser.add_argument("-o", "--output-dir", default="bench_results", help="JSON/CSV 与 .res 文件的输出目录")
+    parser.add_argument("--baseline", help="基线 JSON 文件，存在时与之比较")
+    parser.add_argument("--save-baseline", action="store_true", help="将本次结果保存为基线")
+    parser.add_argument("--threshold", type=float, default=1.5, help="耗时超过基线的倍数即视为回归")
+    parser.add_argument("--slack-ms", type=float, default=20.0, help="允许的绝对耗时波动（毫秒）")
+    parser.add_argument("--encodings", nargs="+", choices=ENCODINGS,
+                        help="比较至多一个编码：生成题目并用这些编码转换为 CNF 后求解")
+    parser.add_argument("--puzzles", type=int, default=10, help="比较编码时生成的题目数")
+    parser.add_argument("--level", type=int, default=4, choices=range(1, 5), help="比较编码时生成题目的难度")
+    parser.add_argument("--residual", action="store_true", help="比较编码时输出代入已知数后的剩余公式")
+    parser.add_argument("--sizes", nargs="+", type=int, choices=SIZES,
+                        help="生成题目的盘面边长，例如 9 16 25；未指定 --encodings 时只用 pairwise 编码")
+    args = parser.parse_args()
+
+    if not os.path.exists(program_path('sudoku_solver.exe')):
+        print(f"Solver not found: {program_path('sudoku_solver.exe')}")
+        return 2
+
+    if args.encodings or args.sizes:
+        cases = generate_encoded_cases(args.encodings or ["pairwise"], args.puzzles, args.level, args.residual,
+                                       os.path.join(args.output_dir, "cnf"), args.sizes or [9])
+        records = run_encoding_benchmark(cases, args.engines, args.heuristics, args.repeats, args.timeout,
+                                         os.path.join(args.output_dir, "res"),
+                                         limit_args(args.time_limit, args.decision_limit, args.conflict_limit,
+                                                    args.memory_limit))
+        write_json(records, os.path.join(args.output_dir, "encodings.json"))
+        write_csv(records, os.path.join(args.output_dir, "encodings.csv"))
+        print_encoding_summary(summarize_encodings(records))
+        print(f"Results saved to: {args.output_dir}")
+        wrong = [record_key(record) for record in records if record["verified"] is False]
+        for key in wrong:
+            print(f"WRONG MODEL {key}")
+        return 1 if wrong else 0
+
+    cnf_paths = args.cases or sorted(glob.glob(os.path.join(DEFAULT_CASE_DIR, '*.cnf')))
+
+    records = run_benchmark(cnf_paths, args.engines, args.heuristics, args.repeats, args.timeout,
+                            os.path.join(args.output_dir, "res"), args.preprocess,
+                            limit_args(args.time_limit, args.decision_limit, args.conflict_limit, args.memory_limit))
+    write_json(records, os.path.join(args.output_dir, "benchmark.json"))
+    write_csv(records, os.path.join(args.output_dir, "benchmark.csv"))
+    print(f"Results saved to: {args.output_dir}")
+
+    wrong = [record_key(record) for record in records if record["verified"] is False]
+    for key in wrong:
+        print(f"WRONG MODEL {key}")
+
+    if args.baseline and args.save_baseline:
+        save_baseline(records, args.baseline)
+        print(f"Baseline saved to: {args.baseline}")
+    elif args.baseline and os.path.exists(args.baseline):
+        regressions = compare_baseline(records, args.baseline, args.threshold, args.slack_ms)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print("No regressions against baseline.")
+    return 1 if wrong else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,99 @@
+"""
+一局游戏的盘面：题目中的已知数、玩家填入的数字与答案各为一个 n * n 字节的 bytearray（9x9 盘面为 81 字节），
+按行存放，0 表示空格。
+生成、求解、判定与界面的各个处理函数共用同一个 Board 对象，只有显式导出时才写文件。
+"""
+import os
+
+from diagonal_solver import SIZE, geometry, size_of, write_grid
+
+
+def _cells(grid):
+    """n x n 网格或 n * n 个数字转为 n * n 个 0 到 n 的整数，n 为 4、9、16 或 25"""
+    first = grid[0] if len(grid) else 0
+    rows = isinstance(first, (list, tuple)) or isinstance(first, str) and len(first) > 1
+    cells = [int(digit) for row in grid for digit in row] if rows else [int(d) for d in grid]
+    size = size_of(len(cells))
+    if size * size != len(cells) or any(not 0 <= digit <= size for digit in cells):
+        raise ValueError(f"Expected n * n digits between 0 and n, got {len(cells)} digits")
+    geometry(size)
+    return cells
+
+
+class Board:
+    """
+    givens 为题目中的已知数，entries 为玩家在空格中填入的数字，solution 为答案（未求解时全为 0），
+    size 为盘面边长，由题目的格子数确定，没有题目时为 9。
+    """
+
+    __slots__ = ("size", "givens", "entries", "solution")
+
+    def __init__(self, puzzle=None, solution=None):
+        self.givens = bytearray(_cells(puzzle)) if puzzle is not None else bytearray(SIZE * SIZE)
+        self.size = size_of(len(self.givens))
+        self.entries = bytearray(len(self.givens))
+        self.solution = bytearray(_cells(solution)) if solution is not None else bytearray(len(self.givens))
+        if len(self.solution) != len(self.givens):
+            raise ValueError("Puzzle and solution sizes differ")
+
+    def _grid(self, cells):
+        return [list(cells[row * self.size:(row + 1) * self.size]) for row in range(self.size)]
+
+    def puzzle(self):
+        """题目的 n x n 网格"""
+        return self._grid(self.givens)
+
+    def is_solved(self):
+        """是否已有答案"""
+        return all(self.solution)
+
+    def set_solution(self, grid):
+        cells = _cells(grid)
+        if len(cells) != len(self.givens):
+            raise ValueError("Puzzle and solution sizes differ")
+        self.solution[:] = bytes(cells)
+
+    def solution_grid(self):
+        """答案的 n x n 网格，尚未求解时返回 None"""
+        return self._grid(self.solution) if self.is_solved() else None
+
+    def is_given(self, row, col):
+        return self.givens[row * self.size + col] != 0
+
+    def set_entry(self, row, col, digit):
+        """记录玩家在空格 (row, col) 中填入的数字，digit 为 0 时清空；已知数所在的格子不变"""
+        cell = row * self.size + col
+        if not self.givens[cell]:
+            self.entries[cell] = digit
+
+    def clear_entries(self):
+        self.entries[:] = bytes(len(self.entries))
+
+    def current(self):
+        """当前盘面的 n x n 网格：已知数与玩家填入的数字"""
+        return self._grid(bytes(given or entry for given, entry in zip(self.givens, self.entries)))
+
+    def entries_grid(self):
+        return self._grid(self.entries)
+
+    def export(self, directory, prefix="sudoku"):
+        """
+        将题目、当前盘面与答案（已求解时）以每行 n 个数字的格式写入 directory，
+        返回写出的文件路径列表
+        """
+        os.makedirs(directory, exist_ok=True)
+        grids = [("puzzle", self.puzzle()), ("current", self.current())]
+        if self.is_solved():
+            grids.append(("solution", self.solution_grid()))
+        paths = []
+        for name, grid in grids:
+            path = os.path.join(directory, f"{prefix}_{name}.txt")
+            write_grid(path, grid)
+            paths.append(path)
+        return paths
+
+    @classmethod
+    def load(cls, path):
+        """读取每行 n 个数字（以空格分隔）的题目文件"""
+        with open(path, 'r') as f:
+            return cls([line.split() for line in f if line.strip()])
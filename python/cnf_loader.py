@@ -0,0 +1,101 @@
+"""通过 ctypes 调用 c/cnf_loader.c 读取 CNF 文件，CSR 形式的子句以 NumPy 数组的形式直接使用 C 端内存，不复制数据"""
+import ctypes
+import os
+
+import numpy as np
+
+from paths import program_path
+
+LIBRARY_NAME = 'cnf_loader.dll' if os.name == 'nt' else 'libcnf_loader.so'
+
+
+class _CnfFormula(ctypes.Structure):
+    """与 head.h 中的 CnfFormula 结构一致"""
+    _fields_ = [
+        ("num_vars", ctypes.c_int),
+        ("num_clauses", ctypes.c_int),
+        ("num_lits", ctypes.c_int),
+        ("lits", ctypes.POINTER(ctypes.c_int)),
+        ("offsets", ctypes.POINTER(ctypes.c_int)),
+        ("num_exactly_one", ctypes.c_int),
+        ("exactly_one", ctypes.POINTER(ctypes.c_int)),
+    ]
+
+
+_library = None
+
+
+class _Owner:
+    """持有 C 端分配的公式，最后一个引用消失时释放"""
+
+    def __init__(self, library, formula):
+        self.library = library
+        self.formula = formula
+
+    def __del__(self):
+        self.library.CnfFree(self.formula)
+
+
+def _encode(path):
+    """Windows 下 CreateFileA 使用系统代码页解释文件名"""
+    return path.encode('mbcs') if os.name == 'nt' else os.fsencode(path)
+
+
+def load_library():
+    """加载 make 生成的 CNF 读取库，库不存在时返回 None"""
+    global _library
+    if _library is None:
+        path = program_path(LIBRARY_NAME)
+        if not os.path.exists(path):
+            return None
+        library = ctypes.CDLL(os.path.abspath(path))
+        library.CnfLoad.argtypes = [ctypes.c_char_p]
+        library.CnfLoad.restype = ctypes.POINTER(_CnfFormula)
+        library.CnfLoadCached.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_longlong]
+        library.CnfLoadCached.restype = ctypes.POINTER(_CnfFormula)
+        library.CnfFree.argtypes = [ctypes.POINTER(_CnfFormula)]
+        library.CnfFree.restype = None
+        _library = library
+    return _library
+
+
+class CnfFormula:
+    """
+    由 C 端读取的 CNF 公式。lits 与 offsets 是指向 C 端内存的 int32 数组，
+    第 c 个子句为 lits[offsets[c]:offsets[c + 1]]；exactly_one 为文件中 e 行（恰好一个约束）的子句序号。
+    数组持有对 C 端内存的引用，数组仍在使用时内存不会被释放。
+    指定 cache_dir 时使用与 sudoku_solver.exe 相同的二进制缓存，缓存目录总大小不超过 cache_mb。
+    """
+
+    def __init__(self, path, cache_dir=None, cache_mb=64):
+        library = load_library()
+        if library is None:
+            raise OSError(f"CNF loader library not found: {program_path(LIBRARY_NAME)}")
+        if cache_dir:
+            pointer = library.CnfLoadCached(_encode(path), _encode(cache_dir), cache_mb << 20)
+        else:
+            pointer = library.CnfLoad(_encode(path))
+        if not pointer:
+            raise ValueError(f"Error reading CNF file: {path}")
+        self._owner = _Owner(library, pointer)
+        formula = pointer.contents
+        self.num_vars = formula.num_vars
+        self.num_clauses = formula.num_clauses
+        self.lits = self._view(formula.lits, formula.num_lits)
+        self.offsets = self._view(formula.offsets, formula.num_clauses + 1)
+        if formula.num_exactly_one:
+            self.exactly_one = self._view(formula.exactly_one, formula.num_exactly_one)
+        else:
+            self.exactly_one = np.zeros(0, dtype=np.int32)
+
+    def _view(self, pointer, length):
+        buffer = ctypes.cast(pointer, ctypes.POINTER(ctypes.c_int * length)).contents
+        buffer._owner = self._owner
+        return np.ctypeslib.as_array(buffer)
+
+    def clause(self, index):
+        """第 index 个子句的文字"""
+        return self.lits[self.offsets[index]:self.offsets[index + 1]]
+
+    def __len__(self):
+        return self.num_clauses
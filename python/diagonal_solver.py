@@ -0,0 +1,347 @@
+"""
+n x n 对角线数独的专用求解器（n 为 4、9、16 或 25，宫的边长为其平方根，由题目的格子数确定）。
+通过 ctypes 调用 c/diagonal_solver.c，直接在 n x n 网格上用 n 位掩码做约束传播，不生成 CNF 文件；
+找不到 make 生成的库时使用本文件中相同算法的 Python 实现。SIZE 等常量为默认的 9x9 盘面。
+"""
+import ctypes
+import math
+import os
+from collections import namedtuple
+from functools import lru_cache
+
+from paths import program_path
+
+LIBRARY_NAME = 'diagonal_solver.dll' if os.name == 'nt' else 'libdiagonal_solver.so'
+SIZE = 9
+CELLS = SIZE * SIZE
+ALL_DIGITS = (1 << SIZE) - 1
+
+# rate 中各类推理的下标与分值
+NAKED, HIDDEN, GUESS = range(3)
+RATING_WEIGHTS = (1.0, 2.0, 10.0)
+
+_library = None
+
+
+def load_library():
+    """加载 make 生成的对角线数独求解库，库不存在时返回 None"""
+    global _library
+    if _library is None:
+        path = program_path(LIBRARY_NAME)
+        if not os.path.exists(path):
+            return None
+        library = ctypes.CDLL(os.path.abspath(path))
+        library.DiagonalSolve.argtypes = [ctypes.c_int, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int), ctypes.c_int]
+        library.DiagonalSolve.restype = ctypes.c_int
+        library.DiagonalSolveMany.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p]
+        library.DiagonalSolveMany.restype = ctypes.c_int
+        _library = library
+    return _library
+
+
+# 边长为 size 的盘面：宫的边长、格子数、全部数字的位掩码，每组（行、列、宫与两条对角线）包含的单元格，
+# 以及每个单元格所属的组。组的编号与 c/sudoku_grid.c 的 CellGroups 相同，diagonal 为 False 时（普通数独）不含两条对角线
+Geometry = namedtuple('Geometry', 'size box cells all_digits groups cell_groups')
+
+
+@lru_cache(maxsize=None)
+def geometry(size, diagonal=True):
+    box = math.isqrt(size)
+    if box < 2 or box * box != size or size > 25:
+        raise ValueError(f"Board size should be 4, 9, 16 or 25, got {size}")
+    groups = [[row * size + col for col in range(size)] for row in range(size)]
+    groups += [[row * size + col for row in range(size)] for col in range(size)]
+    groups += [[(b // box * box + i // box) * size + b % box * box + i % box for i in range(size)] for b in range(size)]
+    if diagonal:
+        groups.append([i * size + i for i in range(size)])
+        groups.append([i * size + size - 1 - i for i in range(size)])
+    cell_groups = [[] for _ in range(size * size)]
+    for g, cells in enumerate(groups):
+        for cell in cells:
+            cell_groups[cell].append(g)
+    return Geometry(size, box, size * size, (1 << size) - 1, groups, cell_groups)
+
+
+def size_of(count):
+    """由格子数确定盘面边长"""
+    return math.isqrt(count)
+
+
+GROUPS, CELL_GROUPS = geometry(SIZE).groups, geometry(SIZE).cell_groups
+
+
+class _Board:
+    """Python 实现使用的盘面，与 C 端的 DiagonalBoard 对应"""
+
+    def __init__(self, shape):
+        self.shape = shape
+        self.cells = [0] * shape.cells
+        self.used = [0] * len(shape.groups)
+        self.empty = shape.cells
+
+    def copy(self):
+        board = _Board.__new__(_Board)
+        board.shape = self.shape
+        board.cells = self.cells[:]
+        board.used = self.used[:]
+        board.empty = self.empty
+        return board
+
+    def candidates(self, cell):
+        used = 0
+        for g in self.shape.cell_groups[cell]:
+            used |= self.used[g]
+        return ~used & self.shape.all_digits
+
+    def place(self, cell, digit):
+        bit = 1 << (digit - 1)
+        cell_groups = self.shape.cell_groups[cell]
+        if any(self.used[g] & bit for g in cell_groups):
+            return False
+        for g in cell_groups:
+            self.used[g] |= bit
+        self.cells[cell] = digit
+        self.empty -= 1
+        return True
+
+    def propagate(self, stats=None):
+        """反复填入唯一候选数与组内唯一位置，出现矛盾时返回 False。stats 非空时累计两种推理各填入的格数"""
+        changed = True
+        while changed and self.empty:
+            changed = False
+            for cell in range(self.shape.cells):
+                if self.cells[cell]:
+                    continue
+                candidates = self.candidates(cell)
+                if not candidates:
+                    return False
+                if not candidates & (candidates - 1):
+                    self.place(cell, candidates.bit_length())
+                    changed = True
+                    if stats is not None:
+                        stats[NAKED] += 1
+            for g, cells in enumerate(self.shape.groups):
+                once = twice = 0
+                for cell in cells:
+                    if not self.cells[cell]:
+                        candidates = self.candidates(cell)
+                        twice |= once & candidates
+                        once |= candidates
+                if once | self.used[g] != self.shape.all_digits:
+                    return False
+                once &= ~twice
+                for cell in cells:
+                    if not once:
+                        break
+                    if self.cells[cell]:
+                        continue
+                    single = self.candidates(cell) & once
+                    if not single:
+                        continue
+                    if single & (single - 1):
+                        return False
+                    self.place(cell, single.bit_length())
+                    once &= ~single
+                    changed = True
+                    if stats is not None:
+                        stats[HIDDEN] += 1
+        return True
+
+
+def _search(board, limit, found, stats=None):
+    if not board.propagate(stats):
+        return
+    if not board.empty:
+        found.append(board.cells)
+        return
+    best = min((cell for cell in range(board.shape.cells) if not board.cells[cell]),
+               key=lambda cell: bin(board.candidates(cell)).count('1'))
+    candidates = board.candidates(best)
+    while candidates and len(found) < limit:
+        bit = candidates & -candidates
+        candidates ^= bit
+        child = board.copy()
+        child.place(best, bit.bit_length())
+        if stats is not None:
+            stats[GUESS] += 1
+        _search(child, limit, found, stats)
+
+
+def _solve_python(cells, limit, diagonal=True):
+    board = _Board(geometry(size_of(len(cells)), diagonal))
+    for cell, digit in enumerate(cells):
+        if digit and (not 0 < digit <= board.shape.size or not board.place(cell, digit)):
+            return 0, None
+    found = []
+    _search(board, limit, found)
+    return len(found), found[0] if found else None
+
+
+def rate(grid):
+    """
+    按人工解题的代价估计题目难度：用唯一候选数填一格计 1 分，用组内唯一位置填一格计 2 分，
+    需要猜测时每试一个数字计 10 分（包括失败的分支）。题目无解时返回 None。
+    """
+    board = _Board(geometry(len(grid)))
+    for cell, digit in enumerate(digit for row in grid for digit in row):
+        if digit and (not 0 < digit <= board.shape.size or not board.place(cell, digit)):
+            return None
+    stats = [0, 0, 0]
+    found = []
+    _search(board, 1, found, stats)
+    if not found:
+        return None
+    return sum(weight * count for weight, count in zip(RATING_WEIGHTS, stats))
+
+
+def solve_cells(cells, limit=1):
+    """
+    求解以行优先存放的 n * n 个数字（0 表示空格，通常为 81 个），返回 (解数, 第一个解)。
+    解数不超过 limit，无解或题目中的数字冲突时返回 (0, None)。
+    """
+    cells = [int(digit) for digit in cells]
+    size = size_of(len(cells))
+    if size * size != len(cells):
+        raise ValueError(f"Expected a square number of cells, got {len(cells)}")
+    geometry(size)
+    library = load_library()
+    if library is None:
+        return _solve_python(cells, limit)
+    puzzle = (ctypes.c_int * len(cells))(*cells)
+    solution = (ctypes.c_int * len(cells))()
+    count = library.DiagonalSolve(size, puzzle, solution, limit)
+    return count, list(solution) if count else None
+
+
+def solve_many(puzzles, count, size=SIZE, diagonal=True):
+    """
+    一次求解 count 道题目。puzzles 为依次排列的字节串，每道题占 size * size 个字节（行优先，每字节为 0 到 size，
+    0 表示空格）；返回同样排列的解，无解的题目对应的字节全为 0。diagonal 为 False 时按普通数独求解
+    """
+    shape = geometry(size, diagonal)
+    if len(puzzles) != count * shape.cells:
+        raise ValueError(f"Expected {count} puzzles of {shape.cells} bytes, got {len(puzzles)} bytes")
+    library = load_library()
+    if library is None:
+        solutions = bytearray(len(puzzles))
+        for i in range(0, len(puzzles), shape.cells):
+            found, cells = _solve_python(list(puzzles[i:i + shape.cells]), 1, diagonal)
+            if found:
+                solutions[i:i + shape.cells] = bytes(cells)
+        return bytes(solutions)
+    solutions = ctypes.create_string_buffer(len(puzzles))
+    library.DiagonalSolveMany(size, diagonal, puzzles, count, solutions)
+    return solutions.raw
+
+
+def solve(grid):
+    """求解 n x n 网格形式的题目，返回解的网格，无解时返回 None"""
+    count, cells = solve_cells([digit for row in grid for digit in row])
+    if not count:
+        return None
+    size = len(grid)
+    return [cells[row * size:(row + 1) * size] for row in range(size)]
+
+
+def count_solutions(grid, limit=2):
+    """统计题目的解数，最多数到 limit"""
+    return solve_cells([digit for row in grid for digit in row], limit)[0]
+
+
+def semantic_base(size):
+    """语义编码中行、列、数字各占的进制：大于边长的最小的 10 的幂，与 c/sudoku_grid.c 相同"""
+    return 10 ** len(str(size))
+
+
+def read_size(fields, size):
+    """注释行为 “c size n” 时返回 n，否则返回 size"""
+    return int(fields[2]) if len(fields) == 3 and fields[:2] == ['c', 'size'] else size
+
+
+def read_semantic_cnf(path):
+    """
+    读取语义编码的题目文件（每行一个 “行列数 0” 形式的文字），返回 n x n 网格。
+    边长由 “c size n” 注释行给出，没有时为 9x9
+    """
+    size, literals = SIZE, []
+    with open(path, 'r') as f:
+        for line in f:
+            fields = line.split()
+            if not fields or line[0] == 'p':
+                continue
+            if line[0] == 'c':
+                size = read_size(fields, size)
+                continue
+            literal = int(fields[0])
+            if literal > 0:
+                literals.append(literal)
+    base = semantic_base(size)
+    grid = [[0] * size for _ in range(size)]
+    for literal in literals:
+        grid[literal // (base * base) - 1][literal // base % base - 1] = literal % base
+    return grid
+
+
+def read_var_map(path):
+    """
+    读取 convert_to_cnf.exe 或 generate_diagonal_sudoku.exe 的 -m 选项写出的变元映射，
+    返回 (已知数的自然编码列表, 剩余公式中变元到自然编码的字典, 盘面边长)
+    """
+    givens, naturals, size = [], {}, SIZE
+    with open(path, 'r') as f:
+        for line in f:
+            fields = line.split()
+            if not fields:
+                continue
+            if fields[0] == 'c':
+                size = read_size(fields, size)
+            elif fields[0] == 'g':
+                givens.append(int(fields[1]))
+            elif fields[0] == 'm':
+                naturals[int(fields[1])] = int(fields[2])
+    return givens, naturals, size
+
+
+def read_natural_solution(path, var_map=None, size=SIZE):
+    """
+    读取 sudoku_solver.exe 写出的 natural_solution.cnf（每行一个 “自然编码 0” 形式的文字），返回 size x size 网格；
+    文件中是 s 行（无解或未得出结论）时返回 None。求解的是剩余公式时 var_map 为 read_var_map 的结果，
+    文字先按映射还原为自然编码，已知数由映射补上，边长取映射中记录的边长
+    """
+    literals = []
+    with open(path, 'r') as f:
+        for line in f:
+            fields = line.split()
+            if not fields or fields[0] == 'c':
+                continue
+            if fields[0] == 's':
+                return None
+            literals.append(int(fields[0]))
+    if var_map is not None:
+        givens, naturals, size = var_map
+        literals = givens + [naturals[literal] for literal in literals if literal in naturals]
+    cells = size * size
+    grid = [[0] * size for _ in range(size)]
+    for literal in literals:
+        if 0 < literal <= cells * size:
+            grid[(literal - 1) // cells][(literal - 1) // size % size] = (literal - 1) % size + 1
+    return grid
+
+
+def write_semantic_cnf(path, grid):
+    """以 generate_diagonal_sudoku.exe 的格式写出题目中已有的数字，与 read_semantic_cnf 对应"""
+    size = len(grid)
+    base = semantic_base(size)
+    with open(path, 'w') as f:
+        f.write(f"c size {size}\n")
+        for row in range(size):
+            for col in range(size):
+                if grid[row][col]:
+                    f.write(f"{((row + 1) * base + col + 1) * base + grid[row][col]} 0\n")
+
+
+def write_grid(path, grid):
+    """以 solution.txt 的格式（每行 n 个以空格分隔的数字）写出网格"""
+    with open(path, 'w') as f:
+        for row in grid:
+            f.write(' '.join(str(digit) for digit in row) + '\n')
@@ -0,0 +1,208 @@
+"""
+提示引擎：为当前盘面（含两条对角线约束）保存每个空格的候选数，玩家每填入或删去一个数字只更新相关组内的格子。
+next_hint 给出下一步可以确定的填数以及推出它的技巧：唯一候选数、隐性唯一，
+需要时先用区块摒除删去候选数再找唯一。各组中每个数字的出现次数同时用于界面实时标出重复的数字。
+盘面边长由初始网格的行数确定（4、9、16 或 25）。
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+from diagonal_solver import SIZE, geometry
+
+NAKED_SINGLE = "naked single"
+HIDDEN_SINGLE = "hidden single"
+POINTING = "pointing"    # 宫内某数字的候选格都在同一行、列或对角线上
+CLAIMING = "claiming"    # 行、列或对角线上某数字的候选格都在同一宫内
+
+# 推出一个填数：technique 为所用技巧，group 为隐性唯一所在的组（唯一候选数时为 None），
+# steps 为此前需要的区块摒除，每项为 Elimination
+Hint = namedtuple("Hint", ["cell", "digit", "technique", "group", "steps"])
+# 区块摒除：digit 在 source 组内的候选格都在 target 组内，因此 target 组其余格子 cells 不能填 digit
+Elimination = namedtuple("Elimination", ["technique", "digit", "source", "target", "cells"])
+
+
+@lru_cache(maxsize=None)
+def intersections(size):
+    """宫与行、列、对角线的交集（至少两格），locked candidates 只在这些组对之间发生"""
+    groups = geometry(size).groups
+    pairs = []
+    for box in range(2 * size, 3 * size):
+        for line in list(range(2 * size)) + [3 * size, 3 * size + 1]:
+            common = set(groups[box]) & set(groups[line])
+            if len(common) >= 2:
+                pairs.append((box, line, common))
+    return pairs
+
+
+def group_name(group, size=SIZE):
+    """组的显示名称"""
+    if group < size:
+        return f"第 {group + 1} 行"
+    if group < 2 * size:
+        return f"第 {group - size + 1} 列"
+    if group < 3 * size:
+        return f"第 {group - 2 * size + 1} 宫"
+    return "主对角线" if group == 3 * size else "副对角线"
+
+
+def cell_name(cell, size=SIZE):
+    return f"第 {cell // size + 1} 行第 {cell % size + 1} 列"
+
+
+class HintEngine:
+    """
+    cells 为当前盘面，counts[g][d] 为组 g 中数字 d + 1 出现的次数，used[g] 为组内已出现数字的位掩码，
+    candidates[cell] 为空格的候选数位掩码（已填的格子为 0）。set 只更新该格所在各组内的格子。
+    """
+
+    def __init__(self, grid):
+        self.shape = shape = geometry(len(grid))
+        self.cells = [0] * shape.cells
+        self.counts = [[0] * shape.size for _ in shape.groups]
+        self.used = [0] * len(shape.groups)
+        self.candidates = [shape.all_digits] * shape.cells
+        self.duplicates = 0  # 出现次数超过 1 的 (组, 数字) 个数
+        for cell, digit in enumerate(digit for row in grid for digit in row):
+            if digit:
+                self.set(cell // shape.size, cell % shape.size, int(digit))
+
+    def _cell_candidates(self, cell):
+        used = 0
+        for g in self.shape.cell_groups[cell]:
+            used |= self.used[g]
+        return ~used & self.shape.all_digits
+
+    def set(self, row, col, digit):
+        """
+        在 (row, col) 填入 digit，digit 为 0 时清空该格。
+        返回是否重复可能因此改变的格子：该格本身，以及同组中填有原数字或新数字的格子
+        """
+        groups, cell_groups = self.shape.groups, self.shape.cell_groups
+        cell = row * self.shape.size + col
+        old = self.cells[cell]
+        if old == digit:
+            return []
+        if old:
+            self.cells[cell] = 0
+            bit = 1 << (old - 1)
+            for g in cell_groups[cell]:
+                count = self.counts[g][old - 1] = self.counts[g][old - 1] - 1
+                if count == 1:
+                    self.duplicates -= 1
+                elif count == 0:
+                    # 数字从组中消失，组内空格中不再被其他组排除的格子重新获得该候选数
+                    self.used[g] &= ~bit
+                    for other in groups[g]:
+                        if not self.cells[other] and not any(self.used[h] & bit for h in cell_groups[other]):
+                            self.candidates[other] |= bit
+            self.candidates[cell] = self._cell_candidates(cell)
+        if digit:
+            self.cells[cell] = digit
+            self.candidates[cell] = 0
+            bit = 1 << (digit - 1)
+            for g in cell_groups[cell]:
+                count = self.counts[g][digit - 1] = self.counts[g][digit - 1] + 1
+                if count == 2:
+                    self.duplicates += 1
+                elif count == 1:
+                    self.used[g] |= bit
+                    for other in groups[g]:
+                        self.candidates[other] &= ~bit
+        affected = {cell}
+        for g in cell_groups[cell]:
+            affected.update(other for other in groups[g] if self.cells[other] and self.cells[other] in (old, digit))
+        return affected
+
+    def is_duplicate(self, cell):
+        """该格的数字是否在所在的某一组中重复出现"""
+        digit = self.cells[cell]
+        return bool(digit) and any(self.counts[g][digit - 1] > 1 for g in self.shape.cell_groups[cell])
+
+    def has_conflict(self):
+        """盘面上是否有重复的数字，或有空格已没有候选数"""
+        return self.duplicates > 0 or any(not self.cells[cell] and not self.candidates[cell]
+                                          for cell in range(self.shape.cells))
+
+    def next_hint(self):
+        """
+        下一步可以确定的填数，找不到或盘面有冲突时返回 None。
+        先找唯一候选数与隐性唯一；都没有时反复应用区块摒除（只作用于副本，不改变保存的候选数）直到出现唯一
+        """
+        if self.has_conflict():
+            return None
+        candidates = self.candidates[:]
+        steps = []
+        while True:
+            hint = self._find_single(candidates, steps)
+            if hint:
+                return hint._replace(steps=_needed_steps(hint, steps, self.shape))
+            elimination = self._find_locked(candidates)
+            if elimination is None:
+                return None
+            for cell in elimination.cells:
+                candidates[cell] &= ~(1 << (elimination.digit - 1))
+            steps.append(elimination)
+
+    def _find_single(self, candidates, steps):
+        for cell in range(self.shape.cells):
+            mask = candidates[cell]
+            if mask and not mask & (mask - 1):
+                return Hint(cell, mask.bit_length(), NAKED_SINGLE, None, steps)
+        for g, group in enumerate(self.shape.groups):
+            once = twice = 0
+            for cell in group:
+                twice |= once & candidates[cell]
+                once |= candidates[cell]
+            once &= ~twice
+            if once:
+                bit = once & -once
+                cell = next(cell for cell in group if candidates[cell] & bit)
+                return Hint(cell, bit.bit_length(), HIDDEN_SINGLE, g, steps)
+        return None
+
+    def _find_locked(self, candidates):
+        """找一处能删去候选数的区块摒除"""
+        groups = self.shape.groups
+        for box, line, common in intersections(self.shape.size):
+            for source, target in ((box, line), (line, box)):
+                for digit in range(1, self.shape.size + 1):
+                    bit = 1 << (digit - 1)
+                    if self.used[source] & bit:
+                        continue
+                    inside = [cell for cell in groups[source] if candidates[cell] & bit]
+                    if not inside or any(cell not in common for cell in inside):
+                        continue
+                    removed = [cell for cell in groups[target] if cell not in common and candidates[cell] & bit]
+                    if removed:
+                        technique = POINTING if source == box else CLAIMING
+                        return Elimination(technique, digit, source, target, removed)
+        return None
+
+
+def _needed_steps(hint, steps, shape):
+    """
+    只保留推出提示确实需要的区块摒除：从最后的唯一出发，记录需要被删去的 (格, 数字)，
+    倒序检查每一步是否删去了其中之一，需要的步骤又要求源组内交集以外的格子没有该数字
+    """
+    if hint.technique == NAKED_SINGLE:
+        needed = {(hint.cell, digit) for digit in range(1, shape.size + 1) if digit != hint.digit}
+    else:
+        needed = {(cell, hint.digit) for cell in shape.groups[hint.group] if cell != hint.cell}
+    kept = []
+    for step in reversed(steps):
+        if any((cell, step.digit) in needed for cell in step.cells):
+            kept.append(step)
+            common = set(shape.groups[step.target])
+            needed.update((cell, step.digit) for cell in shape.groups[step.source] if cell not in common)
+    return kept[::-1]
+
+
+def describe_hint(hint, size=SIZE):
+    """提示的文字说明，size 为盘面边长"""
+    lines = [f"{group_name(step.source, size)}的 {step.digit} 只能在与{group_name(step.target, size)}相交的格子中，"
+             f"{group_name(step.target, size)}其余格子不能填 {step.digit}（区块摒除）" for step in hint.steps]
+    if hint.technique == NAKED_SINGLE:
+        lines.append(f"{cell_name(hint.cell, size)}只能填 {hint.digit}（唯一候选数）")
+    else:
+        lines.append(f"{group_name(hint.group, size)}中只有{cell_name(hint.cell, size)}能填 {hint.digit}（隐性唯一）")
+    return "；".join(lines)
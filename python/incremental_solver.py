@@ -0,0 +1,192 @@
+"""
+增量求解：通过 ctypes 调用 c/sat_solver.c 编译出的求解器库。子句集只装入一次，之后每次在一组假设文字下求解，
+学习子句、变元分数与保存的相位在多次求解之间保留，盘面只改动几格时的查询通常在一毫秒内完成。
+"""
+import ctypes
+import os
+from array import array
+
+from cnf_loader import CnfFormula
+from diagonal_solver import SIZE, geometry, solve_cells
+from paths import program_path
+
+LIBRARY_NAME = 'sat_solver.dll' if os.name == 'nt' else 'libsat_solver.so'
+
+# 与 c/head.h 中的求解结果一致
+FOUND, NOTFOUND, UNKNOWN = 1, 0, 2
+
+_library = None
+_skeletons = {}
+
+
+def load_library():
+    """加载 make 生成的 SAT 求解器库，库不存在时返回 None"""
+    global _library
+    if _library is None:
+        path = program_path(LIBRARY_NAME)
+        if not os.path.exists(path):
+            return None
+        library = ctypes.CDLL(os.path.abspath(path))
+        library.SolverNew.argtypes = [ctypes.c_int]
+        library.SolverNew.restype = ctypes.c_void_p
+        library.SolverFree.argtypes = [ctypes.c_void_p]
+        library.SolverFree.restype = None
+        library.SolverAddClauses.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_int),
+                                             ctypes.POINTER(ctypes.c_int), ctypes.c_int]
+        library.SolverAddClauses.restype = ctypes.c_int
+        library.SolverAddConstraints.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_int),
+                                                 ctypes.POINTER(ctypes.c_int), ctypes.c_int,
+                                                 ctypes.POINTER(ctypes.c_int), ctypes.c_int]
+        library.SolverAddConstraints.restype = ctypes.c_int
+        library.SolverSolve.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_int), ctypes.c_int]
+        library.SolverSolve.restype = ctypes.c_int
+        library.SolverModel.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_int)]
+        library.SolverModel.restype = ctypes.c_int
+        _library = library
+    return _library
+
+
+def _int_pointer(buffer):
+    """int32 的 array 或 NumPy 数组转为 C 端的 int 指针，不复制数据"""
+    if isinstance(buffer, array):
+        return (ctypes.c_int * len(buffer)).from_buffer(buffer) if buffer else None
+    return buffer.ctypes.data_as(ctypes.POINTER(ctypes.c_int))
+
+
+def _csr(clauses):
+    """子句列表转为 CSR 形式的 (lits, offsets)"""
+    lits, offsets = array('i'), array('i', [0])
+    for clause in clauses:
+        lits.extend(clause)
+        offsets.append(len(lits))
+    return lits, offsets
+
+
+class IncrementalSolver:
+    """
+    持有 C 端 CDCL 求解器。子句为 DIMACS 整数形式，可在两次求解之间继续添加。
+    solve(assumptions) 在假设文字全部成立的前提下求解，返回是否可满足；可满足时 model 给出各变元的取值。
+    """
+
+    def __init__(self, num_vars, clauses=()):
+        library = load_library()
+        if library is None:
+            raise OSError(f"SAT solver library not found: {program_path(LIBRARY_NAME)}")
+        self.library = library
+        self.num_vars = num_vars
+        self.solver = library.SolverNew(num_vars)
+        self.add_clauses(clauses)
+
+    @classmethod
+    def from_cnf(cls, path):
+        """由 CNF 文件创建，文件经 cnf_loader 读取后直接交给求解器，e 行作为恰好一个约束"""
+        formula = CnfFormula(path)
+        solver = cls(formula.num_vars)
+        solver.add_csr(formula.lits, formula.offsets, formula.num_clauses, formula.exactly_one)
+        return solver
+
+    def add_csr(self, lits, offsets, num_clauses, exactly_one=None):
+        """
+        添加 CSR 形式的子句集，lits 与 offsets 为 int32 的 array 或 NumPy 数组；
+        exactly_one 为其中应作为恰好一个约束的子句序号（升序）
+        """
+        if exactly_one is not None and len(exactly_one):
+            self.library.SolverAddConstraints(self.solver, _int_pointer(lits), _int_pointer(offsets), num_clauses,
+                                              _int_pointer(exactly_one), len(exactly_one))
+        else:
+            self.library.SolverAddClauses(self.solver, _int_pointer(lits), _int_pointer(offsets), num_clauses)
+
+    def add_clauses(self, clauses):
+        lits, offsets = _csr(clauses)
+        self.add_csr(lits, offsets, len(offsets) - 1)
+
+    def solve(self, assumptions=()):
+        assumptions = (ctypes.c_int * len(assumptions))(*assumptions)
+        result = self.library.SolverSolve(self.solver, assumptions, len(assumptions))
+        if result == UNKNOWN:
+            raise RuntimeError("SAT solver stopped before reaching a result")
+        return result == FOUND
+
+    def model(self):
+        """最近一次可满足的求解得到的模型，第 v - 1 项为变元 v 的取值（0 或 1）"""
+        truth = (ctypes.c_int * self.num_vars)()
+        self.library.SolverModel(self.solver, truth)
+        return list(truth)
+
+    def close(self):
+        if self.solver:
+            self.library.SolverFree(self.solver)
+            self.solver = None
+
+    def __del__(self):
+        self.close()
+
+
+def natural_var(row, col, digit, size=SIZE):
+    """自然编码中第 row 行第 col 列（从 0 开始）填入 digit 对应的变元，与 convert_to_cnf.exe 相同"""
+    return (row * size + col) * size + digit
+
+
+def diagonal_sudoku_skeleton(size=SIZE):
+    """
+    边长为 size 的对角线数独的子句集（不含已知数），CSR 形式：每格恰好填一个数字，每组（行、列、宫与两条对角线）
+    中每个数字恰好出现一次，至多一个均用两两互斥的二元子句编码。每种边长只构造一次
+    """
+    if size not in _skeletons:
+        shape = geometry(size)
+        clauses = []
+        groups = [[natural_var(cell // size, cell % size, digit, size) for digit in range(1, size + 1)]
+                  for cell in range(shape.cells)]
+        groups += [[natural_var(cell // size, cell % size, digit, size) for cell in cells]
+                   for cells in shape.groups for digit in range(1, size + 1)]
+        for group in groups:
+            clauses.append(group)
+            clauses.extend([-group[i], -group[j]] for i in range(len(group)) for j in range(i + 1, len(group)))
+        _skeletons[size] = _csr(clauses)
+    return _skeletons[size]
+
+
+class PositionSolver:
+    """
+    一道题目的盘面查询：题目的子句集与已知数只装入一次，玩家填入的数字作为假设文字，
+    每次查询只在新的假设下重新求解。找不到求解器库时改用 diagonal_solver 对整个盘面求解。
+    """
+
+    def __init__(self, puzzle):
+        self.puzzle = [[int(digit) for digit in row] for row in puzzle]
+        self.size = size = len(self.puzzle)
+        self.solver = None
+        if load_library() is not None:
+            lits, offsets = diagonal_sudoku_skeleton(size)
+            self.solver = IncrementalSolver(size ** 3)
+            self.solver.add_csr(lits, offsets, len(offsets) - 1)
+            self.solver.add_clauses([natural_var(row, col, digit, size)]
+                                    for row, line in enumerate(self.puzzle)
+                                    for col, digit in enumerate(line) if digit)
+
+    def assumptions(self, entries):
+        """玩家在空格中填入的数字对应的假设文字"""
+        size = self.size
+        return [natural_var(row, col, entries[row][col], size)
+                for row in range(size) for col in range(size)
+                if not self.puzzle[row][col] and 0 < entries[row][col] <= size]
+
+    def solution(self, entries=None):
+        """在玩家已填数字的前提下求一个完整的解，返回 n x n 网格；这些数字无法补全为解时返回 None"""
+        size = self.size
+        entries = entries or [[0] * size for _ in range(size)]
+        if self.solver is None:
+            cells = [self.puzzle[row][col] or entries[row][col] for row in range(size) for col in range(size)]
+            count, solved = solve_cells(cells)
+            return [solved[row * size:(row + 1) * size] for row in range(size)] if count else None
+        if not self.solver.solve(self.assumptions(entries)):
+            return None
+        model = self.solver.model()
+        return [[next(digit for digit in range(1, size + 1) if model[natural_var(row, col, digit, size) - 1])
+                 for col in range(size)] for row in range(size)]
+
+    def is_solvable(self, entries):
+        """玩家已填的数字是否仍能补全为一个解"""
+        if self.solver is None:
+            return self.solution(entries) is not None
+        return self.solver.solve(self.assumptions(entries))
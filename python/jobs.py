@@ -0,0 +1,138 @@
+"""
+界面的后台任务：生成、判定、求解与转换等耗时的流程在 QThreadPool 的线程中运行，
+通过信号报告进度与结果，运行中的外部程序可以被取消或在超时后结束。
+任务函数运行在后台线程中，不能直接操作界面控件，结果通过 finished 信号交回界面线程。
+"""
+import subprocess
+import threading
+import time
+
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+
+class JobError(Exception):
+    """任务失败，消息直接显示给用户"""
+
+
+class JobCancelled(Exception):
+    """任务被用户取消"""
+
+
+class JobTimeout(Exception):
+    """任务超过了时间限制"""
+
+
+class JobSignals(QObject):
+    progress = pyqtSignal(str)     # 进度说明
+    finished = pyqtSignal(object)  # 任务函数的返回值
+    failed = pyqtSignal(str)       # 错误消息
+    cancelled = pyqtSignal()
+
+
+class Job(QRunnable):
+    """
+    在线程池中运行 fn(job)。fn 通过 job.run_process 运行外部程序、通过 job.report 报告进度，
+    并可调用 job.check 在两步之间响应取消与超时。timeout 为整个任务的时间限制（秒）。
+    """
+
+    def __init__(self, fn, timeout=None):
+        super().__init__()
+        self.setAutoDelete(False)  # 由界面持有引用，避免信号对象先于任务被回收
+        self.fn = fn
+        self.timeout = timeout
+        self.signals = JobSignals()
+        self.deadline = None
+        self.cancel_event = threading.Event()
+        self.lock = threading.Lock()
+        self.process = None
+
+    def cancel(self):
+        """请求取消任务，正在运行的外部程序立即结束"""
+        self.cancel_event.set()
+        with self.lock:
+            if self.process is not None and self.process.poll() is None:
+                self.process.kill()
+
+    def check(self):
+        """任务已被取消或超时时抛出相应的异常"""
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise JobTimeout()
+
+    def report(self, text):
+        self.signals.progress.emit(text)
+
+    def run_process(self, command, on_line=None, cwd=None):
+        """
+        运行外部程序并等待其结束，返回 subprocess.CompletedProcess，返回值非 0 时抛出 CalledProcessError。
+        on_line 对标准输出的每一行调用，cwd 为程序的工作目录；取消或超时时结束程序并抛出相应的异常。
+        """
+        self.check()
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=cwd,
+            text=True,
+            encoding='utf-8',
+            errors='replace'
+        )
+        with self.lock:
+            self.process = process
+        stdout, stderr = [], []
+
+        def read(stream, lines, callback):
+            for line in stream:
+                lines.append(line)
+                if callback:
+                    callback(line.rstrip('\n'))
+
+        readers = [
+            threading.Thread(target=read, args=(process.stdout, stdout, on_line), daemon=True),
+            threading.Thread(target=read, args=(process.stderr, stderr, None), daemon=True),
+        ]
+        for reader in readers:
+            reader.start()
+        try:
+            while True:
+                try:
+                    process.wait(timeout=0.1)
+                    break
+                except subprocess.TimeoutExpired:
+                    self.check()
+            self.check()  # 程序因取消被结束时返回值非 0，先报告取消
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            for reader in readers:
+                reader.join()
+            with self.lock:
+                self.process = None
+        result = subprocess.CompletedProcess(command, process.returncode, ''.join(stdout), ''.join(stderr))
+        result.check_returncode()
+        return result
+
+    def run(self):
+        if self.timeout:
+            self.deadline = time.monotonic() + self.timeout
+        try:
+            result = self.fn(self)
+        except JobCancelled:
+            print("Job cancelled.")
+            self.signals.cancelled.emit()
+        except JobTimeout:
+            print(f"Job timed out after {self.timeout} s.")
+            self.signals.failed.emit(f"运行超过 {self.timeout} 秒，已停止。")
+        except JobError as e:
+            self.signals.failed.emit(str(e))
+        except subprocess.CalledProcessError as e:
+            print(f"Error running {e.cmd[0]}: {e}")
+            print(f"C program error output: {e.stderr}")
+            self.signals.failed.emit(f"运行 C 程序时出错:\n{e.stderr}")
+        except Exception as e:
+            print(f"Other error: {e}")
+            self.signals.failed.emit(f"其他错误:\n{e}")
+        else:
+            self.signals.finished.emit(result)
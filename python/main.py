@@ -1,11 +1,14 @@
 import sys
 import subprocess
 import os
+import sqlite3
+import tempfile
+import time
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QStackedWidget, QFileDialog,
-    QTableWidgetItem, QMessageBox
+    QTableWidgetItem, QMessageBox, QProgressDialog
 )
-from PyQt5.QtCore import QTimer, Qt
+from PyQt5.QtCore import QTimer, Qt, QThreadPool
 from PyQt5 import QtGui, QtCore, QtWidgets
 
 # 假设您已经有这些 UI 文件
@@ -15,6 +18,27 @@ from Ui_mode import Ui_MainWindow as Ui_ModeWindow
 from Ui_upload import Ui_MainWindow as Ui_UploadWindow
 from Ui_difficulty import Ui_MainWindow as Ui_DifficultyWindow
 from Ui_game import Ui_MainWindow as Ui_GameWindow
+from paths import C_PROGRAMS_DIR
+from verifier import verify_files
+from diagonal_solver import count_solutions, read_natural_solution, read_semantic_cnf, read_var_map, solve, write_grid
+from puzzle_pool import DIFFICULTY_LEVELS, PuzzlePool
+from puzzle_store import PuzzleStore
+from jobs import Job, JobError
+from incremental_solver import PositionSolver
+from hint_engine import HintEngine, describe_hint
+from board import Board
+
+# sudoku_solver.exe 输出的 "c limit <限制>" 中的限制名称
+SOLVER_LIMIT_NAMES = {"time": "时间", "decisions": "决策次数", "conflicts": "冲突次数", "memory": "内存"}
+
+# CNF 引擎在任务的临时目录中使用的文件名：代入已知数后的剩余公式及其变元映射
+NATURAL_CNF_NAME = "natural_puzzle.cnf"
+VAR_MAP_NAME = "natural_puzzle.map"
+
+# 难度页面可选的盘面边长，与 board_size 下拉框的选项依次对应；题目池与题目库只保存 9x9 的题目
+BOARD_SIZES = (4, 9, 16, 25)
+# 数独表格的边长（像素）约为 9 格 x 55 像素，格子与字号按盘面边长缩放
+TABLE_PIXELS = 495
 
 
 class MainApp(QMainWindow):
@@ -22,16 +46,35 @@ class MainApp(QMainWindow):
         super(MainApp, self).__init__()
         self.stacked_widget = QStackedWidget()
         self.setCentralWidget(self.stacked_widget)
-        self.semantic_file_path=None
-        self.natural_file_path=None
-        self.answer_file_path = "solution.txt"
-
-
-        # 动态获取C程序的路径
-        if hasattr(sys, '_MEIPASS'):
-            self.c_programs_dir = os.path.join(sys._MEIPASS, 'c')
-        else:
-            self.c_programs_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../c')
+        # 当前一局的盘面（已知数、玩家填入的数字与答案），生成、求解、判定与界面共用，只在导出时写文件
+        self.board = None
+
+        # 求解引擎与变元选择策略。"native" 使用 diagonal_solver 直接在网格上求解，
+        # 其余取值对应 sudoku_solver.exe 的 -e / -h 参数，经由自然编码的 CNF 文件求解
+        self.solver_engine = "native"
+        self.solver_heuristic = None
+
+        # 后台任务，同一时间只运行一个；solver_timeout 为生成与求解任务的时间限制（秒）
+        self.current_job = None
+        self.progress_dialog = None
+        self.solver_timeout = 120
+        # 求解器自身的时间（秒）与内存（MB）限制，到达时求解器停止并报告未得出结论，应小于 solver_timeout
+        self.solver_time_limit = 60
+        self.solver_memory_limit = 2048
+
+        # 当前题目的增量求解器，检查答案时把玩家填入的数字作为假设求解
+        self.position_solver = None
+        # 当前盘面的候选数与各组数字的出现次数，随玩家的每次输入增量更新，用于给出提示与标出重复的数字
+        self.hint_engine = None
+        self.conflict_brush = QtGui.QBrush(QtGui.QColor(255, 190, 190))
+
+        # C程序的路径
+        self.c_programs_dir = C_PROGRAMS_DIR
+
+        # 题目库保存全部生成与上传的题目；题目池预先生成题目，启动时在后台补足各难度的题目
+        self.puzzle_store = PuzzleStore()
+        self.puzzle_pool = PuzzlePool(store=self.puzzle_store)
+        self.puzzle_pool.refill()
 
         # 创建并添加各个界面到 QStackedWidget
         self.start_ui = Ui_StartWindow()
@@ -101,6 +144,9 @@ class MainApp(QMainWindow):
         self.game_ui.check_button.clicked.connect(self.check_solution)
         self.game_ui.peek_button.clicked.connect(self.peek_solution)
         self.game_ui.show_button.clicked.connect(self.show_solution)
+        self.game_ui.hint_button.clicked.connect(self.show_hint)
+        self.game_ui.export_button.clicked.connect(self.export_game)
+        self.game_ui.sudoku_table.itemChanged.connect(self.game_item_changed)
 
 
 
@@ -116,34 +162,194 @@ class MainApp(QMainWindow):
         self.game_time_seconds = 0
         self.is_answer_shown = False
 
-        self.previous_user_input = []  # 用于存储用户输入的状态
-
 
     # 通用方法来设置 sudoku_table 的格式
-    def setup_sudoku_table(self, table):
-        table.setRowCount(9)
-        table.setColumnCount(9)
-        table.horizontalHeader().setDefaultSectionSize(55)
-        table.verticalHeader().setDefaultSectionSize(55)
-        table.horizontalHeader().setMinimumSectionSize(55)
-        table.verticalHeader().setMinimumSectionSize(55)
-        table.setFont(QtGui.QFont("Arial", 22))
+    def setup_sudoku_table(self, table, size=9):
+        cell_pixels = TABLE_PIXELS // size
+        table.setRowCount(size)
+        table.setColumnCount(size)
+        table.horizontalHeader().setDefaultSectionSize(cell_pixels)
+        table.verticalHeader().setDefaultSectionSize(cell_pixels)
+        table.horizontalHeader().setMinimumSectionSize(cell_pixels)
+        table.verticalHeader().setMinimumSectionSize(cell_pixels)
+        table.setFont(QtGui.QFont("Arial", max(7, min(22, cell_pixels * 2 // 5))))
         table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)  # 默认禁止编辑
 
-        for row in range(9):
-            for col in range(9):
+        for row in range(size):
+            for col in range(size):
                 item = QTableWidgetItem("")
                 item.setTextAlignment(Qt.AlignCenter)
                 item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled | Qt.ItemIsEditable)
                 item.setForeground(QtGui.QBrush(Qt.blue))
                 table.setItem(row, col, item)
 
-        # 强制刷新 UI
         table.viewport().update()
-        table.repaint()
-        QtGui.QGuiApplication.processEvents()
         print(f"Set up sudoku_table for {table.objectName()}")
 
+    def solver_command(self, cnf_file_path, size=9, map_file_path=None):
+        """
+        按当前的求解引擎与变元选择策略生成求解器命令行，求解器每 0.5 秒输出一行进度，并受时间与内存限制；
+        size 为盘面边长，求解剩余公式时 map_file_path 为其变元映射，solution.cnf 据此还原为完整盘面
+        """
+        command = [os.path.join(self.c_programs_dir, 'sudoku_solver.exe'), '-e', self.solver_engine, '-v', '500',
+                   '-t', str(self.solver_time_limit), '-m', str(self.solver_memory_limit), '-s', str(size)]
+        if map_file_path:
+            command += ['-M', map_file_path]
+        if self.solver_heuristic:
+            command += ['-h', self.solver_heuristic]
+        return command + [cnf_file_path]
+
+    def start_job(self, title, fn, on_finished, timeout=None):
+        """
+        在后台线程中运行 fn(job)，运行超过半秒时显示可取消的进度对话框，
+        完成后在界面线程中调用 on_finished(fn 的返回值)，失败时显示错误消息。
+        """
+        if self.current_job is not None:
+            QMessageBox.information(self, "提示", "请等待当前任务完成。")
+            return
+        job = Job(fn, timeout)
+        job.signals.progress.connect(self.update_job_progress)
+        job.signals.finished.connect(lambda result: self.finish_job(job, on_finished, result))
+        job.signals.failed.connect(lambda message: self.fail_job(job, message))
+        job.signals.cancelled.connect(lambda: self.end_job(job))
+        self.current_job = job
+
+        dialog = QProgressDialog(title, "取消", 0, 0, self)
+        dialog.setWindowTitle("请稍候")
+        dialog.setWindowModality(Qt.WindowModal)
+        dialog.setMinimumDuration(500)
+        dialog.canceled.connect(job.cancel)
+        dialog.setValue(0)
+        self.progress_dialog = dialog
+        QThreadPool.globalInstance().start(job)
+
+    def update_job_progress(self, text):
+        if self.progress_dialog is not None:
+            self.progress_dialog.setLabelText(text)
+
+    def end_job(self, job):
+        """关闭进度对话框并释放任务"""
+        if job is not self.current_job:
+            return
+        self.current_job = None
+        if self.progress_dialog is not None:
+            self.progress_dialog.canceled.disconnect()
+            self.progress_dialog.hide()
+            self.progress_dialog.deleteLater()
+            self.progress_dialog = None
+
+    def finish_job(self, job, on_finished, result):
+        self.end_job(job)
+        on_finished(result)
+
+    def fail_job(self, job, message):
+        self.end_job(job)
+        QMessageBox.critical(self, "错误", message)
+
+    @staticmethod
+    def solver_progress_text(line):
+        """将求解器的 "c progress decisions D conflicts C assigned A/V" 行转为进度说明，其他行返回 None"""
+        fields = line.split()
+        if len(fields) < 8 or fields[:2] != ['c', 'progress']:
+            return None
+        return f"正在求解：{fields[3]} 次决策，{fields[5]} 次冲突，已赋值 {fields[7]} 个变元"
+
+    @staticmethod
+    def solver_limit(output):
+        """求解器到达的资源限制（"c limit <限制>" 行），未到达时返回 None"""
+        for line in output.splitlines():
+            fields = line.split()
+            if len(fields) == 3 and fields[:2] == ['c', 'limit']:
+                return fields[2]
+        return None
+
+    def solve_puzzle(self, job, board, work_dir):
+        """
+        （后台线程）求解盘面上的题目并将答案存入 board，失败时抛出 JobError。
+        CNF 引擎在临时目录 work_dir 中求解代入已知数后的剩余公式，work_dir 中还没有该公式时先转换题目，
+        求得的赋值经变元映射还原为答案
+        """
+        if self.solver_engine == "native":
+            start = time.perf_counter()
+            solution = solve(board.puzzle())
+            if solution is None:
+                print("No solution found by the native solver.")
+                raise JobError("该数独无解。")
+            board.set_solution(solution)
+            print(f"Puzzle solved in {(time.perf_counter() - start) * 1000:.3f} ms")
+            return
+
+        natural_file_path = os.path.join(work_dir, NATURAL_CNF_NAME)
+        if not os.path.exists(natural_file_path):
+            self.convert_to_cnf(job, board, work_dir)
+
+        job.report("正在求解…")
+
+        def on_line(line):
+            text = self.solver_progress_text(line)
+            if text:
+                job.report(text)
+
+        try:
+            # 求解器把 solution.cnf 与 natural_solution.cnf 写在工作目录中
+            map_file_path = os.path.join(work_dir, VAR_MAP_NAME)
+            result = job.run_process(self.solver_command(natural_file_path, board.size, map_file_path), on_line,
+                                     cwd=work_dir)
+        except subprocess.CalledProcessError as e:
+            print(f"Error solving puzzle: {e}")
+            raise JobError(f"求解数独时出错:\n{e.stderr}")
+        print("Solution file generated.")
+        print(f"Solver output: {result.stdout}")
+        limit = self.solver_limit(result.stdout)
+        if limit:
+            print(f"Solver stopped at the {limit} limit.")
+            raise JobError(f"求解超出{SOLVER_LIMIT_NAMES.get(limit, limit)}限制，未能得出结果。")
+        solution_file_path = os.path.join(work_dir, "natural_solution.cnf")
+        self.verify_solution(natural_file_path, solution_file_path)
+
+        solution = read_natural_solution(solution_file_path, read_var_map(os.path.join(work_dir, VAR_MAP_NAME)))
+        if solution is None:
+            print("No solution found by the solver.")
+            raise JobError("该数独无解。")
+        board.set_solution(solution)
+
+    def convert_to_cnf(self, job, board, work_dir):
+        """（后台线程）在 work_dir 中用 convert_to_cnf.exe 将盘面上的题目转换为语义编码的 CNF 文件与剩余公式"""
+        convert_program = os.path.join(self.c_programs_dir, 'convert_to_cnf.exe')
+        puzzle_file_path = os.path.join(work_dir, "puzzle.txt")
+        write_grid(puzzle_file_path, board.puzzle())
+        try:
+            job.run_process([convert_program, '-m', os.path.join(work_dir, VAR_MAP_NAME), puzzle_file_path,
+                             os.path.join(work_dir, "semantic_puzzle.cnf"),
+                             os.path.join(work_dir, NATURAL_CNF_NAME)], cwd=work_dir)
+        except subprocess.CalledProcessError as e:
+            print(f"Error converting puzzle to CNF: {e}")
+            raise JobError(f"转换数独格局到 CNF 时出错:\n{e.stderr}")
+
+    def draw_from_store(self, level):
+        """从题目库中随机取一道该难度的题目，返回 (题目, 答案)，没有时返回 None"""
+        try:
+            entry = self.puzzle_store.random_puzzle(level)
+        except sqlite3.Error as e:
+            print(f"Error reading the puzzle store: {e}")
+            return None
+        return entry[:2] if entry else None
+
+    def archive_puzzle(self, board, level, source):
+        """将盘面上的题目与答案存入题目库，level 为 None 时按已知数个数估计难度"""
+        try:
+            self.puzzle_store.add(board.puzzle(), level, source, board.solution_grid())
+        except sqlite3.Error as e:
+            print(f"Error saving puzzle to the store: {e}")
+
+    def verify_solution(self, cnf_file_path, solution_file_path):
+        """（后台线程）检查求解器写出的 natural_solution.cnf 是否满足 CNF 文件的全部子句，未通过时抛出 JobError"""
+        result = verify_files(cnf_file_path, solution_file_path)
+        if result.ok is False:
+            print(f"Solution check failed, {result.unsatisfied.size} clauses unsatisfied.")
+            raise JobError("求解结果未通过验证。")
+        print(f"Solution checked in {result.elapsed * 1000:.2f} ms")
+
     # 显示 rules 页面
     def show_rules(self):
         self.stacked_widget.setCurrentWidget(self.rules_widget)
@@ -168,12 +374,12 @@ class MainApp(QMainWindow):
         self.game_ui.check_information.setVisible(False)
         table = self.game_ui.sudoku_table
         if table:
-            self.setup_sudoku_table(table)
+            self.setup_sudoku_table(table, self.board.size if self.board is not None else 9)
             table.setEditTriggers(QtWidgets.QAbstractItemView.AllEditTriggers)  # 允许编辑
-        if self.semantic_file_path:
-            self.display_puzzle(self.semantic_file_path)
+        if self.board is not None:
+            self.display_puzzle(self.board)
         else:
-            print("semantic_file_path is not set")
+            print("Board is not set")
         self.stacked_widget.setCurrentWidget(self.game_widget)
 
 
@@ -202,171 +408,106 @@ class MainApp(QMainWindow):
         self.is_answer_shown = False
         self.game_ui.peek_count.setVisible(False)
         self.game_ui.game_time.setVisible(True)
-        # 确定挖洞数量
-        difficulty_levels = {
-            "easy": "1",        # 假设"easy"对应20个挖洞
-            "simple": "2",      # "simple" 对应30个挖洞
-            "intermediate": "3",# "intermediate" 对应40个挖洞
-            "expert": "4"       # "expert" 对应50个挖洞
-        }
-        # 获取数值型的难度级别
-        difficulty_level = difficulty_levels.get(difficulty, "1")
-
-        # 调用C程序生成数独题目
-        semantic_file_path = "generated_puzzle.cnf"  # 生成的语义编码CNF文件路径
-
-         # 设置 semantic_file_path
-        self.semantic_file_path = semantic_file_path
-        print(f"semantic_file_path set to: {self.semantic_file_path}")
-
-        natural_file_path = "altered_puzzle.cnf"     # 生成的自然编码CNF文件路径
-        self.natural_file_path = natural_file_path
-        generator_path = os.path.join(self.c_programs_dir, 'generate_diagonal_sudoku.exe')
-        solver_path = os.path.join(self.c_programs_dir, 'sudoku_solver.exe')
-
-        try:
-            result = subprocess.run(
-                [generator_path, difficulty_level, semantic_file_path, natural_file_path],
-                check=True,
-                capture_output=True,
-                text=True,
-                encoding='utf-8'
-            )
-            print(f"Puzzle generation completed, CNF files saved to: {semantic_file_path} and {natural_file_path}")
-            print(f"C program output: {result.stdout}")
-
-            # 运行解算器
-            result = subprocess.run(
-                [solver_path, natural_file_path],
-                check=True,
-                capture_output=True,
-                text=True,
-                encoding='utf-8'
-            )
-            print("Solution file generated.")
-            print(f"Solver output: {result.stdout}")
-
-            # 转换解文件为数独网格格式
-            if not self.convert_solution_to_grid("solution.cnf"):
-                print("Error converting solution to grid format.")
-                QMessageBox.critical(self, "错误", "转换解答时出错。")
-                return
-
-        except subprocess.CalledProcessError as e:
-            print(f"Error generating puzzle or solution: {e}")
-            print(f"C program error output: {e.stderr}")
-            QMessageBox.critical(self, "错误", f"生成数独或解答时出错:\n{e.stderr}")
-            return
-        except Exception as e:
-            print(f"Other error: {e}")
-            QMessageBox.critical(self, "错误", f"其他错误:\n{e}")
+        # 获取数值型的难度级别（确定挖洞数量）
+        difficulty_level = DIFFICULTY_LEVELS.get(difficulty, "1")
+        size = BOARD_SIZES[self.difficulty_ui.board_size.currentIndex()]
+
+        # 题目池中有该难度的题目时直接取出，题目池随后在后台补充；题目池为空时从题目库中随机取一道。
+        # 其他边长的题目总是现场生成
+        entry = None
+        if size == 9:
+            entry = self.puzzle_pool.pop(difficulty)
+            source = "pool"
+            if entry is None:
+                entry = self.draw_from_store(int(difficulty_level))
+                source = "store"
+        if entry is not None:
+            puzzle, solution = entry
+            self.board = Board(puzzle, solution)
+            self.position_solver = None  # 9x9 的增量求解器建立只需几毫秒，在显示时建立
+            print(f"Puzzle taken from the {source}, {self.puzzle_pool.size(difficulty)} left in the pool.")
+            self.show_game()
             return
 
-        # 清空游戏界面并显示新生成的数独
-        self.show_game()
-        # self.display_puzzle(semantic_file_path)
+        generator_path = os.path.join(self.c_programs_dir, 'generate_diagonal_sudoku.exe')
 
-    def convert_solution_to_grid(self, solution_cnf_path):
+        def generate(job):
+            job.report("正在生成题目…")
+            # 生成程序与求解器的输出文件只在临时目录中存在，读入盘面后随目录一起删除
+            with tempfile.TemporaryDirectory(prefix="sudoku_") as work_dir:
+                semantic_file_path = os.path.join(work_dir, "semantic_puzzle.cnf")  # 生成的语义编码CNF文件路径
+                natural_file_path = os.path.join(work_dir, NATURAL_CNF_NAME)        # 生成的剩余公式路径
+                map_file_path = os.path.join(work_dir, VAR_MAP_NAME)               # 剩余公式的变元映射
+                try:
+                    result = job.run_process([generator_path, '-s', str(size), '-m', map_file_path, difficulty_level,
+                                              semantic_file_path, natural_file_path], cwd=work_dir)
+                except subprocess.CalledProcessError as e:
+                    print(f"Error generating puzzle: {e}")
+                    raise JobError(f"生成数独或解答时出错:\n{e.stderr}")
+                print(f"Puzzle generation completed in {work_dir}")
+                print(f"C program output: {result.stdout}")
+
+                # 求解生成的题目
+                board = Board(read_semantic_cnf(semantic_file_path))
+                self.solve_puzzle(job, board, work_dir)
+            if size == 9:
+                self.archive_puzzle(board, int(difficulty_level), "generated")
+            return board, self.build_position_solver(job, board)
+
+        def show(result):
+            # 完成后清空游戏界面并显示新生成的数独
+            self.board, self.position_solver = result
+            self.show_game()
+
+        self.start_job("正在生成题目…", generate, show, self.solver_timeout)
+
+    @staticmethod
+    def build_position_solver(job, board):
         """
-        使用 cnf_to_grid.exe 将 CNF 格式的解转换为数独网格格式。
+        （后台线程）为盘面上的题目建立增量求解器并先求解一次，之后的查询沿用学习到的子句。
+        25x25 的子句集约有 76 万个子句，建立需要约 1 秒，在生成或检查题目的后台任务中完成
         """
-        converter_path = os.path.join(self.c_programs_dir, 'cnf_to_grid.exe')
-
-        grid_output_path = "solution.txt"  # 转换后的数独网格路径
-
-        try:
-            # 调用转换器程序
-            result = subprocess.run(
-                [converter_path, solution_cnf_path, grid_output_path],
-                check=True,
-                capture_output=True,
-                text=True,
-                encoding='utf-8'
-            )
-            print(f"Solution converted and saved to: {grid_output_path}")
-            print(f"C program output: {result.stdout}")
-        except subprocess.CalledProcessError as e:
-            print(f"Error converting solution: {e}")
-            print(f"C program error output: {e.stderr}")
-            QMessageBox.critical(self, "错误", f"转换解答时出错:\n{e.stderr}")
-            return False
-        except Exception as e:
-            print(f"Other error: {e}")
-            QMessageBox.critical(self, "错误", f"其他错误:\n{e}")
-            return False
-
-        return True
-
-    def display_puzzle(self, cnf_file_path):
-        """将CNF格式的数独题目转换为可显示的数独格局"""
-        parser_path = os.path.join(self.c_programs_dir, 'cnf_to_grid.exe')
-
-        puzzle_file_path = "sudoku_puzzle.txt"  # 生成的数独格局路径
-
-        try:
-            result = subprocess.run(
-                [parser_path, cnf_file_path, puzzle_file_path],
-                check=True,
-                capture_output=True,
-                text=True,
-                encoding='utf-8'
-            )
-            print(f"Puzzle parsed and grid generated, saved to: {puzzle_file_path}")
-            print(f"C program output: {result.stdout}")
-        except subprocess.CalledProcessError as e:
-            print(f"Parsing error: {e}")
-            print(f"C program error output: {e.stderr}")
-            QMessageBox.critical(self, "错误", f"解析数独题目时出错:\n{e.stderr}")
-            return
-        except Exception as e:
-            print(f"Other error: {e}")
-            QMessageBox.critical(self, "错误", f"其他错误:\n{e}")
-            return
-
-        # 在游戏界面显示生成的数独网格
-        self.load_puzzle_to_ui(self.game_ui.sudoku_table, puzzle_file_path)
+        if job is not None:
+            job.report("正在准备求解器…")
+        position_solver = PositionSolver(board.puzzle())
+        position_solver.solution()
+        return position_solver
 
-    def load_puzzle_to_ui(self, table, puzzle_file_path):
-        """加载解析后的数独网格并显示在指定的 Sudoku 表格上"""
-        try:
-            with open(puzzle_file_path, 'r') as f:
-                puzzle_lines = f.readlines()
-            if not puzzle_lines:
-                print("Error: Puzzle file is empty or not properly formatted.")
-                QMessageBox.warning(self, "警告", "数独文件为空或格式不正确。")
-                return
-
-            print(f"Loaded puzzle from file: {puzzle_file_path}")
-            table.setRowCount(9)
-            table.setColumnCount(9)
-
-            for row_idx, line in enumerate(puzzle_lines):
-                numbers = line.strip().split()
-                for col_idx, num in enumerate(numbers):
-                    item = QTableWidgetItem("" if num == '0' else num)
-                    item.setTextAlignment(Qt.AlignCenter)
-
-                    if num != '0':  # 0 表示空格
-                        item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)  # 禁止修改
-                        item.setForeground(QtGui.QBrush(Qt.black))
-                    else:
-                        # 允许输入
-                        item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled | Qt.ItemIsEditable)
-                        item.setForeground(QtGui.QBrush(Qt.blue))
-                    table.setItem(row_idx, col_idx, item)
-
-            # 强制刷新 UI
-            table.viewport().update()
-            table.repaint()
+    def display_puzzle(self, board):
+        """
+        在游戏界面显示盘面上的题目，并为该题目建立提示引擎；
+        后台任务没有建立增量求解器时（取自题目池或题目库的 9x9 题目）在此建立
+        """
+        board.clear_entries()
+        if self.position_solver is None:
+            self.position_solver = self.build_position_solver(None, board)
+        # 载入期间不更新提示引擎
+        self.hint_engine = None
+        self.load_puzzle_to_ui(self.game_ui.sudoku_table, board)
+        self.hint_engine = HintEngine(board.puzzle())
+
+    def load_puzzle_to_ui(self, table, board):
+        """将盘面上的题目显示在指定的 Sudoku 表格上"""
+        table.setRowCount(board.size)
+        table.setColumnCount(board.size)
+
+        for row_idx, line in enumerate(board.puzzle()):
+            for col_idx, num in enumerate(line):
+                item = QTableWidgetItem(str(num) if num else "")
+                item.setTextAlignment(Qt.AlignCenter)
 
-            # 调用 Qt 事件循环来确保 UI 刷新
-            QtGui.QGuiApplication.processEvents()
+                if num:  # 0 表示空格
+                    item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)  # 禁止修改
+                    item.setForeground(QtGui.QBrush(Qt.black))
+                else:
+                    # 允许输入
+                    item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled | Qt.ItemIsEditable)
+                    item.setForeground(QtGui.QBrush(Qt.blue))
+                table.setItem(row_idx, col_idx, item)
 
-            print("Successfully loaded puzzle into the UI.")  # 添加调试信息
+        table.viewport().update()
 
-        except Exception as e:
-            print(f"Error loading puzzle to UI: {e}")
-            QMessageBox.critical(self, "错误", f"加载数独到 UI 时出错:\n{e}")
+        print("Successfully loaded puzzle into the UI.")  # 添加调试信息
 
 
 
@@ -379,148 +520,78 @@ class MainApp(QMainWindow):
             return
 
         sudoku_grid = []
-        for row in range(9):
+        for row in range(table.rowCount()):
             row_data = []
-            for col in range(9):
+            for col in range(table.columnCount()):
                 item = table.item(row, col)
                 if item and item.text().isdigit():
-                    row_data.append(item.text())
+                    row_data.append(int(item.text()))
                 else:
-                    row_data.append('0')  # 0 表示空格
+                    row_data.append(0)  # 0 表示空格
             sudoku_grid.append(row_data)
 
-        # 将数独格局保存到文件
-        puzzle_file_path = "uploaded_puzzle.txt"
         try:
-            with open(puzzle_file_path, 'w') as f:
-                for row in sudoku_grid:
-                    f.write(' '.join(row) + '\n')
-            print(f"Uploaded puzzle saved to {puzzle_file_path}")
-        except Exception as e:
-            print(f"Error saving uploaded puzzle: {e}")
-            QMessageBox.critical(self, "错误", f"保存数独格局时出错:\n{e}")
-            return
-
-        # 调用 judge 程序判断数独是否合法
-        judge_program = os.path.join(self.c_programs_dir, 'judge.exe')  # 确保 judge 程序路径正确
-        try:
-            result = subprocess.run(
-                [judge_program, puzzle_file_path],
-                check=True,
-                capture_output=True,
-                text=True,
-                encoding='utf-8'
-            )
-            judge_output = result.stdout.strip()
-            print(f"Judge program output: {judge_output}")
-        except subprocess.CalledProcessError as e:
-            print(f"Error running judge program: {e}")
-            QMessageBox.critical(self, "错误", f"运行 judge 程序时出错:\n{e.stderr}")
-            return
-        except Exception as e:
-            print(f"Other error: {e}")
-            QMessageBox.critical(self, "错误", f"其他错误:\n{e}")
-            return
-
-        # 根据 judge 程序的输出判断是否合法
-        if judge_output == "unique":
-            # 合法
-            self.upload_ui.legal_message.setText("恭喜你填出合法格局")
-            self.upload_ui.legal_message.setStyleSheet("color: green; font-size: 16px;")
-            self.upload_ui.legal_message.setVisible(True)
-
-            # 显示 game_button
-            self.upload_ui.game_button.setVisible(True)
-
-            # 将数独格局转换为 CNF 文件并保存
-            # 假设有一个程序 convert_to_cnf.exe 将数独格局转换为 CNF
-            convert_program = os.path.join(self.c_programs_dir, 'convert_to_cnf.exe')
-
-            puzzle_file_path = "uploaded_puzzle.txt"  # 输入的数独文件
-            semantic_file_path = "uploaded_semantic_puzzle.cnf"  # 转换后的 CNF 文件
-
-             # 设置 semantic_file_path
-            self.semantic_file_path = semantic_file_path
-            print(f"semantic_file_path set to: {self.semantic_file_path}")
-
-            natural_file_path = "uploaded_natural_puzzle.cnf"  # 转换后的 CNF 文件
-            self.natural_file_path = natural_file_path
-
-            solver_path = os.path.join(self.c_programs_dir, 'sudoku_solver.exe')
-            try:
-                result = subprocess.run(
-                    [convert_program, puzzle_file_path, semantic_file_path,natural_file_path],
-                    check=True,
-                    capture_output=True,
-                    text=True,
-                    encoding='utf-8'
-                )
-
-            except subprocess.CalledProcessError as e:
-                print(f"Error converting puzzle to CNF: {e}")
-                QMessageBox.critical(self, "错误", f"转换数独格局到 CNF 时出错:\n{e.stderr}")
-                return
-            except Exception as e:
-                print(f"Other error: {e}")
-                QMessageBox.critical(self, "错误", f"其他错误:\n{e}")
-                return
-            
-            try:
-                # 运行解算器
-                result = subprocess.run(
-                    [solver_path, natural_file_path],
-                    check=True,
-                    capture_output=True,
-                    text=True,
-                    encoding='utf-8'
-                )
-                print("Solution file generated.")
-                print(f"Solver output: {result.stdout}")
-    
-                # 转换解文件为数独网格格式
-                if not self.convert_solution_to_grid("solution.cnf"):
-                    print("Error converting solution to grid format.")
-                    QMessageBox.critical(self, "错误", "转换解答时出错。")
-                    return
-
-            except subprocess.CalledProcessError as e:
-                print(f"Error generating puzzle or solution: {e}")
-                print(f"C program error output: {e.stderr}")
-                QMessageBox.critical(self, "错误", f"生成数独或解答时出错:\n{e.stderr}")
-                return
-            except Exception as e:
-                print(f"Other error: {e}")
-                QMessageBox.critical(self, "错误", f"其他错误:\n{e}")
-                return
-            
-
-
-        else:
-            # 不合法
-            self.upload_ui.legal_message.setText("不合法，再试一试")
-            self.upload_ui.legal_message.setStyleSheet("color: red; font-size: 16px;")
-            self.upload_ui.legal_message.setVisible(True)
+            board = Board(sudoku_grid)
+        except ValueError as e:
+            print(f"Invalid uploaded puzzle: {e}")
+            board = None  # 格子中填了 1 到 n 以外的数
+
+        def judge(job):
+            job.report("正在检查初盘…")
+            if board is None:
+                return None
+            # 在内存中的盘面上数解，数到第二个解即停止
+            start = time.perf_counter()
+            count = count_solutions(board.puzzle(), 2)
+            print(f"Puzzle judged in {(time.perf_counter() - start) * 1000:.3f} ms, {count} solution(s) found")
+            if count != 1:
+                return None
+
+            # 求解上传的题目
+            with tempfile.TemporaryDirectory(prefix="sudoku_") as work_dir:
+                self.solve_puzzle(job, board, work_dir)
+            self.archive_puzzle(board, None, "uploaded")
+            return board, self.build_position_solver(job, board)
+
+        def show_result(result):
+            # 有唯一解的初盘才合法
+            if result is not None:
+                # 合法
+                self.upload_ui.legal_message.setText("恭喜你填出合法格局")
+                self.upload_ui.legal_message.setStyleSheet("color: green; font-size: 16px;")
+                self.upload_ui.legal_message.setVisible(True)
+
+                # 显示 game_button
+                self.upload_ui.game_button.setVisible(True)
+
+                self.board, self.position_solver = result
+            else:
+                # 不合法
+                self.upload_ui.legal_message.setText("不合法，再试一试")
+                self.upload_ui.legal_message.setStyleSheet("color: red; font-size: 16px;")
+                self.upload_ui.legal_message.setVisible(True)
+
+        self.start_job("正在检查初盘…", judge, show_result, self.solver_timeout)
 
     def check_solution(self):
-        """检查用户的答案是否正确"""
-        if not os.path.exists(self.answer_file_path):
-            print("Error: Solution file not found.")
-            QMessageBox.warning(self, "警告", "解答文件未找到。")
+        """
+        检查用户的答案是否正确：以用户填入的数字为假设调用增量求解器，仍有解时全部正确，
+        否则与不带假设求得的答案比较，统计填错的个数
+        """
+        if self.position_solver is None or self.board is None:
+            print("Error: Puzzle not loaded.")
+            QMessageBox.warning(self, "警告", "题目尚未加载。")
             return
 
-        correct_grid = []
-        with open(self.answer_file_path, 'r') as f:
-            correct_grid = [line.strip().split() for line in f.readlines()]
-
-        table = self.game_ui.sudoku_table
+        entries = self.board.entries_grid()
+        start = time.perf_counter()
         wrong_count = 0
-
-        for row in range(table.rowCount()):
-            for col in range(table.columnCount()):
-                item = table.item(row, col)
-                if item and item.text().isdigit():
-                    if item.text() != correct_grid[row][col]:
-                        wrong_count += 1
+        if not self.position_solver.is_solvable(entries):
+            correct_grid = self.position_solver.solution()
+            size = self.board.size
+            wrong_count = sum(1 for row in range(size) for col in range(size)
+                              if entries[row][col] and entries[row][col] != correct_grid[row][col])
+        print(f"Position checked in {(time.perf_counter() - start) * 1000:.3f} ms")
 
         if wrong_count == 0:
             self.game_ui.check_information.setText("填写全部正确！")
@@ -532,61 +603,107 @@ class MainApp(QMainWindow):
 
 
 
-    def peek_solution(self):
-        """偷看答案"""
-        table = self.game_ui.sudoku_table  # 确保 table 在函数开始时定义
-
-        if not self.is_answer_shown:
-            self.peek_count += 1
+    def game_item_changed(self, item):
+        """
+        游戏表格中某格的内容改变时记入盘面，只更新该格相关的候选数与计数，
+        并只重新着色重复状态可能改变的格子：与同组其他格子数字相同的格子显示为红色背景
+        """
+        size = self.board.size if self.board is not None else 9
+        text = item.text().strip()
+        digit = int(text) if text.isdigit() and 0 < int(text) <= size else 0
+        if self.board is not None:
+            self.board.set_entry(item.row(), item.column(), digit)
+        if self.hint_engine is None:
+            return
+        affected = self.hint_engine.set(item.row(), item.column(), digit)
 
-            if not os.path.exists(self.answer_file_path):
-                print("Error: Solution file not found.")
-                QMessageBox.warning(self, "警告", "解答文件未找到。")
-                return
+        table = self.game_ui.sudoku_table
+        table.blockSignals(True)  # 着色本身也会触发 itemChanged
+        try:
+            for cell in affected:
+                other = table.item(cell // size, cell % size)
+                if other is not None:
+                    other.setBackground(self.conflict_brush if self.hint_engine.is_duplicate(cell) else QtGui.QBrush())
+        finally:
+            table.blockSignals(False)
+
+    def show_hint(self):
+        """给出下一步可以确定的数字及推出它的技巧，并选中该格"""
+        if self.hint_engine is None:
+            QMessageBox.warning(self, "警告", "题目尚未加载。")
+            return
+        hint = self.hint_engine.next_hint()
+        if hint is not None:
+            size = self.hint_engine.shape.size
+            message = describe_hint(hint, size)
+            self.game_ui.sudoku_table.setCurrentCell(hint.cell // size, hint.cell % size)
+        elif self.hint_engine.has_conflict():
+            message = "当前盘面有矛盾，请先检查已填的数字。"
+        elif all(self.hint_engine.cells):
+            message = "已经全部填满。"
+        else:
+            message = "没有找到可以用唯一候选数、隐性唯一或区块摒除推出的数字。"
 
-            # 清空并保存用户当前输入的状态
-            self.previous_user_input = []
+        self.game_ui.check_information.setText(message)
+        self.game_ui.check_information.setCursorPosition(0)
+        self.game_ui.check_information.setVisible(True)
+        QTimer.singleShot(5000, lambda: self.game_ui.check_information.setVisible(False))
 
-            for row in range(table.rowCount()):
-                row_data = []
-                for col in range(table.columnCount()):
-                    item = table.item(row, col)
-                    row_data.append(item.text() if item else "")
-                self.previous_user_input.append(row_data)
+    def fill_editable_cells(self, cells, color):
+        """在可编辑的格子中显示 cells（n * n 个数字，0 显示为空格），不更新盘面与提示引擎"""
+        table = self.game_ui.sudoku_table
+        size = table.columnCount()
+        table.blockSignals(True)
+        try:
+            for cell, digit in enumerate(cells):
+                item = table.item(cell // size, cell % size)
+                if item and item.flags() & Qt.ItemIsEditable:
+                    item.setText(str(digit) if digit else "")
+                    item.setForeground(QtGui.QBrush(color))
+        finally:
+            table.blockSignals(False)
 
-            # 显示答案
-            with open(self.answer_file_path, 'r') as f:
-                answer_lines = [line.strip().split() for line in f.readlines()]
+    def peek_solution(self):
+        """偷看答案：可编辑的格子显示答案 5 秒，之后恢复用户填入的数字"""
+        if not self.is_answer_shown:
+            if self.board is None or not self.board.is_solved():
+                print("Error: Solution not available.")
+                QMessageBox.warning(self, "警告", "答案尚未求出。")
+                return
+            self.peek_count += 1
 
-            for row in range(table.rowCount()):
-                for col in range(table.columnCount()):
-                    item = table.item(row, col)
-                    if item and item.flags() & Qt.ItemIsEditable:  # 如果是可编辑单元格，则显示答案
-                        item.setText(answer_lines[row][col])
-                        item.setForeground(QtGui.QBrush(Qt.black))
+            # 用户填入的数字保存在盘面中，显示答案时不改动
+            self.fill_editable_cells(self.board.solution, Qt.black)
 
             QTimer.singleShot(5000, lambda: self.hide_peek())
 
-
+    def hide_peek(self):
+        """偷看结束，恢复用户填入的数字"""
+        if not self.is_answer_shown and self.board is not None:
+            self.fill_editable_cells(self.board.entries, Qt.blue)
 
     def show_solution(self):
         """显示完整的答案"""
-        if not os.path.exists(self.answer_file_path):
-            print("Error: Solution file not found.")
-            QMessageBox.warning(self, "警告", "解答文件未找到。")
+        if self.board is None or not self.board.is_solved():
+            print("Error: Solution not available.")
+            QMessageBox.warning(self, "警告", "答案尚未求出。")
             return
 
-        with open(self.answer_file_path, 'r') as f:
-            answer_lines = [line.strip().split() for line in f.readlines()]
+        answer_lines = self.board.solution_grid()
 
         table = self.game_ui.sudoku_table
 
-        for row in range(table.rowCount()):
-            for col in range(table.columnCount()):
-                item = table.item(row, col)
-                if item:
-                    item.setText(answer_lines[row][col])
-                    item.setForeground(QtGui.QBrush(Qt.black))
+        # 答案只用于显示，不写入盘面与提示引擎
+        table.blockSignals(True)
+        try:
+            for row in range(table.rowCount()):
+                for col in range(table.columnCount()):
+                    item = table.item(row, col)
+                    if item:
+                        item.setText(str(answer_lines[row][col]))
+                        item.setForeground(QtGui.QBrush(Qt.black))
+        finally:
+            table.blockSignals(False)
 
         # 停止计时但显示时间
         self.timer.stop()
@@ -599,6 +716,23 @@ class MainApp(QMainWindow):
 
         self.is_answer_shown = True
 
+    def export_game(self):
+        """将题目、当前盘面与答案导出到用户选择的目录"""
+        if self.board is None:
+            QMessageBox.warning(self, "警告", "题目尚未加载。")
+            return
+        directory = QFileDialog.getExistingDirectory(self, "选择导出目录")
+        if not directory:
+            return
+        try:
+            paths = self.board.export(directory)
+        except OSError as e:
+            print(f"Error exporting board: {e}")
+            QMessageBox.critical(self, "错误", f"导出盘面时出错:\n{e}")
+            return
+        print(f"Board exported to: {', '.join(paths)}")
+        QMessageBox.information(self, "提示", f"已导出到 {directory}")
+
   
 
     def update_game_time(self):
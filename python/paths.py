@@ -0,0 +1,30 @@
+import os
+import sys
+
+# 动态获取C程序的路径，可用环境变量 SUDOKU_C_DIR 指向 make O=<目录> 生成的程序
+if os.environ.get('SUDOKU_C_DIR'):
+    C_PROGRAMS_DIR = os.environ['SUDOKU_C_DIR']
+elif hasattr(sys, '_MEIPASS'):
+    C_PROGRAMS_DIR = os.path.join(sys._MEIPASS, 'c')
+else:
+    C_PROGRAMS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../c')
+
+
+def program_path(name):
+    """返回 c 目录下某个程序的路径"""
+    return os.path.join(C_PROGRAMS_DIR, name)
+
+
+def data_path(name):
+    """
+    返回用户数据目录下某个文件的路径，目录不存在时创建。可用环境变量 SUDOKU_DATA_DIR 指定目录，
+    默认 Windows 下为 %APPDATA%\\sudoku，其他系统为 $XDG_DATA_HOME/sudoku（默认 ~/.local/share/sudoku）
+    """
+    data_dir = os.environ.get('SUDOKU_DATA_DIR')
+    if not data_dir and os.name == 'nt' and os.environ.get('APPDATA'):
+        data_dir = os.path.join(os.environ['APPDATA'], 'sudoku')
+    if not data_dir:
+        base = os.environ.get('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+        data_dir = os.path.join(base, 'sudoku')
+    os.makedirs(data_dir, exist_ok=True)
+    return os.path.join(data_dir, name)
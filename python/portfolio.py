@@ -0,0 +1,122 @@
+"""并行组合求解：同一个 CNF 文件在多个进程中用不同配置同时求解，采用最先得到的结果"""
+import argparse
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+from paths import program_path
+from verifier import verify_files
+
+# 求解配置 (引擎, 变元选择策略)，按整体表现从好到差排列，核数不足时只运行靠前的配置
+CONFIGS = [
+    ("cdcl", "vsids"),
+    ("cdcl", "jw"),
+    ("cdcl", "moms"),
+    ("cdcl", "freq"),
+    ("dpll", "first"),
+    ("dpll", "jw"),
+    ("dpll", "freq"),
+    ("cdcl", "next"),
+    ("dpll", "moms"),
+    ("dpll", "next"),
+    ("dpll", "vsids"),
+]
+
+PortfolioResult = namedtuple("PortfolioResult", ["status", "config", "res_path", "elapsed"])
+
+
+def config_name(config):
+    """配置的显示名称，例如 cdcl/vsids"""
+    return "/".join(config)
+
+
+def read_status(res_path):
+    """读取 .res 文件中 s 行的结果，文件不完整时返回 None"""
+    try:
+        with open(res_path, 'r') as f:
+            for line in f:
+                if line.startswith("s "):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def solve_portfolio(cnf_path, res_path=None, configs=None, workers=None, timeout=None):
+    """
+    每个配置启动一个 sudoku_solver.exe 进程（默认与核数相同），
+    第一个给出结果的进程获胜，其余进程立即结束；可满足的结果须先通过验证器检查。
+    获胜进程的 .res 文件复制到 res_path，其中的 c config 行记录了获胜的配置。
+    全部失败或超时时返回 None。
+    """
+    configs = list(configs or CONFIGS)[:workers or os.cpu_count() or 1]
+    if res_path is None:
+        res_path = cnf_path + "_portfolio.res"
+    solver_path = program_path('sudoku_solver.exe')
+
+    tmp_dir = tempfile.mkdtemp(prefix="portfolio_")
+    finished = queue.Queue()
+    processes = []
+    start = time.perf_counter()
+    try:
+        for index, (engine, heuristic) in enumerate(configs):
+            tmp_res = os.path.join(tmp_dir, f"{index}.res")
+            process = subprocess.Popen(
+                [solver_path, '-e', engine, '-h', heuristic, '-r', tmp_res, cnf_path],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
+            processes.append((process, tmp_res))
+            threading.Thread(
+                target=lambda p=process, i=index: finished.put((i, p.wait())),
+                daemon=True
+            ).start()
+
+        for _ in processes:
+            remaining = None if timeout is None else max(0.0, timeout - (time.perf_counter() - start))
+            try:
+                index, returncode = finished.get(timeout=remaining)
+            except queue.Empty:
+                break
+            tmp_res = processes[index][1]
+            status = read_status(tmp_res)
+            if status == 1 and not verify_files(cnf_path, tmp_res).ok:
+                print(f"Wrong model from {config_name(configs[index])}, ignored.")
+                continue
+            if returncode == 0 and status in (0, 1):
+                shutil.copyfile(tmp_res, res_path)
+                return PortfolioResult(status, configs[index], res_path, time.perf_counter() - start)
+        return None
+    finally:
+        for process, _ in processes:
+            if process.poll() is None:
+                process.kill()
+        for process, _ in processes:
+            process.wait()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="在多个进程中用不同配置同时求解同一个 CNF 文件")
+    parser.add_argument("cnf", help="CNF 文件路径")
+    parser.add_argument("-o", "--output", help="结果 .res 文件路径，默认为 <cnf>_portfolio.res")
+    parser.add_argument("-j", "--workers", type=int, help="并行进程数，默认为 CPU 核数")
+    parser.add_argument("-t", "--timeout", type=float, help="超时时间（秒）")
+    args = parser.parse_args()
+
+    result = solve_portfolio(args.cnf, args.output, workers=args.workers, timeout=args.timeout)
+    if result is None:
+        print("No configuration finished.")
+        return 1
+    print(f"Winner: {config_name(result.config)}, s {result.status}, "
+          f"{result.elapsed * 1000:.2f} ms, saved to: {result.res_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,234 @@
+"""
+预先生成的题目池：每个难度保存一定数量的题目及其答案，界面取题时直接弹出，
+不足时在后台线程中并行启动 generate_diagonal_sudoku.exe 进程补充。题目池保存在用户数据目录的 JSON 文件中，下次启动时继续使用。
+"""
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import threading
+from collections import deque
+
+from diagonal_solver import read_semantic_cnf, solve
+from paths import data_path, program_path
+
+POOL_FILE = "puzzle_pool.json"  # 用户数据目录（paths.data_path）下的文件名
+POOL_VERSION = 1
+
+# 难度名称与 generate_diagonal_sudoku.exe 的难度参数
+DIFFICULTY_LEVELS = {
+    "easy": "1",          # 约 20 个空格
+    "simple": "2",        # 约 30 个空格
+    "intermediate": "3",  # 约 40 个空格
+    "expert": "4",        # 约 50 个空格
+}
+
+# 每个难度的目标题目数
+DEFAULT_DEPTH = {
+    "easy": 5,
+    "simple": 5,
+    "intermediate": 5,
+    "expert": 5,
+}
+
+
+def grid_to_string(grid):
+    """9x9 网格转为 81 个字符，0 表示空格"""
+    return ''.join(str(digit) for row in grid for digit in row)
+
+
+def string_to_grid(text):
+    """grid_to_string 的逆变换"""
+    return [[int(ch) for ch in text[row * 9:(row + 1) * 9]] for row in range(9)]
+
+
+class PuzzlePool:
+    """
+    各难度的题目以 (题目, 答案) 的形式存放在队列中，pop 只从队首取出一项。
+    补充由后台线程完成，每轮最多同时启动 workers 个生成进程，每生成一批就写回文件。
+    指定 store 时新生成的题目同时存入题目库（puzzle_store.PuzzleStore）。
+    """
+
+    def __init__(self, path=None, depth=None, workers=None, store=None):
+        self.path = path or data_path(POOL_FILE)
+        self.store = store
+        self.depth = dict(DEFAULT_DEPTH, **(depth or {}))
+        self.workers = workers or os.cpu_count() or 1
+        self.queues = {difficulty: deque() for difficulty in DIFFICULTY_LEVELS}
+        self.lock = threading.Lock()
+        self.refill_thread = None
+        self.refilling = False  # 补充线程是否仍在工作，在锁内修改
+        self.requested = False  # 补充线程运行期间是否又有题目被取走
+        self.load()
+
+    def load(self):
+        """读取保存的题目池，文件不存在或格式不符时从空池开始"""
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != POOL_VERSION:
+            return
+        with self.lock:
+            for difficulty, entries in data.get("puzzles", {}).items():
+                if difficulty in self.queues:
+                    self.queues[difficulty].extend(
+                        (entry["puzzle"], entry["solution"]) for entry in entries
+                    )
+
+    def save(self):
+        """
+        先在同一目录下写一个文件名唯一的临时文件再替换，避免程序中途退出时留下不完整的文件；
+        多个界面进程同时写回时各自使用自己的临时文件，不会互相覆盖
+        """
+        with self.lock:
+            data = {
+                "version": POOL_VERSION,
+                "puzzles": {
+                    difficulty: [{"puzzle": puzzle, "solution": solution} for puzzle, solution in queue]
+                    for difficulty, queue in self.queues.items()
+                },
+            }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        with tempfile.NamedTemporaryFile('w', dir=directory, prefix=".puzzle_pool_", suffix=".tmp",
+                                         delete=False) as f:
+            json.dump(data, f)
+        try:
+            os.replace(f.name, self.path)
+        except OSError:
+            os.remove(f.name)
+            raise
+
+    def size(self, difficulty):
+        with self.lock:
+            return len(self.queues[difficulty])
+
+    def pop(self, difficulty):
+        """取出一道题目，返回 (题目网格, 答案网格)；池中没有该难度的题目时返回 None。取出后在后台补充"""
+        with self.lock:
+            queue = self.queues.get(difficulty)
+            entry = queue.popleft() if queue else None
+        self.refill()
+        if entry is None:
+            return None
+        return string_to_grid(entry[0]), string_to_grid(entry[1])
+
+    def refill(self):
+        """在后台补充题目池，返回补充线程；已有补充线程在工作时由它继续补充"""
+        with self.lock:
+            self.requested = True
+            if not self.refilling:
+                self.refilling = True
+                self.refill_thread = threading.Thread(target=self._refill, daemon=True)
+                self.refill_thread.start()
+            return self.refill_thread
+
+    def _missing(self):
+        """本轮需要生成的难度列表，缺得最多的难度排在前面，总数不超过 workers"""
+        with self.lock:
+            missing = {d: self.depth.get(d, 0) - len(q) for d, q in self.queues.items()}
+        jobs = []
+        while len(jobs) < self.workers:
+            difficulty = max(missing, key=missing.get)
+            if missing[difficulty] <= 0:
+                break
+            jobs.append(difficulty)
+            missing[difficulty] -= 1
+        return jobs
+
+    def _refill(self):
+        while True:
+            with self.lock:
+                requested, self.requested = self.requested, False
+            if requested:
+                self.save()  # 写回刚被取走的题目
+            jobs = self._missing()
+            if not jobs:
+                with self.lock:
+                    if not self.requested:
+                        self.refilling = False
+                        return
+                continue
+            entries = generate_puzzles(jobs)
+            if not entries:
+                print("Puzzle pool refill failed, no puzzle generated.")
+                with self.lock:
+                    self.refilling = False
+                return
+            with self.lock:
+                for difficulty, puzzle, solution in entries:
+                    self.queues[difficulty].append((puzzle, solution))
+            self.save()
+            self.archive(entries)
+
+    def archive(self, entries):
+        """将新生成的题目存入题目库"""
+        if self.store is None:
+            return
+        try:
+            self.store.add_many(
+                (string_to_grid(puzzle), int(DIFFICULTY_LEVELS[difficulty]), string_to_grid(solution))
+                for difficulty, puzzle, solution in entries
+            )
+        except sqlite3.Error as e:
+            print(f"Error saving puzzles to the store: {e}")
+
+
+def generate_puzzles(difficulties):
+    """为每个难度各启动一个生成进程并等待全部结束，返回 [(难度, 题目, 答案)]，字符串形式"""
+    generator_path = program_path('generate_diagonal_sudoku.exe')
+    tmp_dir = tempfile.mkdtemp(prefix="puzzle_pool_")
+    processes = []
+    try:
+        for index, difficulty in enumerate(difficulties):
+            semantic_path = os.path.join(tmp_dir, f"{index}_semantic.cnf")
+            natural_path = os.path.join(tmp_dir, f"{index}_natural.cnf")
+            try:
+                process = subprocess.Popen(
+                    [generator_path, DIFFICULTY_LEVELS[difficulty], semantic_path, natural_path],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL
+                )
+            except OSError as e:
+                print(f"Error starting puzzle generator: {e}")
+                break
+            processes.append((difficulty, process, semantic_path))
+
+        entries = []
+        for difficulty, process, semantic_path in processes:
+            if process.wait() != 0 or not os.path.exists(semantic_path):
+                continue
+            puzzle = read_semantic_cnf(semantic_path)
+            solution = solve(puzzle)
+            if solution is not None:
+                entries.append((difficulty, grid_to_string(puzzle), grid_to_string(solution)))
+        return entries
+    finally:
+        for _, process, _ in processes:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="预先生成各难度的题目并保存到题目池")
+    parser.add_argument("-f", "--file", help=f"题目池文件，默认为用户数据目录下的 {POOL_FILE}")
+    parser.add_argument("-d", "--depth", type=int, help="每个难度的目标题目数")
+    parser.add_argument("-j", "--workers", type=int, help="并行生成进程数，默认为 CPU 核数")
+    args = parser.parse_args()
+
+    depth = dict.fromkeys(DIFFICULTY_LEVELS, args.depth) if args.depth else None
+    pool = PuzzlePool(args.file, depth, args.workers)
+    pool.refill().join()
+    for difficulty in DIFFICULTY_LEVELS:
+        print(f"{difficulty}: {pool.size(difficulty)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
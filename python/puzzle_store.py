@@ -0,0 +1,222 @@
+"""
+题目库：生成与上传的题目保存在 SQLite 数据库（WAL 模式）中。每行保存 81 字节的题目与答案、难度、
+已知数个数、难度评分与规范形式的哈希，按难度随机取题只需一次索引查找。
+"""
+import argparse
+import hashlib
+import random
+import sqlite3
+import threading
+import time
+
+from diagonal_solver import count_solutions, rate, solve
+from paths import data_path
+
+STORE_FILE = "puzzles.db"  # 用户数据目录（paths.data_path）下的文件名
+SIZE = 9
+CELLS = SIZE * SIZE
+RANDOM_KEY_BITS = 62
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS puzzles (
+    id INTEGER PRIMARY KEY,
+    grid BLOB NOT NULL,            -- 81 字节，按行存放，每字节为 0 到 9，0 表示空格
+    solution BLOB NOT NULL,        -- 81 字节的答案
+    level INTEGER NOT NULL,        -- 难度 1 到 4，与 generate_diagonal_sudoku.exe 的参数一致
+    clues INTEGER NOT NULL,        -- 已知数个数
+    rating REAL NOT NULL,          -- diagonal_solver.rate 给出的难度评分
+    canonical_hash BLOB NOT NULL,  -- 规范形式的哈希，等价的题目只保存一次
+    source TEXT NOT NULL,          -- generated、uploaded 或 imported
+    created REAL NOT NULL,
+    random_key INTEGER NOT NULL    -- 随机取题用的随机键
+);
+CREATE UNIQUE INDEX IF NOT EXISTS puzzles_canonical ON puzzles (canonical_hash);
+CREATE INDEX IF NOT EXISTS puzzles_level ON puzzles (level, random_key);
+CREATE INDEX IF NOT EXISTS puzzles_clues ON puzzles (clues);
+CREATE INDEX IF NOT EXISTS puzzles_rating ON puzzles (rating);
+"""
+
+
+def _symmetries():
+    """保持两条对角线不变的 8 种几何变换（旋转与翻转），每种为新下标到原下标的映射"""
+    maps = []
+    for k in range(8):
+        cells = []
+        for row in range(SIZE):
+            for col in range(SIZE):
+                r, c = (row, col) if k < 4 else (col, row)
+                for _ in range(k % 4):
+                    r, c = c, SIZE - 1 - r
+                cells.append(r * SIZE + c)
+        maps.append(cells)
+    return maps
+
+
+SYMMETRIES = _symmetries()
+
+
+def canonical_form(cells):
+    """
+    题目的规范形式：对 8 种几何变换分别按数字首次出现的顺序重新编号，取字典序最小者。
+    几何变换或交换数字得到的等价题目具有相同的规范形式。
+    """
+    best = None
+    for mapping in SYMMETRIES:
+        labels = {}
+        form = bytes(labels.setdefault(cells[i], len(labels) + 1) if cells[i] else 0 for i in mapping)
+        if best is None or form < best:
+            best = form
+    return best
+
+
+def canonical_hash(cells):
+    return hashlib.blake2b(canonical_form(cells), digest_size=16).digest()
+
+
+def level_for_clues(clues):
+    """按空格数对应到最接近的生成难度，用于上传的题目"""
+    holes = CELLS - clues
+    return min(4, max(1, round((holes - 20) / 10) + 1))
+
+
+def _flatten(grid):
+    cells = [int(digit) for row in grid for digit in row] if len(grid) == SIZE else [int(d) for d in grid]
+    if len(cells) != CELLS:
+        raise ValueError(f"Expected {CELLS} cells, got {len(cells)}")
+    return cells
+
+
+def _to_grid(blob):
+    return [list(blob[row * SIZE:(row + 1) * SIZE]) for row in range(SIZE)]
+
+
+class PuzzleStore:
+    """
+    SQLite 题目库。每个线程使用各自的连接，WAL 模式下后台线程写入时界面线程仍可读取。
+    add_many 在一个事务中写入全部题目，规范形式相同的题目被忽略。
+    """
+
+    def __init__(self, path=None):
+        self.path = path or data_path(STORE_FILE)
+        self.local = threading.local()
+        with self.connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def connection(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
+
+    @staticmethod
+    def make_row(grid, level=None, source="generated", solution=None):
+        """计算一行的各列，题目无解或不唯一时返回 None"""
+        cells = _flatten(grid)
+        grid = [cells[i:i + SIZE] for i in range(0, CELLS, SIZE)]
+        if solution is None:
+            if count_solutions(grid) != 1:
+                return None
+            solution = solve(grid)
+        rating = rate(grid)
+        if rating is None:
+            return None
+        clues = sum(1 for digit in cells if digit)
+        return (
+            bytes(cells),
+            bytes(_flatten(solution)),
+            level or level_for_clues(clues),
+            clues,
+            rating,
+            canonical_hash(cells),
+            source,
+            time.time(),
+            random.getrandbits(RANDOM_KEY_BITS),
+        )
+
+    def add_many(self, entries, source="generated"):
+        """
+        写入多道题目，entries 中每项为 (题目, 难度) 或 (题目, 难度, 答案)，题目为 9x9 网格或 81 个数字。
+        难度为 None 时按已知数个数估计。返回实际新增的行数。
+        """
+        rows = []
+        for entry in entries:
+            row = self.make_row(entry[0], entry[1], source, entry[2] if len(entry) > 2 else None)
+            if row is not None:
+                rows.append(row)
+        conn = self.connection()
+        with conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO puzzles (grid, solution, level, clues, rating, canonical_hash, "
+                "source, created, random_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            return conn.total_changes - before
+
+    def add(self, grid, level=None, source="generated", solution=None):
+        return self.add_many([(grid, level, solution)], source)
+
+    def random_puzzle(self, level):
+        """按难度随机取一道题目，返回 (题目网格, 答案网格, 评分)；没有该难度的题目时返回 None"""
+        conn = self.connection()
+        key = random.getrandbits(RANDOM_KEY_BITS)
+        query = "SELECT grid, solution, rating FROM puzzles WHERE level = ? AND random_key >= ? ORDER BY random_key LIMIT 1"
+        row = conn.execute(query, (level, key)).fetchone() or conn.execute(query, (level, 0)).fetchone()
+        if row is None:
+            return None
+        return _to_grid(row[0]), _to_grid(row[1]), row[2]
+
+    def counts(self):
+        """各难度的题目数"""
+        conn = self.connection()
+        return dict(conn.execute("SELECT level, COUNT(*) FROM puzzles GROUP BY level ORDER BY level"))
+
+
+def read_puzzle_lines(path):
+    """读取每行一道题目的文件，每行前 81 个字符为题目，'0' 或 '.' 表示空格"""
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if len(line) >= CELLS:
+                yield [0 if ch in '.0' else int(ch) for ch in line[:CELLS]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="管理 SQLite 题目库")
+    parser.add_argument("-f", "--file", help=f"数据库文件，默认为用户数据目录下的 {STORE_FILE}")
+    parser.add_argument("-i", "--import", dest="import_path", help="导入每行一道题目（81 个字符）的文件")
+    parser.add_argument("-l", "--level", type=int, help="导入题目的难度，默认按已知数个数估计")
+    parser.add_argument("-b", "--batch", type=int, default=5000, help="每个事务写入的题目数")
+    args = parser.parse_args()
+
+    store = PuzzleStore(args.file)
+    if args.import_path:
+        added = total = 0
+        start = time.perf_counter()
+        batch = []
+        for cells in read_puzzle_lines(args.import_path):
+            batch.append((cells, args.level))
+            if len(batch) >= args.batch:
+                added += store.add_many(batch, "imported")
+                total += len(batch)
+                batch = []
+        if batch:
+            added += store.add_many(batch, "imported")
+            total += len(batch)
+        print(f"Imported {added} of {total} puzzles in {time.perf_counter() - start:.2f} s")
+    for level, count in store.counts().items():
+        print(f"level {level}: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
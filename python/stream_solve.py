@@ -0,0 +1,138 @@
+"""
+流式求解每行一道题目的大型数据集（常见的 81 个字符一行的格式，'0' 或 '.' 表示空格）。
+从文件或标准输入按块读取（每块在换行处截断），一组进程各自解析并调用对角线数独求解库一次求解一整块，
+结果按输入顺序写出：每个输入行对应一个输出行，为解的 81 个数字，无解时为 unsat，不是题目的行（如表头）为 invalid。
+同时在途的块数有上限，内存占用与输入的大小无关。
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from diagonal_solver import SIZE, solve_many
+
+CHUNK_BYTES = 1 << 20  # 每块约 1 MiB，81 个字符一行时约 12000 道题目
+UNSAT = b"unsat"
+INVALID = b"invalid"
+
+# 字符与格子中数字的相互转换，'.' 与 '0' 都表示空格
+TO_DIGITS = bytes.maketrans(b".0123456789", bytes(range(1)) + bytes(range(10)))
+TO_CHARS = bytes.maketrans(bytes(range(10)), b"0123456789")
+
+
+def read_chunks(stream, chunk_bytes=CHUNK_BYTES):
+    """从二进制流中按块读取，每块以完整的行结束（最后一块可以没有换行符）"""
+    rest = b""
+    while True:
+        block = stream.read(chunk_bytes)
+        if not block:
+            break
+        end = block.rfind(b"\n") + 1
+        if not end:
+            rest += block
+            continue
+        yield rest + block[:end]
+        rest = block[end:]
+    if rest:
+        yield rest
+
+
+def solve_chunk(chunk, size=SIZE, diagonal=True):
+    """
+    （工作进程）求解一块输入中的全部题目，返回 (输出的字节串, 各结果的计数)。
+    每行取去掉首尾空白后的前 size * size 个字符，不足或含有其他字符的行记为 invalid
+    """
+    cells = size * size
+    allowed = b".0" + b"123456789"[:size]
+    valid, puzzles = [], []
+    for line in chunk.splitlines():
+        puzzle = line.strip()[:cells]
+        ok = len(puzzle) == cells and not puzzle.translate(None, allowed)
+        valid.append(ok)
+        if ok:
+            puzzles.append(puzzle)
+    solutions = solve_many(b"".join(puzzles).translate(TO_DIGITS), len(puzzles), size, diagonal).translate(TO_CHARS)
+
+    counts = Counter()
+    output = []
+    offset = 0
+    for ok in valid:
+        if not ok:
+            output.append(INVALID)
+            counts["invalid"] += 1
+            continue
+        solution = solutions[offset:offset + cells]
+        offset += cells
+        if solution[0] == ord("0"):
+            output.append(UNSAT)
+            counts["unsat"] += 1
+        else:
+            output.append(solution)
+            counts["solved"] += 1
+    output.append(b"")
+    return b"\n".join(output), counts
+
+
+def stream_solve(source, sink, size=SIZE, diagonal=True, workers=None, chunk_bytes=CHUNK_BYTES, window=None):
+    """
+    从二进制流 source 读取题目，按输入顺序把结果写入二进制流 sink，返回各结果的计数。
+    workers 个进程（默认与 CPU 核数相同，为 1 时在当前进程中求解）并行求解，
+    同时在途的块数不超过 window（默认为进程数的两倍），内存占用约为 window * chunk_bytes 的数倍
+    """
+    workers = workers or os.cpu_count() or 1
+    totals = Counter()
+    if workers == 1:
+        for chunk in read_chunks(source, chunk_bytes):
+            output, counts = solve_chunk(chunk, size, diagonal)
+            sink.write(output)
+            totals += counts
+        return totals
+
+    window = window or 2 * workers
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk in read_chunks(source, chunk_bytes):
+            if len(pending) >= window:
+                output, counts = pending.popleft().result()
+                sink.write(output)
+                totals += counts
+            pending.append(executor.submit(solve_chunk, chunk, size, diagonal))
+        while pending:
+            output, counts = pending.popleft().result()
+            sink.write(output)
+            totals += counts
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="流式求解每行一道题目的文件，按输入顺序每行写出一个解")
+    parser.add_argument("input", nargs="?", default="-", help="输入文件，默认或为 - 时读取标准输入")
+    parser.add_argument("-o", "--output", default="-", help="输出文件，默认或为 - 时写到标准输出")
+    parser.add_argument("-j", "--workers", type=int, help="并行进程数，默认为 CPU 核数")
+    parser.add_argument("-s", "--size", type=int, default=SIZE, choices=[4, 9], help="盘面边长，每行 size * size 个字符")
+    parser.add_argument("-c", "--classic", action="store_true", help="按普通数独求解，不检查对角线")
+    parser.add_argument("--chunk-kb", type=int, default=CHUNK_BYTES >> 10, help="每块读取的千字节数")
+    args = parser.parse_args()
+
+    source = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    sink = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    start = time.perf_counter()
+    try:
+        counts = stream_solve(source, sink, args.size, not args.classic, args.workers, args.chunk_kb << 10)
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+        if sink is not sys.stdout.buffer:
+            sink.close()
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    # 统计输出到标准错误，不与写到标准输出的结果混在一起
+    print(f"{total} puzzles in {elapsed:.2f} s, {total / elapsed if elapsed else 0:.0f} puzzles/s; "
+          f"solved {counts['solved']}, unsat {counts['unsat']}, invalid {counts['invalid']}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
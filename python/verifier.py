@@ -0,0 +1,182 @@
+"""模型验证：检查 .res 文件中的赋值是否满足 CNF 文件的全部子句，可代替 test_case 中的 verify.exe"""
+import argparse
+import glob
+import os
+import re
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from cnf_loader import CnfFormula, load_library
+
+# lits 为去掉子句结尾 0 后的全部文字，clause_ids[i] 为 lits[i] 所在子句的序号，
+# exactly_one 为恰好一个约束（e 行）的子句序号，这些子句要求恰好一个文字为真
+Cnf = namedtuple("Cnf", ["lits", "clause_ids", "num_vars", "num_clauses", "exactly_one"])
+VerifyResult = namedtuple("VerifyResult", ["ok", "status", "unsatisfied", "elapsed"])
+
+# s 行的取值：1 可满足，0 不可满足，-1 求解器到达资源限制、未得出结论。
+# 基线结果中未跑完的算例写为 s 0 与 t 0（如 test_case/8.cnf.res），读入时也视为未得出结论
+STATUS_UNKNOWN = -1
+
+HEADER_RE = re.compile(rb'^[ \t]*p[ \t]+cnf[ \t]+(\d+)[ \t]+(\d+)', re.M)
+SKIP_RE = re.compile(rb'^[ \t]*[cp%].*$', re.M)
+EXACTLY_ONE_RE = re.compile(rb'^[ \t]*e(?=[ \t])', re.M)
+EXACTLY_ONE_MARK = 1 << 62  # 文本解析时代替 e 的整数，不会是合法的文字
+
+
+def read_numbers(path):
+    """
+    读取文件中除注释行与 p 行以外的全部整数，返回 (整数数组, p 行中的变元数与子句数)。
+    e 行开头的 e 读作 EXACTLY_ONE_MARK
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    header = None
+    match = HEADER_RE.search(data)
+    if match:
+        header = (int(match.group(1)), int(match.group(2)))
+    # 去掉注释行与 p 行后整段交给 NumPy 解析
+    if SKIP_RE.search(data):
+        data = SKIP_RE.sub(b'', data)
+    if EXACTLY_ONE_RE.search(data):
+        data = EXACTLY_ONE_RE.sub(str(EXACTLY_ONE_MARK).encode(), data)
+    numbers = np.fromstring(data, dtype=np.int64, sep=' ') if data.strip() else np.zeros(0, dtype=np.int64)
+    return numbers, header
+
+
+def load_cnf(path):
+    """
+    读取 CNF 文件为扁平的文字数组，没有 p 行时由文件内容推出变元数与子句数。
+    编译了 CNF 读取库时直接使用 C 端的 CSR 数组，否则用 NumPy 解析文本。
+    """
+    if load_library() is not None:
+        formula = CnfFormula(path)
+        clause_ids = np.repeat(np.arange(formula.num_clauses), np.diff(formula.offsets))
+        return Cnf(formula.lits, clause_ids, formula.num_vars, formula.num_clauses, formula.exactly_one)
+
+    numbers, header = read_numbers(path)
+    ends = numbers == 0
+    marks = numbers == EXACTLY_ONE_MARK
+    # 每个文字所在子句的序号等于它之前出现的 0 的个数
+    positions = np.cumsum(ends) - ends
+    literal = ~ends & ~marks
+    clause_ids = positions[literal]
+    lits = numbers[literal]
+    exactly_one = positions[marks]
+    num_clauses = int(ends.sum())
+    num_vars = int(np.abs(lits).max()) if lits.size else 0
+    if header:
+        num_vars = max(num_vars, header[0])
+    return Cnf(lits, clause_ids, num_vars, num_clauses, exactly_one)
+
+
+def load_model(path, num_vars):
+    """
+    读取赋值，返回 (s 行的结果, 布尔数组 truth)，truth[v] 为变元 v 的取值。
+    支持 .res 文件的 v 行，也支持 natural_solution.cnf 这样每行一个文字的文件；
+    未出现的变元视为假。s 0（不可满足）或 s -1（未得出结论）时 truth 为 None。
+    .res 文件中 s 0 而 t 行为 0 或缺失时是没有跑完的结果，s 行的结果记为 STATUS_UNKNOWN。
+    """
+    status = None
+    ms = None
+    values = []
+    with open(path, 'r') as f:
+        for line in f:
+            fields = line.split()
+            if not fields or fields[0] == "c":
+                continue
+            if fields[0] == "t":
+                ms = float(fields[1])
+            elif fields[0] == "s":
+                status = int(fields[1])
+            elif fields[0] == "v":
+                values.extend(fields[1:])
+            else:
+                values.extend(fields)
+    if status == 0 and not ms and path.endswith(".res"):
+        status = STATUS_UNKNOWN
+    if status in (0, STATUS_UNKNOWN):
+        return status, None
+    model = np.array(values, dtype=np.int64)
+    model = model[model != 0]
+    truth = np.zeros(max(num_vars, int(np.abs(model).max()) if model.size else 0) + 1, dtype=bool)
+    truth[model[model > 0]] = True
+    return status, truth
+
+
+def unsatisfied_clauses(cnf, truth):
+    """返回未被满足的子句序号（从 0 开始），恰好一个约束中为真的文字多于一个时也未满足"""
+    lit_true = truth[np.abs(cnf.lits)] == (cnf.lits > 0)
+    counts = np.bincount(cnf.clause_ids, weights=lit_true, minlength=cnf.num_clauses)
+    satisfied = counts > 0
+    satisfied[cnf.exactly_one] = counts[cnf.exactly_one] == 1
+    return np.flatnonzero(~satisfied)
+
+
+def verify_files(cnf_path, res_path):
+    """
+    验证一个结果文件。不可满足或未得出结论的结果无法用赋值验证，ok 为 None；
+    否则 ok 表示全部子句是否满足，unsatisfied 为未满足的子句序号。
+    """
+    start = time.perf_counter()
+    cnf = load_cnf(cnf_path)
+    status, truth = load_model(res_path, cnf.num_vars)
+    if truth is None:
+        return VerifyResult(None, status, None, time.perf_counter() - start)
+    unsatisfied = unsatisfied_clauses(cnf, truth)
+    return VerifyResult(unsatisfied.size == 0, status, unsatisfied, time.perf_counter() - start)
+
+
+def cnf_for_res(res_path, cnf_dir=None):
+    """由结果文件名找到对应的 CNF 文件，例如 1.cnf_faster.res 对应 1.cnf"""
+    name = os.path.basename(res_path)
+    index = name.find(".cnf")
+    if index < 0:
+        return None
+    cnf_path = os.path.join(cnf_dir or os.path.dirname(res_path), name[:index + len(".cnf")])
+    return cnf_path if os.path.exists(cnf_path) else None
+
+
+def verify_dir(res_dir, cnf_dir=None):
+    """验证目录下的全部 .res 文件，返回 [(结果文件, CNF 文件, VerifyResult)]"""
+    results = []
+    for res_path in sorted(glob.glob(os.path.join(res_dir, '*.res'))):
+        cnf_path = cnf_for_res(res_path, cnf_dir)
+        if cnf_path:
+            results.append((res_path, cnf_path, verify_files(cnf_path, res_path)))
+    return results
+
+
+def describe(result):
+    if result.ok is None and result.status == STATUS_UNKNOWN:
+        return "no verdict (unknown), not checked"
+    if result.ok is None:
+        return "unsatisfiable, not checked"
+    if result.ok:
+        return f"OK ({result.elapsed * 1000:.2f} ms)"
+    return f"FAILED, {result.unsatisfied.size} clauses unsatisfied, first: {result.unsatisfied[0]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="验证 .res 文件中的赋值是否满足 CNF 文件")
+    parser.add_argument("cnf", nargs="?", help="CNF 文件路径")
+    parser.add_argument("res", nargs="?", help="结果 .res 文件路径")
+    parser.add_argument("-d", "--dir", help="批量验证目录下的全部 .res 文件")
+    parser.add_argument("--cnf-dir", help="批量验证时 CNF 文件所在目录，默认与 .res 文件相同")
+    args = parser.parse_args()
+
+    if args.dir:
+        results = verify_dir(args.dir, args.cnf_dir)
+    elif args.cnf and args.res:
+        results = [(args.res, args.cnf, verify_files(args.cnf, args.res))]
+    else:
+        parser.error("需要指定 CNF 文件与结果文件，或使用 -d 指定目录")
+
+    for res_path, cnf_path, result in results:
+        print(f"{os.path.basename(res_path)}: {describe(result)}")
+    return 1 if any(result.ok is False for _, _, result in results) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())